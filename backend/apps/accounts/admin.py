@@ -21,6 +21,9 @@ from apps.finance.models import (
     UserProgramAccrual,
     OperationHistory,
 )
+from apps.accounts.services.presence import prefetch_online
+from apps.finance.services.commissions import get_pending_commissions
+from apps.finance.services.portfolio import get_region_totals
 from config.settings import LOGIN_AS_USER_TOKEN
 from core.import_export.admin import NoConfirmExportMixin
 from core.utils import safe_zero_div
@@ -69,24 +72,15 @@ class RegionAdmin(admin.ModelAdmin):
 
     @admin.display(description="Кол-во инвесторов")
     def investors(self, obj: Region):
-        return User.objects.filter(partner__region=obj).count()
+        return get_region_totals()[obj.pk]["investors"]
 
     @admin.display(description="Сумма активов")
     def total_assets(self, obj: Region):
-        return (
-            User.objects.filter(partner__region=obj).aggregate(
-                total=Sum("wallet__programs__deposit")
-            )["total"]
-            or 0
-        )
+        return get_region_totals()[obj.pk]["total_assets"]
 
     @admin.display(description="Средний чек")
     def average_bill(self, obj: Region):
-        total_assets = User.objects.filter(partner__region=obj).aggregate(
-            total=Sum("wallet__programs__deposit")
-        )["total"]
-        total_investors = User.objects.filter(partner__region=obj).count()
-        return round(safe_zero_div(total_assets, total_investors), 2)
+        return get_region_totals()[obj.pk]["average_bill"]
 
 
 @admin.register(Partner)
@@ -707,6 +701,7 @@ class UserAdmin(NoConfirmExportMixin, NestedModelAdmin):
         "funds_st_2",
         "funds_st_3",
         "funds_total",
+        "is_online",
     ]
     list_display_links = ("id", "region", "fio", "email")
     readonly_fields = list_display
@@ -763,59 +758,53 @@ class UserAdmin(NoConfirmExportMixin, NestedModelAdmin):
         )
 
     def get_queryset(self, request: HttpRequest) -> QuerySet[Any]:
-        return super().get_queryset(request).filter(is_active=True, is_staff=False)
+        return (
+            super()
+            .get_queryset(request)
+            .filter(is_active=True, is_staff=False)
+            .with_portfolio()
+        )
+
+    def get_changelist_instance(self, request):
+        changelist = super().get_changelist_instance(request)
+        prefetch_online(changelist.result_list)
+        return changelist
+
+    @admin.display(description="Онлайн", boolean=True)
+    def is_online(self, obj: User):
+        return obj.is_online
 
     @admin.display(description="ФИО")
     def fio(self, obj: User):
         return obj.full_name
 
-    @admin.display(description="Регион")
+    @admin.display(description="Регион", ordering="region_name")
     def region(self, obj: User):
-        user_region = getattr(obj.partner, "region", None)
-        if not user_region:
-            partner_profile = getattr(obj, "partner_profile", None)
-            user_region = getattr(partner_profile, "region", None)
-        return user_region
+        return obj.region_name
 
-    @admin.display(description="Статус")
+    @admin.display(description="Статус", ordering="status_label")
     def status(self, obj: User):
-        if Partner.objects.filter(user=obj).exists():
-            return "Филиал"
-        if obj.verified():
-            if obj.wallet.balance > 0:
-                return "Инвестор"
-            return "Верифицирован"
-        if obj.waiting_for_verification():
-            return "Ожидает верификации"
-        return "Не верифицирован"
-
-    @admin.display(description="Сумма в кошельке")
+        return obj.status_label
+
+    @admin.display(description="Сумма в кошельке", ordering="wallet_sum")
     def wallet_sum(self, obj: User):
-        return obj.wallet.balance
+        return obj.wallet_sum
 
-    @admin.display(description="Базовый актив ST-1")
+    @admin.display(description="Базовый актив ST-1", ordering="funds_st_1")
     def funds_st_1(self, obj: User):
-        return self.funds_st(obj, name="ST-1")
+        return obj.funds_st_1
 
-    @admin.display(description="Базовый актив ST-2")
+    @admin.display(description="Базовый актив ST-2", ordering="funds_st_2")
     def funds_st_2(self, obj: User):
-        return self.funds_st(obj, name="ST-2")
+        return obj.funds_st_2
 
-    @admin.display(description="Базовый актив ST-3")
+    @admin.display(description="Базовый актив ST-3", ordering="funds_st_3")
     def funds_st_3(self, obj: User):
-        return self.funds_st(obj, name="ST-3")
+        return obj.funds_st_3
 
-    @admin.display(description="Итого активов")
+    @admin.display(description="Итого активов", ordering="funds_total")
     def funds_total(self, obj: User):
-        return self.funds_st_1(obj) + self.funds_st_2(obj) + self.funds_st_3(obj)
-
-    def funds_st(self, obj: User, name="str"):
-        return (
-            obj.wallet.programs.filter(program__name=name, status="running").aggregate(
-                total=Sum("deposit")
-            )["total"]
-            or 0
-        )
+        return obj.funds_total
 
 
 @admin.register(models.Docs)
@@ -903,8 +892,8 @@ class BusinessWalletInline(NestedTabularInline):
     inlines = [BusinessWalletCommissionsInline, BusinessWalletWithdrawalsInline]
     verbose_name_plural = "Кошелёк"
     model = Wallet
-    fields = ["total_income", "free"]
-    readonly_fields = ["total_income", "free"]
+    fields = ["total_income", "get_free"]
+    readonly_fields = ["total_income", "get_free"]
     can_delete = False
     max_num = 0
 
@@ -914,10 +903,14 @@ class BusinessWalletInline(NestedTabularInline):
                 total=Sum("amount")
             )["total"]
             or 0
-        )
+        ) + get_pending_commissions()
 
     total_income.short_description = "Суммарный доход"
 
+    @admin.display(description="Доступно")
+    def get_free(self, obj: Wallet):
+        return obj.free + get_pending_commissions()
+
 
 @admin.register(models.BusinessAccount)
 class BusinessAccountAdmin(NestedModelAdmin):
@@ -958,8 +951,8 @@ class BusinessAccountAdmin(NestedModelAdmin):
                 total=Sum("amount")
             )["total"]
             or 0
-        )
+        ) + get_pending_commissions()
 
     @admin.display(description="Доступно для вывода")
     def current_balance(self, obj: models.BusinessAccount):
-        return obj.wallet.free
+        return obj.wallet.free + get_pending_commissions()
@@ -1 +1,2 @@
 from .online import OnlineConsumer
+from .admin_badges import AdminBadgesConsumer
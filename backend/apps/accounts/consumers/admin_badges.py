@@ -0,0 +1,24 @@
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from apps.accounts.services.admin_badges import admin_badges
+
+
+class AdminBadgesConsumer(AsyncJsonWebsocketConsumer):
+    async def connect(self):
+        self.user = self.scope["user"]
+        if not self.user.is_staff:
+            return await self.close(code=401)
+
+        await self.channel_layer.group_add(admin_badges.group_name, self.channel_name)
+        await self.accept()
+        await self.send_json(await database_sync_to_async(admin_badges.get)())
+
+    async def disconnect(self, code):
+        if self.user.is_staff:
+            await self.channel_layer.group_discard(
+                admin_badges.group_name, self.channel_name
+            )
+
+    async def badges_update(self, event):
+        await self.send_json(event["counts"])
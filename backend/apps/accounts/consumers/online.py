@@ -1,4 +1,9 @@
+import asyncio
+
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.conf import settings
+
+from apps.accounts.services import presence
 
 
 class OnlineConsumer(AsyncJsonWebsocketConsumer):
@@ -11,9 +16,18 @@ class OnlineConsumer(AsyncJsonWebsocketConsumer):
 
         await self.channel_layer.group_add(self.online_group_name, self.channel_name)
         await self.accept()
+        await presence.aconnect(self.user.pk)
+        self.heartbeat = asyncio.create_task(self.send_heartbeats())
 
     async def disconnect(self, code):
         if self.user.is_authenticated:
+            self.heartbeat.cancel()
+            await presence.adisconnect(self.user.pk)
             await self.channel_layer.group_discard(
                 self.online_group_name, self.channel_name
             )
+
+    async def send_heartbeats(self):
+        while True:
+            await asyncio.sleep(settings.PRESENCE_HEARTBEAT)
+            await presence.aheartbeat(self.user.pk)
@@ -25,6 +25,8 @@ from apps.finance.models import (
     UserProgram,
     UserProgramAccrual,
     OperationHistory,
+    OperationHistoryTotal,
+    LedgerCheckpoint,
     WithdrawalRequest,
     UserProgramReplenishment,
     Operation,
@@ -33,6 +35,7 @@ from apps.finance.models import (
     Stats,
     WalletSettings,
     ProgramResult,
+    Wallet,
 )
 from apps.finance.models.operation_type import MessageType, OperationType
 from apps.finance.signals import (
@@ -70,6 +73,8 @@ class Command(BaseCommand):
                 create_operation_history_extra_fee,
                 # # # update_user_program_profit,
                 create_operation_history_start_close_program,
+                rebuild_operation_history_totals,
+                open_ledger,
                 # # imitation_working_app,  # no work
             ]
 
@@ -866,6 +871,15 @@ def create_operation_history_close_program(user_program, amount, close_date):
     )
 
 
+def rebuild_operation_history_totals(cursor):
+    OperationHistoryTotal.objects.rebuild()
+
+
+def open_ledger(cursor):
+    # балансы выше записаны в обход журнала, отсчёт начинается с них
+    LedgerCheckpoint.objects.open(Wallet.objects.all())
+
+
 def update_user_program_profit(cursor):
     for user_program in UserProgram.objects.all():
         user_program.profit = (
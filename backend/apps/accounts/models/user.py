@@ -8,13 +8,65 @@ from django.core.validators import (
     MaxValueValidator,
 )
 from django.db import models
+from django.db.models import Case, DecimalField, F, Q, Sum, Value, When
+from django.db.models.functions import Coalesce
 
-from apps.accounts.utils import check_is_online
+from apps.accounts.services.presence import online_status
 from core.utils import blank_and_null
 from .region import Region
 
 
-class UserManager(BaseUserManager):
+class UserQuerySet(models.QuerySet):
+    def with_portfolio(self):
+        """
+        Филиал, статус, сумма в кошельке и базовый актив запущенных программ
+        ST-1/2/3 одним запросом, как их показывает список клиентов в админке
+        """
+        approved = VerificationStatus.APPROVED
+        check = VerificationStatus.CHECK
+        verified = Q(personal_verification__status=approved) & Q(
+            address_verification__status=approved
+        )
+        waiting = Q(personal_verification__status=check) | Q(
+            address_verification__status=check
+        )
+        funds = {
+            f"funds_st_{i}": Coalesce(
+                Sum(
+                    "wallet__programs__deposit",
+                    filter=Q(
+                        wallet__programs__program__name=f"ST-{i}",
+                        wallet__programs__status="running",
+                    ),
+                ),
+                Value(Decimal("0")),
+                output_field=DecimalField(),
+            )
+            for i in (1, 2, 3)
+        }
+        return (
+            self.select_related("partner__region", "partner_profile__region", "wallet")
+            .annotate(
+                region_name=Coalesce(
+                    "partner__region__name", "partner_profile__region__name"
+                ),
+                wallet_sum=F("wallet__free") + F("wallet__frozen"),
+                **funds,
+            )
+            .annotate(
+                status_label=Case(
+                    When(partner_profile__isnull=False, then=Value("Филиал")),
+                    When(verified & Q(wallet_sum__gt=0), then=Value("Инвестор")),
+                    When(verified, then=Value("Верифицирован")),
+                    When(waiting, then=Value("Ожидает верификации")),
+                    default=Value("Не верифицирован"),
+                ),
+                funds_total=F("funds_st_1") + F("funds_st_2") + F("funds_st_3"),
+            )
+        )
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
     use_in_migrations = True
 
     def _create_user(self, email, password, **extra_fields):
@@ -80,7 +132,10 @@ class User(AbstractUser):
 
     @property
     def is_online(self):
-        return check_is_online(self)
+        # для списков статус заполняется заранее через presence.prefetch_online
+        if not hasattr(self, "_is_online"):
+            self._is_online = online_status([self.pk])[self.pk]
+        return self._is_online
 
     @property
     def full_name(self):
@@ -102,12 +157,6 @@ class User(AbstractUser):
             address_status == VerificationStatus.CHECK
         )
 
-    @classmethod
-    def notify_count(cls):
-        return len(
-            list(filter(lambda x: x.waiting_for_verification(), cls.objects.all()))
-        )
-
 
 class Settings(models.Model):
     user = models.OneToOneField(User, related_name="settings", on_delete=models.CASCADE)
@@ -317,7 +366,3 @@ class BusinessAccount(User):
         proxy = True
         verbose_name = "Бизнес-аккаунт"
         verbose_name_plural = "Бизнес-аккаунт"
-
-    @classmethod
-    def notify_count(cls):
-        return None
@@ -2,6 +2,7 @@ from django.db.models import Sum
 from import_export.resources import ModelResource
 
 from apps.accounts.models import User
+from apps.finance.models.program import funds_expression
 from core.import_export.fields import ReadOnlyField
 
 
@@ -73,7 +74,7 @@ class UserResource(ModelResource):
     def funds_st(self, obj, name):
         return (
             obj.wallet.programs.filter(program__name=name, status="running").aggregate(
-                total=Sum("funds")
+                total=Sum(funds_expression())
             )["total"]
             or 0
         )
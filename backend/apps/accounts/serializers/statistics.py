@@ -1,4 +1,3 @@
-import pandas as pd
 from rest_framework.fields import (
     FloatField,
     DateField,
@@ -9,6 +8,7 @@ from rest_framework.fields import (
 from rest_framework.serializers import ModelSerializer, Serializer
 
 from apps.finance.models import UserProgramAccrual
+from core.utils.trading_calendar import trading_calendar
 
 
 class TotalProfitStatisticsGraphSerializer(ModelSerializer):
@@ -49,22 +49,7 @@ class TableStatisticsSerializer(Serializer):
     status = CharField()
 
     def get_trading_day(self, obj):
-        holidays = self.context.get("holidays")
-
-        if (
-            obj["created_at"].weekday() >= 5
-            or pd.Timestamp(obj["created_at"]) in holidays
-        ):
-            return None
-
-        return len(
-            pd.bdate_range(
-                obj["created_at"].replace(day=1),
-                obj["created_at"],
-                freq="C",
-                holidays=holidays,
-            ),
-        )
+        return trading_calendar.trading_day_of_month(obj["created_at"])
 
     def get_day_of_week_verbose(self, obj):
         week_days_list = self.context.get("week_days_list")
@@ -0,0 +1,83 @@
+import time
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from apps.accounts.models import User, VerificationStatus
+from apps.finance.models import WithdrawalRequest
+from core.utils import count_querysets
+
+
+def waiting_for_verification():
+    """То же, что User.waiting_for_verification"""
+    return User.objects.filter(
+        Q(personal_verification__status=VerificationStatus.CHECK)
+        | Q(address_verification__status=VerificationStatus.CHECK)
+    )
+
+
+def pending_withdrawals():
+    return WithdrawalRequest.objects.filter(status=WithdrawalRequest.Status.PENDING)
+
+
+class AdminBadges:
+    """
+    Счётчики у моделей в меню админки. Все счётчики считаются одним
+    запросом и хранятся в памяти процесса. Кэш сбрасывается сигналами
+    при изменении проверок и заявок, а в остальных процессах устаревает
+    через timeout секунд. С ADMIN_BADGES_PUSH новые значения рассылаются
+    открытым страницам админки через channels
+    """
+
+    group_name = "admin_badges"
+
+    def __init__(self, querysets: dict, timeout=60):
+        # {model label_lower: функция, возвращающая queryset}
+        self.querysets = querysets
+        self.timeout = timeout
+        self._counts = {}
+        self._pushed = None
+        self._loaded_at = None
+
+    def clear(self):
+        self._loaded_at = None
+
+    def get(self) -> dict:
+        if (
+            self._loaded_at is None
+            or time.monotonic() - self._loaded_at >= self.timeout
+        ):
+            self._counts = count_querysets(
+                {
+                    label: get_queryset()
+                    for label, get_queryset in self.querysets.items()
+                }
+            )
+            self._loaded_at = time.monotonic()
+        return self._counts
+
+    def changed(self):
+        """Сбросить кэш, после коммита разослать счётчики, если они изменились"""
+        self.clear()
+        if settings.ADMIN_BADGES_PUSH:
+            transaction.on_commit(self.push)
+
+    def push(self):
+        counts = self.get()
+        if counts == self._pushed:
+            return
+        async_to_sync(get_channel_layer().group_send)(
+            self.group_name, {"type": "badges.update", "counts": counts}
+        )
+        self._pushed = counts
+
+
+admin_badges = AdminBadges(
+    {
+        "accounts.user": waiting_for_verification,
+        "finance.withdrawalrequest": pending_withdrawals,
+    }
+)
@@ -5,15 +5,14 @@ from django.utils.translation import gettext_lazy as _
 
 from config.settings import RECOVER_PASSWORD_CODE_EXPIRES, MAIN_URL
 from apps.accounts.tasks import send_email_msg
-from apps.accounts.models.email_message import EmailMessageType, EmailMessage
-from core.utils.get_inserted_text import get_inserted_text
+from apps.accounts.models.email_message import EmailMessageType
+from core.utils.template_registry import email_messages
 
 
 def get_template_message(message_type: EmailMessageType, insertion_data):
-    template_message = EmailMessage.objects.get(message_type=message_type)
     language = translation.get_language()
-    title = template_message.title.get(language)
-    text = get_inserted_text(template_message, insertion_data, language)
+    title = email_messages.get(message_type).title.get(language)
+    text = email_messages.render(message_type, insertion_data, language)
     return title, text
 
 
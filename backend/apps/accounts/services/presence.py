@@ -0,0 +1,60 @@
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+# ключ пользователя хранит число его открытых подключений к сокету online,
+# пока подключение живо, consumer продлевает ключ каждые PRESENCE_HEARTBEAT
+# секунд, после обрыва без disconnect ключ истекает через PRESENCE_TTL
+KEY_TEMPLATE = "presence:user:{}"
+
+
+def _connection():
+    return get_channel_layer().connection(0)
+
+
+def _key(user_id):
+    return KEY_TEMPLATE.format(user_id)
+
+
+async def aconnect(user_id):
+    async with _connection().pipeline(transaction=True) as pipe:
+        pipe.incr(_key(user_id))
+        pipe.expire(_key(user_id), settings.PRESENCE_TTL)
+        await pipe.execute()
+
+
+async def aheartbeat(user_id):
+    renewed = await _connection().expire(_key(user_id), settings.PRESENCE_TTL)
+    if not renewed:
+        # ключ истёк, пока не было связи с redis - подключение регистрируется заново
+        await aconnect(user_id)
+
+
+async def adisconnect(user_id):
+    connection = _connection()
+    if await connection.decr(_key(user_id)) <= 0:
+        await connection.delete(_key(user_id))
+
+
+async def aonline_status(user_ids) -> dict:
+    """Присутствие пользователей одним MGET: {user_id: bool}"""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return {}
+    values = await _connection().mget([_key(user_id) for user_id in user_ids])
+    return {
+        user_id: value is not None and int(value) > 0
+        for user_id, value in zip(user_ids, values)
+    }
+
+
+online_status = async_to_sync(aonline_status)
+
+
+def prefetch_online(users):
+    """Заполнить User.is_online для списка пользователей одним запросом к redis"""
+    users = list(users)
+    statuses = online_status([user.pk for user in users])
+    for user in users:
+        user._is_online = statuses[user.pk]
+    return users
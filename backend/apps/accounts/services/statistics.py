@@ -2,7 +2,6 @@ import datetime
 from datetime import timedelta
 from decimal import Decimal
 
-import pandas as pd
 from django.db.models import (
     Sum,
     F,
@@ -13,7 +12,7 @@ from django.db.models import (
 )
 from django.db.models.functions import ExtractWeekDay, Coalesce
 
-from apps.finance.models import UserProgramAccrual, Operation, Holidays
+from apps.finance.models import UserProgramAccrual, Operation
 from apps.finance.models.program import (
     UserProgramHistory,
     UserProgram,
@@ -111,27 +110,6 @@ def get_table_total_statistics(
     return totals
 
 
-def get_holiday_dates(start_date, end_date):
-    holidays = (
-        Holidays.objects.filter(start_date__range=(start_date, end_date))
-        .values("start_date", "end_date")
-        .order_by("start_date")
-    )
-
-    holiday_dates = []
-    for holiday in holidays:
-        start_date = holiday["start_date"]
-        end_date = holiday["end_date"]
-
-        if end_date is None or start_date == end_date:
-            holiday_dates.append(pd.Timestamp(start_date))
-        else:
-            date_range = pd.date_range(start_date, end_date).tolist()
-            holiday_dates.extend(date_range)
-
-    return holiday_dates
-
-
 def get_branch_general_statistics(partner_profile):
     queryset = partner_profile.users.all()
 
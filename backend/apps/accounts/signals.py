@@ -1,7 +1,7 @@
 import os
 
 from django.dispatch import receiver
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from rest_framework.exceptions import ValidationError
 
 from apps.accounts.models import (
@@ -13,7 +13,8 @@ from apps.accounts.models import (
     Settings,
     # Partner,
 )
-from apps.finance.models import Wallet, WalletSettings
+from apps.accounts.services.admin_badges import admin_badges
+from apps.finance.models import Wallet, WalletSettings, WithdrawalRequest
 
 
 @receiver(post_save, sender=User)
@@ -51,6 +52,16 @@ def delete_verification_attachment(sender, instance, **kwargs):
         raise ValidationError("Reject message is required for REJECTED status.")
 
 
+@receiver(post_save, sender=PersonalVerification)
+@receiver(post_save, sender=AddressVerification)
+@receiver(post_save, sender=WithdrawalRequest)
+@receiver(post_delete, sender=PersonalVerification)
+@receiver(post_delete, sender=AddressVerification)
+@receiver(post_delete, sender=WithdrawalRequest)
+def update_admin_badges(sender, **kwargs):
+    admin_badges.changed()
+
+
 # @receiver(post_save, sender=Partner)
 # def delete_related_partner(sender, instance: Partner, **kwargs):
 #     if instance.user.partner:
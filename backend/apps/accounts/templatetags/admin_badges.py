@@ -0,0 +1,21 @@
+from django import template
+from django.conf import settings
+
+from apps.accounts.services.admin_badges import admin_badges
+
+register = template.Library()
+
+
+@register.simple_tag
+def admin_badge(model: dict):
+    """Счётчик модели из app_list админки, None если счётчика у модели нет"""
+    label = model["model"]._meta.label_lower
+    counts = admin_badges.get()
+    if label not in counts:
+        return None
+    return {"label": label, "count": counts[label]}
+
+
+@register.simple_tag
+def admin_badges_push():
+    return settings.ADMIN_BADGES_PUSH
@@ -0,0 +1,70 @@
+from decimal import Decimal
+from itertools import count
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.accounts.models import Partner, Region, User
+from apps.finance.models import Program, UserProgram
+from core.testing import assert_query_budget
+
+CHANGELIST = "admin:accounts_user_changelist"
+
+# запросы списка клиентов не должны зависеть от числа строк на странице
+BUDGET = 15
+
+
+def offline(user_ids):
+    return {user_id: False for user_id in user_ids}
+
+
+@patch("apps.accounts.services.presence.online_status", offline)
+class UserAdminChangelistTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.numbers = count()
+        cls.admin = User.objects.create_superuser(email="admin@test.com", password=None)
+        cls.region = Region.objects.create(name="Регион")
+        cls.partner = Partner.objects.create(
+            user=cls.admin, region=cls.region, partner_id=1
+        )
+        cls.programs = [
+            Program.objects.create(
+                name=name,
+                exp_profit=1,
+                min_deposit=100,
+                accrual_type=Program.AccrualType.DAILY,
+                withdrawal_type=Program.WithdrawalType.DAILY,
+                max_risk=1,
+            )
+            for name in ("ST-1", "ST-2", "ST-3")
+        ]
+
+    def create_users(self, number):
+        for _ in range(number):
+            user = User.objects.create_user(
+                email=f"user{next(self.numbers)}@test.com", partner=self.partner
+            )
+            for program in self.programs:
+                UserProgram.objects.create(
+                    wallet=user.wallet,
+                    program=program,
+                    deposit=Decimal(100),
+                    status=UserProgram.Status.RUNNING,
+                )
+
+    def get_changelist_queries(self):
+        with assert_query_budget(CHANGELIST, BUDGET) as queries:
+            response = self.client.get(reverse(CHANGELIST))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_depend_on_users(self):
+        self.client.force_login(self.admin)
+        # первый запрос заполняет кэш счётчиков меню админки
+        self.client.get(reverse(CHANGELIST))
+        self.create_users(5)
+        queries = self.get_changelist_queries()
+        self.create_users(10)
+        self.assertEqual(self.get_changelist_queries(), queries)
@@ -1,7 +1,7 @@
 from django.urls import path
 from rest_framework.routers import DefaultRouter
 
-from apps.accounts.consumers import OnlineConsumer
+from apps.accounts.consumers import AdminBadgesConsumer, OnlineConsumer
 from apps.accounts.views import (
     DocsViewSet,
     PasswordChangeAPIView,
@@ -134,4 +134,7 @@ urlpatterns = [
 ] + router.urls
 
 
-websocket_urlpatterns = [path("online/", OnlineConsumer.as_asgi())]
+websocket_urlpatterns = [
+    path("online/", OnlineConsumer.as_asgi()),
+    path("admin-badges/", AdminBadgesConsumer.as_asgi()),
+]
@@ -1,5 +1,4 @@
 from datetime import timedelta
-import pandas as pd
 
 from django.db.models import (
     Sum,
@@ -21,11 +20,11 @@ from apps.accounts.serializers.statistics import (
 )
 from apps.accounts.services.statistics import (
     get_table_statistics,
-    get_holiday_dates,
     get_table_total_statistics,
 )
 from apps.finance.models import UserProgramAccrual, UserProgram
 from core.utils.get_dates_range import get_dates_range
+from core.utils.trading_calendar import trading_calendar
 
 
 class TotalProfitStatisticsGraph(ListAPIView):
@@ -148,13 +147,8 @@ class TableStatisticsViewSet(ReadOnlyModelViewSet):
             return Response()
 
         totals = get_table_total_statistics(start_date, end_date, user_program)
-        totals["total_trading_days"] = len(
-            pd.bdate_range(
-                start_date,
-                end_date,
-                freq="C",
-                holidays=get_holiday_dates(start_date, end_date),
-            ),
+        totals["total_trading_days"] = trading_calendar.trading_days_between(
+            start_date, end_date
         )
         return Response(totals)
 
@@ -162,6 +156,5 @@ class TableStatisticsViewSet(ReadOnlyModelViewSet):
         context = super().get_serializer_context()
         week_days_list = [_("Вс"), _("Пн"), _("Вт"), _("Ср"), _("Чт"), _("Пт"), _("Сб")]
 
-        context["holidays"] = get_holiday_dates(self.start_date, self.end_date)
         context["week_days_list"] = week_days_list
         return context
@@ -27,21 +27,23 @@ from . import models
 from .models import (
     Program,
     UserProgram,
-    UserProgramAccrual,
     Holidays,
     WithdrawalRequest,
     Stats,
     Operation,
-    WalletSettings,
     MasterWallet,
     OperationMessage,
 )
+from .models.program import ACCRUAL_TOTALS_FIELDS
 from .resourses import (
     UserProgramRunningResource,
     WithdrawalRequestResource,
     OperationResource,
     UserProgramResource,
 )
+from .services import get_wallet_settings_attr
+from .services.portfolio import get_program_total
+from .services.stats import get_fund_stats
 
 
 class UserProgramInline(ExportInlineMixin, admin.TabularInline):
@@ -66,7 +68,7 @@ class UserProgramInline(ExportInlineMixin, admin.TabularInline):
         return obj.wallet.user.email
 
     def total_accruals(self, obj: UserProgram):
-        return obj.accruals.aggregate(total=Sum("amount"))["total"] or 0
+        return obj.total_profit
 
     def total_success_fee(self, obj: UserProgram):
         return obj.accruals.aggregate(total=Sum("success_fee"))["total"] or 0
@@ -181,71 +183,47 @@ class ProgramAdmin(ExportInlineModelAdminMixin, admin.ModelAdmin):
 
     @admin.display(description="Количество программ")
     def count(self, obj: Program):
-        active = obj.users.filter(status=UserProgram.Status.RUNNING).count()
-        closed = obj.users.filter(status=UserProgram.Status.FINISHED).count()
+        totals = get_program_total(obj.pk)
         return format_html(
             '<h3 style="color: green">Активные: {}</h3><h3><br>Закрытые: {}</h3>',
-            active,
-            closed,
+            totals["running"]["count"],
+            totals["finished"]["count"],
         )
 
     @admin.display(description="Базовый актив")
     def total_deposit(self, obj: Program):
-        active = obj.users.filter(status=UserProgram.Status.RUNNING).aggregate(
-            total=Sum("deposit")
-        )["total"]
-        closed = obj.users.filter(status=UserProgram.Status.FINISHED).aggregate(
-            total=Sum("deposit")
-        )["total"]
-        return format_html(
-            '<h3 style="color: green">{}</h3><br><h3>{}</h3>', active, closed
-        )
+        return self._format_totals(obj, "deposit")
 
     @admin.display(description="Начислено прибыли")
     def total_accruals(self, obj: Program):
-        active = UserProgramAccrual.objects.filter(
-            program__status=UserProgram.Status.RUNNING, program__program=obj
-        ).aggregate(total=Sum("amount"))["total"]
-        closed = UserProgramAccrual.objects.filter(
-            program__status=UserProgram.Status.FINISHED, program__program=obj
-        ).aggregate(total=Sum("amount"))["total"]
-        return format_html(
-            '<h3 style="color: green">{}</h3><br><h3>{}</h3>', active, closed
-        )
+        return self._format_totals(obj, "accruals")
 
     @admin.display(description="Удержано Success Fee")
     def total_success_fee(self, obj: Program):
-        active = UserProgramAccrual.objects.filter(
-            program__status=UserProgram.Status.RUNNING, program__program=obj
-        ).aggregate(total=Sum("success_fee"))["total"]
-        closed = UserProgramAccrual.objects.filter(
-            program__status=UserProgram.Status.FINISHED, program__program=obj
-        ).aggregate(total=Sum("success_fee"))["total"]
-        return format_html(
-            '<h3 style="color: green">{}</h3><br><h3>{}</h3>', active, closed
-        )
+        return self._format_totals(obj, "success_fee")
 
     @admin.display(description="Удержано Management Fee")
     def total_management_fee(self, obj: Program):
-        active = UserProgramAccrual.objects.filter(
-            program__status=UserProgram.Status.RUNNING, program__program=obj
-        ).aggregate(total=Sum("management_fee"))["total"]
-        closed = UserProgramAccrual.objects.filter(
-            program__status=UserProgram.Status.FINISHED, program__program=obj
-        ).aggregate(total=Sum("management_fee"))["total"]
+        return self._format_totals(obj, "management_fee")
+
+    @staticmethod
+    def _format_totals(obj: Program, field):
+        totals = get_program_total(obj.pk)
         return format_html(
-            '<h3 style="color: green">{}</h3><br><h3>{}</h3>', active, closed
+            '<h3 style="color: green">{}</h3><br><h3>{}</h3>',
+            totals["running"][field],
+            totals["finished"][field],
         )
 
     def success_fee(self, obj: Program):
-        return WalletSettings.objects.get(wallet__isnull=True).success_fee
+        return get_wallet_settings_attr(None, "success_fee")
 
     def management_fee(self, obj: Program):
-        return WalletSettings.objects.get(wallet__isnull=True).management_fee
+        return get_wallet_settings_attr(None, "management_fee")
 
     @admin.display(description="Срок вывода базового актива (дней)")
     def withdrawal_terms(self, obj: Program):
-        return WalletSettings.objects.get(wallet__isnull=True).defrost_days
+        return get_wallet_settings_attr(None, "defrost_days")
 
     def formfield_for_dbfield(self, db_field, **kwargs):
         field = super().formfield_for_dbfield(db_field, **kwargs)
@@ -324,6 +302,7 @@ class UserProgramAdmin(NoConfirmExportMixin, admin.ModelAdmin):
     ]
 
     list_editable = ["status"]
+    readonly_fields = ACCRUAL_TOTALS_FIELDS
     inlines = [UserProgramReplenishmentInline, UserProgramAccrualInline]
     actions = None
 
@@ -618,6 +597,15 @@ class StatsAdmin(admin.ModelAdmin):
         super().__init__(model, admin_site)
         self.opts.verbose_name_plural = "Общая статистика"
 
+    def get_changelist_instance(self, request):
+        # все показатели считаются разом, а не отдельно для каждой ячейки,
+        # и хранятся в строках своего запроса, а не в общем экземпляре админки
+        changelist = super().get_changelist_instance(request)
+        fund_stats = get_fund_stats()
+        for obj in changelist.result_list:
+            obj.fund_stats = fund_stats[obj.name]
+        return changelist
+
     def has_add_permission(self, request: HttpRequest) -> bool:
         return False
 
@@ -655,56 +643,56 @@ class StatsAdmin(admin.ModelAdmin):
         if obj.name == Stats.Name.USERS_TOTAL:
             return format_html(
                 '<div style="margin-top: 30px">{}</div>',
-                obj.today,
+                obj.fund_stats["today"],
             )
         if obj.name == Stats.Name.TOTAL_FUND_BALANCE:
             return format_html(
                 '<h3 style="margin-bottom: 30px; padding: 0">{}</h3>',
-                obj.today,
+                obj.fund_stats["today"],
             )
-        return obj.today
+        return obj.fund_stats["today"]
 
     @admin.display(description="За текущий месяц")
     def get_this_month(self, obj: Stats):
         if obj.name == Stats.Name.USERS_TOTAL:
             return format_html(
                 '<div style="margin-top: 30px">{}</div>',
-                obj.this_month,
+                obj.fund_stats["this_month"],
             )
         if obj.name == Stats.Name.TOTAL_FUND_BALANCE:
             return format_html(
                 '<h3 style="margin-bottom: 30px; padding: 0">{}</h3>',
-                obj.this_month,
+                obj.fund_stats["this_month"],
             )
-        return obj.this_month
+        return obj.fund_stats["this_month"]
 
     @admin.display(description="За прошлый месяц")
     def get_last_month(self, obj: Stats):
         if obj.name == Stats.Name.USERS_TOTAL:
             return format_html(
                 '<div style="margin-top: 30px">{}</div>',
-                obj.last_month,
+                obj.fund_stats["last_month"],
             )
         if obj.name == Stats.Name.TOTAL_FUND_BALANCE:
             return format_html(
                 '<h3 style="margin-bottom: 30px; padding: 0">{}</h3>',
-                obj.last_month,
+                obj.fund_stats["last_month"],
             )
-        return obj.last_month
+        return obj.fund_stats["last_month"]
 
     @admin.display(description="За позапрошлый месяц")
     def get_two_months_ago(self, obj: Stats):
         if obj.name == Stats.Name.USERS_TOTAL:
             return format_html(
                 '<div style="margin-top: 30px">{}</div>',
-                obj.two_months_ago,
+                obj.fund_stats["two_months_ago"],
             )
         if obj.name == Stats.Name.TOTAL_FUND_BALANCE:
             return format_html(
                 '<h3 style="margin-bottom: 30px; padding: 0">{}</h3>',
-                obj.two_months_ago,
+                obj.fund_stats["two_months_ago"],
             )
-        return obj.two_months_ago
+        return obj.fund_stats["two_months_ago"]
 
 
 @admin.register(models.WalletSettings)
@@ -0,0 +1,95 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models.signals import pre_save
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.finance.models import ProgramResult
+from apps.finance.services.benchmark import (
+    generate_portfolio,
+    load_message_templates,
+    measure,
+)
+from apps.finance.signals import update_program_result_settings
+from apps.finance.tasks import (
+    apply_program_finish,
+    create_stats_snapshot,
+    create_user_program_history,
+    create_wallet_history,
+    defrost_funds,
+    make_daily_programs_accruals,
+)
+from core.utils import DisconnectSignal
+
+# ночные задачи в порядке расписания
+TASKS = [
+    defrost_funds,
+    apply_program_finish,
+    make_daily_programs_accruals,
+    create_wallet_history,
+    create_user_program_history,
+    create_stats_snapshot,
+]
+
+ENDPOINTS = [
+    ("api", "wallet-detail", {}),
+    ("api", "programs-list", {}),
+    ("api", "operation-list", {"page": 1}),
+    ("admin", "admin:finance_stats_changelist", {}),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Замер ночных задач и основных запросов на синтетическом портфеле. "
+        "Данные создаются в транзакции и откатываются после замеров, "
+        "запускать только на локальной базе"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--days", type=int, default=30)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, users, days, seed, **kwargs):
+        # иначе сохранение ProgramResult поставит в очередь настоящие начисления
+        with DisconnectSignal(pre_save, update_program_result_settings, ProgramResult):
+            with transaction.atomic():
+                self.run(users, days, seed)
+                transaction.set_rollback(True)
+
+    def run(self, users, days, seed):
+        load_message_templates()
+        generated = measure("generate_portfolio", generate_portfolio, users, days, seed)
+        self.report(generated)
+        for name, count in generated["result"].items():
+            print(f"    {name}: {count}")
+
+        user = User.objects.filter(wallet__programs__isnull=False).latest("pk")
+        admin = User.objects.create_superuser(
+            email=f"benchmark_admin_{seed}@benchmark.local", password=None
+        )
+        clients = {
+            "api": APIClient(SERVER_NAME="localhost"),
+            "admin": APIClient(SERVER_NAME="localhost"),
+        }
+        clients["api"].force_authenticate(user)
+        clients["admin"].force_login(admin)
+
+        for client_name, url_name, params in ENDPOINTS:
+            url = reverse(url_name)
+            result = measure(url, clients[client_name].get, url, params)
+            result["name"] = f"GET {url} {params or ''}".strip()
+            self.report(result, status=result["result"].status_code)
+
+        for task in TASKS:
+            self.report(measure(task.name, task))
+
+    def report(self, result, status=None):
+        status = f" [{status}]" if status else ""
+        print(
+            f"{result['name']:<60} {result['time']:>9.3f} s "
+            f"{result['queries']:>7} queries "
+            f"{result['memory'] / 2**20:>9.1f} MiB{status}"
+        )
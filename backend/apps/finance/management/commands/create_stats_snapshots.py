@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.utils.timezone import now, timedelta
+
+from apps.finance.services.stats import create_stats_snapshots, get_dates_range
+
+
+class Command(BaseCommand):
+    help = "Сохранить снимки показателей фонда за прошедшие дни"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=93)
+
+    def handle(self, days, **kwargs):
+        yesterday = now().date() - timedelta(days=1)
+        dates = get_dates_range(yesterday - timedelta(days=days - 1), yesterday)
+        create_stats_snapshots(dates)
+        print(f"Snapshots created: {dates[0]} - {dates[-1]}")
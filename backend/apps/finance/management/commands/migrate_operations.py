@@ -2,6 +2,7 @@ from django.core.management.base import BaseCommand
 
 from apps.finance.models import (
     OperationHistory,
+    OperationHistoryTotal,
     FrozenItem,
 )
 from apps.finance.models.operation_type import OperationType, MessageType
@@ -129,3 +130,4 @@ class Command(BaseCommand):
             o.insertion_data = {"user_id": o.description.ru.split(" ")[-1][2:]}
             o.save()
         OperationHistory.objects.filter(message_type__isnull=True).delete()
+        OperationHistoryTotal.objects.rebuild()
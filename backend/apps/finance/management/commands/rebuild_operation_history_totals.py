@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.finance.models import OperationHistoryTotal
+
+
+class Command(BaseCommand):
+    help = "Пересчитать итоги истории операций по дням"
+
+    def handle(self, *args, **options):
+        OperationHistoryTotal.objects.rebuild()
+        print(f"Totals rebuilt: {OperationHistoryTotal.objects.count()}")
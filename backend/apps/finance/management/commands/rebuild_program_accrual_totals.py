@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+
+from apps.finance.models import UserProgram, UserProgramAccrual
+from apps.finance.models.program import ACCRUAL_TOTALS_FIELDS
+
+
+class Command(BaseCommand):
+    help = "Пересчитать и сверить итоги начислений программ пользователей"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check", action="store_true", help="Только сверить, без пересчёта"
+        )
+
+    def handle(self, check=False, **kwargs):
+        if not check:
+            with transaction.atomic():
+                updated = UserProgram.objects.all().refresh_accrual_totals()
+            print(f"Programs updated: {updated}")
+
+        mismatches = self.verify()
+        print(f"Mismatches: {mismatches}")
+
+    def verify(self):
+        totals = dict(
+            UserProgramAccrual.objects.values("program")
+            .annotate(total=Sum("amount"))
+            .values_list("program", "total")
+        )
+        last_accruals = {}
+        for accrual in UserProgramAccrual.objects.order_by("program", "-created_at"):
+            last_accruals.setdefault(accrual.program_id, accrual)
+
+        mismatches = 0
+        for user_program in UserProgram.objects.only("pk", *ACCRUAL_TOTALS_FIELDS):
+            accrual = last_accruals.get(user_program.pk)
+            expected = {
+                "total_profit": totals.get(user_program.pk) or 0,
+                "last_accrual_amount": accrual and accrual.amount,
+                "last_accrual_percent": accrual and accrual.percent_amount,
+                "last_accrual_date": accrual and accrual.created_at,
+            }
+            for field, value in expected.items():
+                stored = getattr(user_program, field)
+                if stored != value:
+                    mismatches += 1
+                    print(
+                        f"UserProgram {user_program.pk}: "
+                        f"{field}={stored}, expected {value}"
+                    )
+        return mismatches
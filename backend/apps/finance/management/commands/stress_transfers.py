@@ -0,0 +1,149 @@
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from random import Random
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import Sum
+from django.db.models.signals import pre_save
+from django.utils.timezone import now
+
+from apps.accounts.models import Region, Settings, User
+from apps.finance.models import (
+    LedgerCheckpoint,
+    Operation,
+    Program,
+    ProgramResult,
+    Stats,
+    Wallet,
+    WalletSettings,
+)
+from apps.finance.services.benchmark import NO_CONFIRMATION_SETTINGS, create_base_data
+from apps.finance.signals import update_program_result_settings
+from core.utils import DisconnectSignal
+
+EMAIL_TEMPLATE = "stress_{seed}_{i}@benchmark.local"
+
+INITIAL_FREE = Decimal("1000000.00")
+
+
+class Command(BaseCommand):
+    help = (
+        "Параллельные переводы в нескольких процессах между синтетическими кошельками: проверка, что "
+        "балансы не теряют обновлений, и пропускная способность на разном "
+        "числе потоков. Данные сохраняются в базе и удаляются после замера, "
+        "запускать только на локальной базе"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--wallets", type=int, default=200)
+        parser.add_argument("--transfers", type=int, default=2000)
+        parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, wallets, transfers, workers, seed, **kwargs):
+        if wallets < 2:
+            raise CommandError("Нужно хотя бы два кошелька")
+        # иначе сохранение ProgramResult поставит в очередь настоящие начисления
+        with DisconnectSignal(pre_save, update_program_result_settings, ProgramResult):
+            existing = {
+                queryset.model: set(queryset.values_list("pk", flat=True))
+                for queryset in self.base_data()
+            }
+            wallet_ids = self.create_wallets(wallets, seed)
+            try:
+                for count in workers:
+                    self.run(wallet_ids, transfers, count, Random(seed + count))
+            finally:
+                User.objects.filter(wallet__in=wallet_ids).delete()
+                # базовые данные, созданные командой, а не найденные в базе
+                for queryset in self.base_data():
+                    queryset.exclude(pk__in=existing[queryset.model]).delete()
+
+    @staticmethod
+    def base_data() -> list:
+        """Данные, которые create_base_data создаёт, если их нет в базе"""
+        return [
+            User.objects.filter(business_account=True),
+            WalletSettings.objects.filter(wallet__isnull=True),
+            Program.objects.all(),
+            ProgramResult.objects.all(),
+            Stats.objects.all(),
+            Region.objects.all(),
+        ]
+
+    def create_wallets(self, wallets, seed) -> list:
+        with transaction.atomic():
+            create_base_data(now().date())
+            users = [
+                User.objects.create_user(
+                    email=EMAIL_TEMPLATE.format(seed=seed, i=i), password=None
+                )
+                for i in range(wallets)
+            ]
+            Settings.objects.filter(user__in=users).update(**NO_CONFIRMATION_SETTINGS)
+            Wallet.objects.filter(user__in=users).update(free=INITIAL_FREE)
+            # баланс задан напрямую, журнал начинается с новой отметки
+            LedgerCheckpoint.objects.open(Wallet.objects.filter(user__in=users))
+            # без комиссии балансы сверяются с операциями без округлений
+            WalletSettings.objects.filter(wallet__user__in=users).update(
+                commission_on_transfer=Decimal("0")
+            )
+        return [user.pk for user in users]
+
+    def run(self, wallet_ids, transfers, workers, random):
+        with transaction.atomic():
+            Wallet.objects.filter(pk__in=wallet_ids).update(free=INITIAL_FREE)
+            LedgerCheckpoint.objects.open(Wallet.objects.filter(pk__in=wallet_ids))
+        Operation.objects.filter(wallet__in=wallet_ids).delete()
+        pairs = [random.sample(wallet_ids, 2) for _ in range(transfers)]
+        amounts = [Decimal(random.randint(1, 10000)) / 100 for _ in range(transfers)]
+
+        # процессы, а не потоки: применение операции упирается в GIL,
+        # соединение с базой у каждого процесса своё
+        connections.close_all()
+        start = time.perf_counter()
+        with ProcessPoolExecutor(workers) as executor:
+            list(executor.map(self.transfer, pairs, amounts, chunksize=50))
+        elapsed = time.perf_counter() - start
+
+        lost = self.check_balances(wallet_ids)
+        print(
+            f"workers {workers:>3} {transfers:>7} transfers {elapsed:>9.3f} s "
+            f"{transfers / elapsed:>9.1f} ops/s lost updates: {lost}"
+        )
+        if lost:
+            raise CommandError(f"Балансы {lost} кошельков не сходятся с операциями")
+
+    @staticmethod
+    def transfer(pair, amount):
+        sender, receiver = pair
+        # как в запросе с ATOMIC_REQUESTS: операция применяется в post_save
+        with transaction.atomic():
+            Operation.objects.create(
+                type=Operation.Type.TRANSFER,
+                wallet_id=sender,
+                receiver_id=receiver,
+                amount_free=amount,
+                amount_frozen=Decimal("0.0"),
+            )
+
+    @staticmethod
+    def check_balances(wallet_ids) -> int:
+        """Число кошельков, баланс которых не равен начальному с учётом переводов"""
+        expected = defaultdict(lambda: INITIAL_FREE)
+        transfers = Operation.objects.filter(
+            type=Operation.Type.TRANSFER, wallet__in=wallet_ids, done=True
+        )
+        for wallet, total in transfers.values_list("wallet").annotate(
+            total=Sum("amount_free")
+        ):
+            expected[wallet] -= total
+        for wallet, total in transfers.values_list("receiver").annotate(
+            total=Sum("amount_net")
+        ):
+            expected[wallet] += total
+        balances = Wallet.objects.filter(pk__in=wallet_ids).values_list("pk", "free")
+        return sum(free != expected[pk] for pk, free in balances)
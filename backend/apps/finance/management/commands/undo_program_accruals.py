@@ -7,12 +7,16 @@ from decimal import Decimal
 from apps.finance.models import (
     UserProgramHistory,
     OperationHistory,
+    OperationHistoryTotal,
     Wallet,
     Program,
     Operation,
     UserProgramAccrual,
+    StatsSnapshot,
 )
 from apps.finance.models.operation_type import OperationType
+from apps.finance.services.commissions import compact_commissions
+from apps.finance.services.stats import create_stats_snapshots
 
 
 class Command(BaseCommand):
@@ -111,9 +115,11 @@ class Command(BaseCommand):
                     print("Program history not found")
 
         # откат комиссий
+        compact_commissions()
         commissions_wallet = Wallet.objects.get(user__business_account=True)
-        accruals_commissions = commissions_wallet.operations_history.filter(
-            created_at__date=date,
+        accruals_commissions = commissions_wallet.operations_history.on_date(
+            date
+        ).filter(
             operation_type__in=[
                 OperationType.SUCCESS_FEE,
                 OperationType.MANAGEMENT_FEE,
@@ -143,12 +149,18 @@ class Command(BaseCommand):
         # accruals_commissions.delete()
 
         # откат истории операций
-        OperationHistory.objects.filter(
-            operation_type=OperationType.PROGRAM_ACCRUAL,
-            created_at__date=date,
+        OperationHistory.objects.on_date(date).filter(
+            operation_type=OperationType.PROGRAM_ACCRUAL
         ).delete()
 
         # откат операций
         Operation.objects.filter(
             type=OperationType.PROGRAM_ACCRUAL, created_at__date=date
         ).delete()
+
+        # пересчёт итогов истории операций
+        OperationHistoryTotal.objects.rebuild(date=date)
+
+        # снимок общей статистики за день пересчитывается без отменённых начислений
+        if StatsSnapshot.objects.filter(date=date.date()).exists():
+            create_stats_snapshots([date.date()])
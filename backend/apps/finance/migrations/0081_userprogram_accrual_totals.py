@@ -0,0 +1,74 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:13
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def forwards(apps, _):
+    UserProgram = apps.get_model("finance", "UserProgram")
+    UserProgramAccrual = apps.get_model("finance", "UserProgramAccrual")
+    accruals = UserProgramAccrual.objects.filter(program=OuterRef("pk"))
+    last_accrual = accruals.order_by("-created_at")
+    total = accruals.values("program").annotate(total=Sum("amount")).values("total")
+    UserProgram.objects.update(
+        total_profit=Coalesce(Subquery(total), Decimal("0.0")),
+        last_accrual_amount=Subquery(last_accrual.values("amount")[:1]),
+        last_accrual_percent=Subquery(last_accrual.values("percent_amount")[:1]),
+        last_accrual_date=Subquery(last_accrual.values("created_at")[:1]),
+    )
+
+
+def backwards(apps, _):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0080_alter_program_description"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userprogram",
+            name="last_accrual_amount",
+            field=models.DecimalField(
+                blank=True,
+                decimal_places=2,
+                max_digits=10,
+                null=True,
+                verbose_name="Последнее начисление",
+            ),
+        ),
+        migrations.AddField(
+            model_name="userprogram",
+            name="last_accrual_date",
+            field=models.DateField(
+                blank=True, null=True, verbose_name="Дата последнего начисления"
+            ),
+        ),
+        migrations.AddField(
+            model_name="userprogram",
+            name="last_accrual_percent",
+            field=models.DecimalField(
+                blank=True,
+                decimal_places=2,
+                max_digits=6,
+                null=True,
+                verbose_name="Последнее начисление в процентах от депозита",
+            ),
+        ),
+        migrations.AddField(
+            model_name="userprogram",
+            name="total_profit",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=Decimal("0.0"),
+                max_digits=10,
+                verbose_name="Суммарный доход",
+            ),
+        ),
+        migrations.RunPython(forwards, backwards),
+    ]
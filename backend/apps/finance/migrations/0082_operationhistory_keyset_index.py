@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0081_userprogram_accrual_totals"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="operationhistory",
+            index=models.Index(
+                fields=["wallet", "-created_at", "-id"],
+                name="operation_history_keyset_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,134 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:25
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+import django.db.models.deletion
+
+
+def forwards(apps, _):
+    OperationHistory = apps.get_model("finance", "OperationHistory")
+    OperationHistoryTotal = apps.get_model("finance", "OperationHistoryTotal")
+    rows = (
+        OperationHistory.objects.exclude(amount__isnull=True)
+        .annotate(date=TruncDate("created_at"))
+        .values("wallet_id", "date", "operation_type")
+        .annotate(
+            total_in=Coalesce(Sum("amount", filter=Q(amount__gt=0)), Decimal("0.0")),
+            total_out=Coalesce(Sum("amount", filter=Q(amount__lt=0)), Decimal("0.0")),
+        )
+        .order_by()
+    )
+    totals = {}
+    for row in rows:
+        key = (row["wallet_id"], row["date"], row["operation_type"] or "")
+        total_in, total_out = totals.get(key, (0, 0))
+        totals[key] = (total_in + row["total_in"], total_out + row["total_out"])
+    OperationHistoryTotal.objects.bulk_create(
+        [
+            OperationHistoryTotal(
+                wallet_id=wallet_id,
+                date=date,
+                operation_type=operation_type,
+                total_in=total_in,
+                total_out=total_out,
+            )
+            for (wallet_id, date, operation_type), (
+                total_in,
+                total_out,
+            ) in totals.items()
+        ],
+        batch_size=1000,
+    )
+
+
+def backwards(apps, _):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0082_operationhistory_keyset_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OperationHistoryTotal",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Дата")),
+                (
+                    "operation_type",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("replenishment", "Пополнение"),
+                            ("withdrawal", "Снятие"),
+                            ("transfer", "Перевод"),
+                            ("branch_income", "Доход филиала"),
+                            ("program_start", "Запуск программы"),
+                            ("program_closure", "Закрытие программы"),
+                            ("program_replenishment", "Пополнение программы"),
+                            (
+                                "program_replenishment_cancel",
+                                "Отмена пополнения программы",
+                            ),
+                            ("defrost", "Разморозка активов"),
+                            ("extra_fee_writeoff", "Списание комиссии Extra Fee"),
+                            ("program_accrual", "Начисление по программе"),
+                            ("replenishment_fee", "Комиссия за пополнения"),
+                            ("withdrawal_fee", "Комиссия за вывод средств"),
+                            ("transfer_fee", "Комиссия за внутренние переводы"),
+                            ("success_fee", "Success fee"),
+                            ("management_fee", "Management fee"),
+                            ("extra_fee", "Extra fee"),
+                        ],
+                        default="",
+                    ),
+                ),
+                (
+                    "total_in",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=10,
+                        verbose_name="Поступления",
+                    ),
+                ),
+                (
+                    "total_out",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=10,
+                        verbose_name="Списания",
+                    ),
+                ),
+                (
+                    "wallet",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="operations_history_totals",
+                        to="finance.wallet",
+                        verbose_name="Кошелёк",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Итоги истории операций",
+                "verbose_name_plural": "Итоги истории операций",
+                "unique_together": {("wallet", "date", "operation_type")},
+            },
+        ),
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0083_operationhistorytotal"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StatsSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Дата")),
+                (
+                    "name",
+                    models.CharField(
+                        choices=[
+                            ("wallet", "Сумма в кошельках"),
+                            ("st_1", "Сумма в программах ST-1"),
+                            ("st_2", "Сумма в программах ST-2"),
+                            ("st_3", "Сумма в программах ST-3"),
+                            (
+                                "to_withdraw",
+                                "Поставлено на вывод (ожидает рассмотрения)",
+                            ),
+                            ("to_start", "Ожидает запуска"),
+                            ("to_replenish", "Ожидает пополнения"),
+                            ("total_fund_balance", "ИТОГО БАЛАНС ФОНДА"),
+                            ("branch_ru", "Доход филиала Россия"),
+                            ("branch_cn", "Доход филиала Китай"),
+                            ("branch_us", "Доход филиала США"),
+                            ("net_profit", "Начисленная прибыль (чистая)"),
+                            ("gross_profit", "Начисленная прибыль (базовая)"),
+                            ("success_fee", "Удержано Success Fee"),
+                            (
+                                "success_fee_net",
+                                "Удержано Success Fee после вычета дохода Филиала",
+                            ),
+                            ("extra_fee", "Удержано Extra Fee"),
+                            ("management_fee", "Удержано Management Fee"),
+                            ("users_total", "Кол-во зарегистрированных пользователей"),
+                            ("users_active", "Кол-во активных пользователей"),
+                        ],
+                        verbose_name="Показатель",
+                    ),
+                ),
+                (
+                    "value",
+                    models.DecimalField(
+                        decimal_places=6, max_digits=20, verbose_name="Значение"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Снимок показателя",
+                "verbose_name_plural": "Снимки показателей фонда",
+                "unique_together": {("date", "name")},
+            },
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:15
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0084_statssnapshot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CommissionIncrement",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "operation_type",
+                    models.CharField(
+                        choices=[
+                            ("replenishment", "Пополнение"),
+                            ("withdrawal", "Снятие"),
+                            ("transfer", "Перевод"),
+                            ("branch_income", "Доход филиала"),
+                            ("program_start", "Запуск программы"),
+                            ("program_closure", "Закрытие программы"),
+                            ("program_replenishment", "Пополнение программы"),
+                            (
+                                "program_replenishment_cancel",
+                                "Отмена пополнения программы",
+                            ),
+                            ("defrost", "Разморозка активов"),
+                            ("extra_fee_writeoff", "Списание комиссии Extra Fee"),
+                            ("program_accrual", "Начисление по программе"),
+                            ("replenishment_fee", "Комиссия за пополнения"),
+                            ("withdrawal_fee", "Комиссия за вывод средств"),
+                            ("transfer_fee", "Комиссия за внутренние переводы"),
+                            ("success_fee", "Success fee"),
+                            ("management_fee", "Management fee"),
+                            ("extra_fee", "Extra fee"),
+                        ]
+                    ),
+                ),
+                (
+                    "amount",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=10, verbose_name="Сумма"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="Дата и время"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Начисленная комиссия",
+                "verbose_name_plural": "Начисленные комиссии",
+            },
+        ),
+    ]
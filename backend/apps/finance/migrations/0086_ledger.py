@@ -0,0 +1,154 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:21
+
+from decimal import Decimal
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def forwards(apps, _):
+    """Начальные отметки с текущими балансами всех кошельков"""
+    Wallet = apps.get_model("finance", "Wallet")
+    LedgerCheckpoint = apps.get_model("finance", "LedgerCheckpoint")
+    rows = Wallet.objects.values_list("pk", "free", "frozen")
+    created_at = django.utils.timezone.now()
+    LedgerCheckpoint.objects.bulk_create(
+        [
+            LedgerCheckpoint(
+                wallet_id=pk,
+                free=free,
+                frozen=frozen,
+                created_at=created_at,
+                opening=True,
+            )
+            for pk, free, frozen in rows.iterator(chunk_size=2000)
+        ],
+        batch_size=2000,
+    )
+
+
+def backwards(apps, _):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0085_commissionincrement"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LedgerEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "free",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=Decimal("0.0"),
+                        max_digits=10,
+                        verbose_name="Доступно",
+                    ),
+                ),
+                (
+                    "frozen",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=Decimal("0.0"),
+                        max_digits=10,
+                        verbose_name="Заморожено",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="Дата и время"
+                    ),
+                ),
+                (
+                    "wallet",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ledger_entries",
+                        to="finance.wallet",
+                        verbose_name="Кошелёк",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Запись журнала балансов",
+                "verbose_name_plural": "Журнал балансов",
+                "indexes": [
+                    models.Index(
+                        fields=["wallet", "created_at"], name="ledger_entry_wallet_idx"
+                    ),
+                    models.Index(
+                        fields=["created_at"], name="ledger_entry_created_idx"
+                    ),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="LedgerCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "free",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=Decimal("0.0"),
+                        max_digits=10,
+                        verbose_name="Доступно",
+                    ),
+                ),
+                (
+                    "frozen",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=Decimal("0.0"),
+                        max_digits=10,
+                        verbose_name="Заморожено",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(verbose_name="Дата и время")),
+                ("opening", models.BooleanField(default=False)),
+                (
+                    "wallet",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ledger_checkpoints",
+                        to="finance.wallet",
+                        verbose_name="Кошелёк",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Отметка баланса",
+                "verbose_name_plural": "Отметки балансов",
+                "indexes": [
+                    models.Index(
+                        fields=["wallet", "-created_at"],
+                        name="ledger_checkpoint_wallet_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(forwards, backwards),
+    ]
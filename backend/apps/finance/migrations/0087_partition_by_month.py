@@ -0,0 +1,185 @@
+from datetime import datetime
+
+from dateutil.relativedelta import relativedelta
+from django.db import migrations
+from django.utils import timezone
+
+KEY = "created_at"
+
+# текущий и следующий месяц, дальше секции создаёт задача create_partitions
+MONTHS_AHEAD = 2
+
+# индексы и ограничения старой таблицы переименовываются, под исходными
+# именами они создаются на секционированной таблице
+TABLES = {
+    "finance_operationhistory": dict(
+        constraints={
+            "finance_operationhis_wallet_id_ef004ff7_fk_finance_w": (
+                "finance_operationhistory_legacy_wallet_id_fk"
+            ),
+        },
+        indexes={
+            "finance_operationhistory_wallet_id_ef004ff7": (
+                "finance_operationhistory_legacy_wallet_id"
+            ),
+            "operation_history_keyset_idx": "operation_history_legacy_keyset_idx",
+        },
+        statements=[
+            "CREATE INDEX finance_operationhistory_wallet_id_ef004ff7 "
+            "ON finance_operationhistory (wallet_id)",
+            "CREATE INDEX operation_history_keyset_idx "
+            "ON finance_operationhistory (wallet_id, created_at DESC, id DESC)",
+            "ALTER TABLE finance_operationhistory "
+            "ADD CONSTRAINT finance_operationhis_wallet_id_ef004ff7_fk_finance_w "
+            "FOREIGN KEY (wallet_id) REFERENCES finance_wallet (user_id) "
+            "DEFERRABLE INITIALLY DEFERRED",
+        ],
+    ),
+    "finance_userprogramaccrual": dict(
+        constraints={
+            "unique_program_accrual_created_at": (
+                "unique_program_accrual_legacy_created_at"
+            ),
+            "finance_userprograma_program_id_7dd4a82c_fk_finance_u": (
+                "finance_userprogramaccrual_legacy_program_id_fk"
+            ),
+        },
+        indexes={
+            "finance_userprogramaccrual_program_id_7dd4a82c": (
+                "finance_userprogramaccrual_legacy_program_id"
+            ),
+        },
+        statements=[
+            "CREATE INDEX finance_userprogramaccrual_program_id_7dd4a82c "
+            "ON finance_userprogramaccrual (program_id)",
+            "ALTER TABLE finance_userprogramaccrual "
+            "ADD CONSTRAINT unique_program_accrual_created_at "
+            "UNIQUE (program_id, created_at)",
+            "ALTER TABLE finance_userprogramaccrual "
+            "ADD CONSTRAINT finance_userprograma_program_id_7dd4a82c_fk_finance_u "
+            "FOREIGN KEY (program_id) REFERENCES finance_userprogram (id) "
+            "DEFERRABLE INITIALLY DEFERRED",
+        ],
+    ),
+}
+
+
+def partition_name(table, start):
+    # имя как у секций, которые создаёт psqlextra: finance_operationhistory_2026_oct
+    return f"{table}_{start.strftime('%Y_%b').lower()}"
+
+
+def partition_by_month(schema_editor, table, constraints, indexes, statements):
+    """
+    Заменить таблицу секционированной по месяцам. Старая таблица целиком
+    становится секцией legacy со всеми строками до начала текущего месяца,
+    строки текущего и следующих месяцев переносятся в месячные секции
+    """
+    execute = schema_editor.execute
+    legacy = f"{table}_legacy"
+    execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+    for name, new_name in constraints.items():
+        execute(f"ALTER TABLE {legacy} RENAME CONSTRAINT {name} TO {new_name}")
+    for name, new_name in indexes.items():
+        execute(f"ALTER INDEX {name} RENAME TO {new_name}")
+
+    # первичный ключ секции строится при присоединении по (id, created_at),
+    # identity-столбец у секции невозможен, id выдаёт последовательность
+    # секционированной таблицы
+    execute(f"ALTER TABLE {legacy} DROP CONSTRAINT {table}_pkey")
+    execute(f"ALTER TABLE {legacy} ALTER COLUMN id DROP IDENTITY")
+    execute(
+        f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS, "
+        f"PRIMARY KEY (id, {KEY})) PARTITION BY RANGE ({KEY})"
+    )
+    execute(f"CREATE SEQUENCE {table}_id_seq OWNED BY {table}.id")
+    execute(
+        f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval('{table}_id_seq')"
+    )
+    execute(
+        f"SELECT setval('{table}_id_seq', COALESCE(MAX(id), 0) + 1, false) FROM {legacy}"
+    )
+    for statement in statements:
+        execute(statement)
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"SELECT MAX({KEY}) FROM {legacy}")
+        (last,) = cursor.fetchone()
+    today = timezone.now().date()
+    start = today.replace(day=1)
+    end = start + relativedelta(months=MONTHS_AHEAD)
+    if last is not None:
+        if isinstance(last, datetime):
+            last = last.date()
+        end = max(end, last.replace(day=1) + relativedelta(months=1))
+    month = start
+    while month < end:
+        execute(
+            f"CREATE TABLE {partition_name(table, month)} PARTITION OF {table} "
+            f"FOR VALUES FROM (%s) TO (%s)",
+            (month.isoformat(), (month + relativedelta(months=1)).isoformat()),
+        )
+        month += relativedelta(months=1)
+
+    execute(
+        f"INSERT INTO {table} SELECT * FROM {legacy} WHERE {KEY} >= %s",
+        (start.isoformat(),),
+    )
+    execute(f"DELETE FROM {legacy} WHERE {KEY} >= %s", (start.isoformat(),))
+    # с этим ограничением присоединение секции не перепроверяет строки
+    execute(
+        f"ALTER TABLE {legacy} ADD CONSTRAINT {legacy}_range "
+        f"CHECK ({KEY} IS NOT NULL AND {KEY} < %s)",
+        (start.isoformat(),),
+    )
+    execute(
+        f"ALTER TABLE {table} ATTACH PARTITION {legacy} "
+        f"FOR VALUES FROM (MINVALUE) TO (%s)",
+        (start.isoformat(),),
+    )
+    execute(f"ALTER TABLE {legacy} DROP CONSTRAINT {legacy}_range")
+
+
+def unpartition(schema_editor, table, constraints, indexes, statements):
+    """
+    Вернуть обычную таблицу: строки всех секций копируются в новую таблицу,
+    секционированная таблица удаляется вместе с секциями и последовательностью,
+    индексы и ограничения создаются заново под исходными именами
+    """
+    execute = schema_editor.execute
+    plain = f"{table}_plain"
+    # без INCLUDING DEFAULTS: значение id по умолчанию ссылается на
+    # последовательность секционированной таблицы, которая будет удалена
+    execute(f"CREATE TABLE {plain} (LIKE {table})")
+    execute(f"INSERT INTO {plain} SELECT * FROM {table}")
+    execute(f"DROP TABLE {table}")
+    execute(f"ALTER TABLE {plain} RENAME TO {table}")
+    execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id)")
+    execute(f"ALTER TABLE {table} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY")
+    execute(
+        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+        f"COALESCE(MAX(id), 0) + 1, false) FROM {table}"
+    )
+    for statement in statements:
+        execute(statement)
+
+
+def forwards(apps, schema_editor):
+    for table, options in TABLES.items():
+        partition_by_month(schema_editor, table, **options)
+
+
+def backwards(apps, schema_editor):
+    for table, options in TABLES.items():
+        unpartition(schema_editor, table, **options)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0086_ledger"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:34
+
+from django.db import migrations
+import psqlextra.manager.manager
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0087_partition_by_month"),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name="userprogramaccrual",
+            managers=[
+                ("objects", psqlextra.manager.manager.PostgresManager()),
+            ],
+        ),
+    ]
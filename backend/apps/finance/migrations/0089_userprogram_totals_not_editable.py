@@ -0,0 +1,59 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:47
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0088_userprogramaccrual_managers"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="userprogram",
+            name="last_accrual_amount",
+            field=models.DecimalField(
+                blank=True,
+                decimal_places=2,
+                editable=False,
+                max_digits=10,
+                null=True,
+                verbose_name="Последнее начисление",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="userprogram",
+            name="last_accrual_date",
+            field=models.DateField(
+                blank=True,
+                editable=False,
+                null=True,
+                verbose_name="Дата последнего начисления",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="userprogram",
+            name="last_accrual_percent",
+            field=models.DecimalField(
+                blank=True,
+                decimal_places=2,
+                editable=False,
+                max_digits=6,
+                null=True,
+                verbose_name="Последнее начисление в процентах от депозита",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="userprogram",
+            name="total_profit",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=Decimal("0.0"),
+                editable=False,
+                max_digits=10,
+                verbose_name="Суммарный доход",
+            ),
+        ),
+    ]
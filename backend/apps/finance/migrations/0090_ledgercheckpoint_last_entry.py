@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:40
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def forwards(apps, _):
+    """Отметка включает записи своего кошелька, созданные не позже неё"""
+    LedgerCheckpoint = apps.get_model("finance", "LedgerCheckpoint")
+    LedgerEntry = apps.get_model("finance", "LedgerEntry")
+    last_entry = (
+        LedgerEntry.objects.filter(
+            wallet=OuterRef("wallet"), created_at__lte=OuterRef("created_at")
+        )
+        .values("wallet")
+        .annotate(last=Max("pk"))
+        .values("last")
+    )
+    LedgerCheckpoint.objects.update(last_entry_id=Coalesce(Subquery(last_entry), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0089_userprogram_totals_not_editable"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ledgercheckpoint",
+            name="last_entry_id",
+            field=models.BigIntegerField(
+                default=0, verbose_name="Последняя запись журнала"
+            ),
+        ),
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
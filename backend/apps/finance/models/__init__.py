@@ -10,6 +10,7 @@ from .operation_confirmation import OperationConfirmation, DestinationType
 from .operation_message import OperationMessage
 
 # from .operation_history import OperationHistory
+from .operation_history import OperationHistoryTotal
 from .program import (
     Program,
     UserProgram,
@@ -20,5 +21,7 @@ from .program import (
 )
 from .wallet import Wallet, WalletHistory, WalletSettings, MasterWallet
 from .frozen import FrozenItem
+from .commission import CommissionIncrement
+from .ledger import LedgerCheckpoint, LedgerEntry
 from .holidays import Holidays
-from .stats import Stats
+from .stats import Stats, StatsSnapshot
@@ -0,0 +1,33 @@
+from decimal import Decimal
+
+from django.db import models
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.utils import decimal_usdt
+
+from .operation_type import OperationType
+
+
+class CommissionIncrementQuerySet(models.QuerySet):
+    def total(self) -> Decimal:
+        return self.aggregate(total=Coalesce(Sum("amount"), Decimal("0.0")))["total"]
+
+
+class CommissionIncrement(models.Model):
+    """
+    Комиссия, ещё не перенесённая в историю операций и баланс бизнес-кошелька.
+    Операции только добавляют записи и не блокируют общих строк, переносит
+    их задача compact_commissions
+    """
+
+    operation_type = models.CharField(choices=OperationType.choices)
+    amount = models.DecimalField("Сумма", **decimal_usdt)
+    created_at = models.DateTimeField("Дата и время", default=timezone.now)
+
+    objects = CommissionIncrementQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Начисленная комиссия"
+        verbose_name_plural = "Начисленные комиссии"
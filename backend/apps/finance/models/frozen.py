@@ -1,5 +1,6 @@
 from decimal import Decimal
 from django.db import models
+from django.db.models import Case, Count, F, Sum, Value, When
 from django.utils.timezone import now, timedelta
 
 
@@ -7,6 +8,74 @@ from apps.finance.services.wallet_settings_attr import get_wallet_settings_attr
 from core.utils import blank_and_null, decimal_usdt
 
 
+# порядок списания замороженных сумм: FIFO - сначала ближайшие к разморозке,
+# LIFO - сначала самые поздние (прежний порядок списания по Meta.ordering)
+FIFO = ("defrost_date", "pk")
+LIFO = ("-defrost_date", "-pk")
+
+
+class FrozenItemQuerySet(models.QuerySet):
+    def pending(self):
+        return self.filter(status=FrozenItem.Status.INITIAL)
+
+    def consume(self, amount: Decimal, policy=LIFO) -> list[int]:
+        """
+        Списать amount с ожидающих разморозки сумм в порядке policy.
+        Суммы блокируются select_for_update, из базы читаются только id и
+        суммы, списание применяется одним UPDATE. Возвращает id затронутых сумм
+        """
+        lots = (
+            self.pending()
+            .select_for_update()
+            .order_by(*policy)
+            .values_list("pk", "amount")
+        )
+        # суммы, списанные целиком, и последняя сумма, списанная частично
+        consumed, partial_pk, partial_value = [], None, Decimal("0.0")
+        rest = amount
+        for pk, lot_amount in lots:
+            if rest <= 0:
+                break
+            if lot_amount <= rest:
+                consumed.append(pk)
+                rest -= lot_amount
+            else:
+                partial_pk, partial_value = pk, rest
+                rest = 0
+
+        pks = consumed + ([partial_pk] if partial_pk else [])
+        if pks:
+            FrozenItem.objects.filter(pk__in=pks).update(
+                status=Case(
+                    When(pk__in=consumed, then=Value(FrozenItem.Status.DONE)),
+                    default=F("status"),
+                ),
+                amount=Case(
+                    When(pk=partial_pk, then=F("amount") - partial_value),
+                    default=F("amount"),
+                ),
+            )
+        return pks
+
+    def summary(self) -> dict:
+        """
+        Ожидающие разморозки суммы без загрузки самих записей: всего,
+        количество, ближайшая дата и график разморозки по датам
+        """
+        schedule = list(
+            self.pending()
+            .values("defrost_date")
+            .annotate(amount=Sum("amount"), count=Count("pk"))
+            .order_by("defrost_date")
+        )
+        return {
+            "total": sum((row["amount"] for row in schedule), Decimal("0.0")),
+            "count": sum(row["count"] for row in schedule),
+            "next_defrost_date": schedule[0]["defrost_date"] if schedule else None,
+            "schedule": schedule,
+        }
+
+
 class FrozenItem(models.Model):
     class Status(models.TextChoices):
         INITIAL = "initial", "Ожидает разморозки"
@@ -24,6 +93,8 @@ class FrozenItem(models.Model):
     defrost_date = models.DateField("Срок разморозки", **blank_and_null)
     status = models.CharField("Статус", choices=Status.choices, default=Status.INITIAL)
 
+    objects = FrozenItemQuerySet.as_manager()
+
     class Meta:
         ordering = ["-defrost_date"]
         verbose_name = "Замороженная сумма"
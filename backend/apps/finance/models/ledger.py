@@ -0,0 +1,191 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import OperationalError, connection, models, transaction
+from django.db.models import Max, OuterRef, Subquery, Sum
+from django.utils import timezone
+
+from core.utils import decimal_usdt
+
+
+class LedgerEntry(models.Model):
+    """Изменение баланса кошелька. Записи только добавляются"""
+
+    wallet = models.ForeignKey(
+        "Wallet",
+        verbose_name="Кошелёк",
+        related_name="ledger_entries",
+        on_delete=models.CASCADE,
+    )
+    free = models.DecimalField("Доступно", **decimal_usdt, default=Decimal("0.0"))
+    frozen = models.DecimalField("Заморожено", **decimal_usdt, default=Decimal("0.0"))
+    created_at = models.DateTimeField("Дата и время", default=timezone.now)
+
+    class Meta:
+        verbose_name = "Запись журнала балансов"
+        verbose_name_plural = "Журнал балансов"
+        indexes = [
+            models.Index(
+                fields=["wallet", "created_at"], name="ledger_entry_wallet_idx"
+            ),
+            models.Index(fields=["created_at"], name="ledger_entry_created_idx"),
+        ]
+
+
+class LedgerCheckpointQuerySet(models.QuerySet):
+    def open(self, wallets):
+        """
+        Начальные отметки кошельков с их текущим балансом, прежние записи
+        журнала кошельков в него уже входят
+        """
+        wallets = list(wallets)
+        created_at = timezone.now()
+        last_entries = dict(
+            LedgerEntry.objects.filter(wallet__in=wallets)
+            .values("wallet")
+            .annotate(last=Max("pk"))
+            .values_list("wallet", "last")
+            .order_by()
+        )
+        return self.bulk_create(
+            [
+                LedgerCheckpoint(
+                    wallet=wallet,
+                    created_at=created_at,
+                    free=wallet.free,
+                    frozen=wallet.frozen,
+                    last_entry_id=last_entries.get(wallet.pk, 0),
+                    opening=True,
+                )
+                for wallet in wallets
+            ],
+            batch_size=1000,
+        )
+
+    def balances_at(self, wallets, at) -> dict:
+        """
+        Балансы кошельков на момент at: {wallet_id: (free, frozen)}. Последняя
+        отметка до at плюс записи журнала до at, которые в неё не вошли,
+        кошельки, открытые после at, в результат не попадают
+        """
+        return self._balances(
+            wallets, at, LedgerEntry.objects.filter(created_at__lte=at)
+        )
+
+    def _balances(self, wallets, at, entries) -> dict:
+        checkpoints = (
+            self.filter(wallet__in=wallets, created_at__lte=at)
+            .order_by("wallet", "-created_at")
+            .distinct("wallet")
+            .values_list("wallet", "free", "frozen")
+        )
+        balances = {wallet: (free, frozen) for wallet, free, frozen in checkpoints}
+        if not balances:
+            return {}
+
+        last_entry = (
+            self.filter(wallet=OuterRef("wallet"), created_at__lte=at)
+            .order_by("-created_at")
+            .values("last_entry_id")[:1]
+        )
+        deltas = (
+            entries.filter(wallet__in=balances)
+            .filter(pk__gt=Subquery(last_entry))
+            .values("wallet")
+            .annotate(free=Sum("free"), frozen=Sum("frozen"))
+            .values_list("wallet", "free", "frozen")
+            .order_by()
+        )
+        for wallet, free, frozen in deltas:
+            balance_free, balance_frozen = balances[wallet]
+            balances[wallet] = (balance_free + free, balance_frozen + frozen)
+        return balances
+
+    def create_checkpoints(self) -> int:
+        """
+        Отметки для кошельков, баланс которых менялся после предыдущего
+        запуска. Отметка включает записи журнала до id, ниже которого все
+        транзакции завершены, запись транзакции, закоммиченной позже, войдёт
+        в следующую отметку. Запуск пропускается, если пишущие транзакции
+        не завершились за LEDGER_CHECKPOINT_LOCK_TIMEOUT
+        """
+        watermark = self._committed_watermark()
+        if watermark is None:
+            return 0
+        created_at, last_entry_id = watermark
+        since = self.filter(opening=False).aggregate(since=Max("last_entry_id"))[
+            "since"
+        ]
+        entries = LedgerEntry.objects.filter(pk__lte=last_entry_id)
+        wallets = set(
+            entries.filter(pk__gt=since or 0)
+            .values_list("wallet", flat=True)
+            .order_by()
+        )
+        checkpoints = self.bulk_create(
+            [
+                LedgerCheckpoint(
+                    wallet_id=wallet,
+                    created_at=created_at,
+                    free=free,
+                    frozen=frozen,
+                    last_entry_id=last_entry_id,
+                )
+                for wallet, (free, frozen) in self._balances(
+                    wallets, created_at, entries
+                ).items()
+            ],
+            batch_size=1000,
+        )
+        return len(checkpoints)
+
+    @staticmethod
+    def _committed_watermark():
+        """
+        (время, id последней записи журнала), причём все транзакции с записями
+        до этого id завершены, или None. Блокировка SHARE дожидается коммита
+        или отката добавивших записи транзакций и сразу снимается, записи,
+        закоммиченные позже, получат больший id
+        """
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    "SET LOCAL lock_timeout = %s",
+                    [settings.LEDGER_CHECKPOINT_LOCK_TIMEOUT],
+                )
+                cursor.execute(f"LOCK TABLE {LedgerEntry._meta.db_table} IN SHARE MODE")
+                last_entry_id = LedgerEntry.objects.aggregate(last=Max("pk"))["last"]
+                return timezone.now(), last_entry_id or 0
+        except OperationalError:
+            # долгая транзакция, например ночные начисления, ещё пишет журнал
+            return None
+
+
+class LedgerCheckpoint(models.Model):
+    """Баланс кошелька на момент времени с учётом всех записей журнала до него"""
+
+    wallet = models.ForeignKey(
+        "Wallet",
+        verbose_name="Кошелёк",
+        related_name="ledger_checkpoints",
+        on_delete=models.CASCADE,
+    )
+    free = models.DecimalField("Доступно", **decimal_usdt, default=Decimal("0.0"))
+    frozen = models.DecimalField("Заморожено", **decimal_usdt, default=Decimal("0.0"))
+    created_at = models.DateTimeField("Дата и время")
+    # последняя запись журнала, вошедшая в отметку, записи с большим id
+    # добавляются к балансу отметки
+    last_entry_id = models.BigIntegerField("Последняя запись журнала", default=0)
+    # начальная отметка: баланс кошелька при создании или при вводе журнала
+    opening = models.BooleanField(default=False)
+
+    objects = LedgerCheckpointQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Отметка баланса"
+        verbose_name_plural = "Отметки балансов"
+        indexes = [
+            models.Index(
+                fields=["wallet", "-created_at"], name="ledger_checkpoint_wallet_idx"
+            ),
+        ]
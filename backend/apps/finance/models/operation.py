@@ -14,12 +14,13 @@ from apps.finance.services import (
 from apps.finance.services.commissions import add_commission_to_history
 from apps.telegram.tasks import send_template_telegram_message_task
 from apps.telegram.models import MessageType as TelegramMessageType
+from core.models import OutboxMessage
 from core.utils import blank_and_null, decimal_usdt
 
 from .program import Program, UserProgram, UserProgramReplenishment
 from .wallet import Wallet
 from .frozen import FrozenItem
-from .operation_history import OperationHistory
+from .operation_history import OperationHistory, OperationHistoryTotal
 from .operation_type import OperationType, MessageType
 
 
@@ -116,6 +117,7 @@ class Operation(models.Model):
 
     def apply(self):
         with transaction.atomic():
+            Wallet.objects.lock(self.wallet_id, self.receiver_id)
             done = getattr(self, f"_apply_{self.type}")()
             self.done = done
             self.save()
@@ -126,7 +128,7 @@ class Operation(models.Model):
 
     def _apply_withdrawal(self):  # ready
         self._apply_commission(attr="commission_on_withdraw", included=True)
-        self.wallet.update_balance(free=-self.amount)
+        self.wallet.update_balance(free=-self.amount, check_funds=True)
 
         withdrawal_request = WithdrawalRequest.objects.create(
             operation=self,
@@ -146,7 +148,8 @@ class Operation(models.Model):
             amount=-self.amount,
         )
         if telegram_id := self.wallet.user.telegram_id:
-            send_template_telegram_message_task.delay(
+            OutboxMessage.objects.add(
+                send_template_telegram_message_task,
                 telegram_id,
                 message_type=TelegramMessageType.WITHDRAWAL_REQUEST,
                 insertion_data={
@@ -188,7 +191,9 @@ class Operation(models.Model):
             commission_type=OperationType.TRANSFER_FEE, amount=self.commission
         )
 
-        self.wallet.update_balance(free=-self.amount_free, frozen=-self.amount_frozen)
+        self.wallet.update_balance(
+            free=-self.amount_free, frozen=-self.amount_frozen, check_funds=True
+        )
 
         for section in ["free", "frozen"]:
             if amount := getattr(self, f"amount_{section}"):
@@ -201,7 +206,8 @@ class Operation(models.Model):
                 )
 
         if telegram_id := self.wallet.user.telegram_id:
-            send_template_telegram_message_task.delay(
+            OutboxMessage.objects.add(
+                send_template_telegram_message_task,
                 telegram_id,
                 message_type=TelegramMessageType.INTERNAL_TRANSFER_FOR_SENDER,
                 insertion_data={
@@ -226,7 +232,8 @@ class Operation(models.Model):
                     wallet=self.receiver,
                 )
                 if telegram_id := self.receiver.user.telegram_id:
-                    send_template_telegram_message_task.delay(
+                    OutboxMessage.objects.add(
+                        send_template_telegram_message_task,
                         telegram_id,
                         message_type=(
                             TelegramMessageType.INTERNAL_TRANSFER_FOR_RECIPIENT
@@ -252,7 +259,9 @@ class Operation(models.Model):
     def _apply_program_start(self):  # ready
         total_amount = self.amount_free + self.amount_frozen
 
-        self.wallet.update_balance(free=-self.amount_free, frozen=-self.amount_frozen)
+        self.wallet.update_balance(
+            free=-self.amount_free, frozen=-self.amount_frozen, check_funds=True
+        )
         self.user_program = UserProgram.objects.create(
             wallet=self.wallet,
             program=self.program,
@@ -275,7 +284,8 @@ class Operation(models.Model):
             insertion_data=insertion_data,
         )
         if telegram_id := self.wallet.user.telegram_id:
-            send_template_telegram_message_task.delay(
+            OutboxMessage.objects.add(
+                send_template_telegram_message_task,
                 telegram_id,
                 message_type=TelegramMessageType.PROGRAM_START,
                 insertion_data={
@@ -329,7 +339,8 @@ class Operation(models.Model):
         extra_fee = get_wallet_settings_attr(self.wallet, "extra_fee")
 
         if telegram_id := self.wallet.user.telegram_id:
-            send_template_telegram_message_task.delay(
+            OutboxMessage.objects.add(
+                send_template_telegram_message_task,
                 telegram_id,
                 message_type=TelegramMessageType.PROGRAM_CLOSING,
                 insertion_data={
@@ -345,7 +356,9 @@ class Operation(models.Model):
 
     def _apply_program_replenishment(self):  # ready
         total_amount = self.amount_free + self.amount_frozen
-        self.wallet.update_balance(free=-self.amount_free, frozen=-self.amount_frozen)
+        self.wallet.update_balance(
+            free=-self.amount_free, frozen=-self.amount_frozen, check_funds=True
+        )
         self.replenishment = UserProgramReplenishment.objects.create(
             program=self.user_program,
             amount=total_amount,
@@ -390,7 +403,8 @@ class Operation(models.Model):
         extra_fee = get_wallet_settings_attr(self.wallet, "extra_fee")
 
         if telegram_id := self.wallet.user.telegram_id:
-            send_template_telegram_message_task.delay(
+            OutboxMessage.objects.add(
+                send_template_telegram_message_task,
                 telegram_id,
                 message_type=TelegramMessageType.CANCELING_PROGRAM_REPLENISHMENT,
                 insertion_data={
@@ -413,7 +427,8 @@ class Operation(models.Model):
                 frozen=-self.amount, item=self.frozen_item  # разморозка frozen-item
             )
             if telegram_id := self.wallet.user.telegram_id:
-                send_template_telegram_message_task.delay(
+                OutboxMessage.objects.add(
+                    send_template_telegram_message_task,
                     telegram_id,
                     message_type=TelegramMessageType.FROZEN_AVAILABLE,
                     insertion_data={
@@ -425,7 +440,8 @@ class Operation(models.Model):
         else:
             message_type = MessageType.FORCE_DEFROST
             insertion_data = None
-            self.wallet.update_balance(frozen=-self.amount)  # разморозка суммы
+            # разморозка суммы
+            self.wallet.update_balance(frozen=-self.amount, check_funds=True)
 
             # списание Extra Fee
             extra_fee = get_wallet_settings_attr(self.wallet, "extra_fee")
@@ -436,7 +452,8 @@ class Operation(models.Model):
                 amount=extra_fee_amount,
             )
             if telegram_id := self.wallet.user.telegram_id:
-                send_template_telegram_message_task.delay(
+                OutboxMessage.objects.add(
+                    send_template_telegram_message_task,
                     telegram_id,
                     message_type=TelegramMessageType.PREMATURE_DEFROST,
                     insertion_data={
@@ -494,7 +511,8 @@ class Operation(models.Model):
             )
 
         if telegram_id := self.wallet.user.telegram_id:
-            send_template_telegram_message_task.delay(
+            OutboxMessage.objects.add(
+                send_template_telegram_message_task,
                 telegram_id,
                 message_type=telegram_message_type,
                 insertion_data={
@@ -522,7 +540,7 @@ class Operation(models.Model):
         insertion_data: dict | None = None,
         wallet: Wallet | None = None,
     ):
-        OperationHistory.objects.create(
+        history = OperationHistory.objects.create(
             wallet=wallet or self.wallet,
             type=type,
             message_type=message_type,
@@ -531,6 +549,7 @@ class Operation(models.Model):
             amount=amount,
             insertion_data=insertion_data,
         )
+        OperationHistoryTotal.objects.add([history])
 
 
 class WithdrawalRequest(models.Model):
@@ -574,10 +593,6 @@ class WithdrawalRequest(models.Model):
         verbose_name = "Заявка"
         verbose_name_plural = "Заявки на вывод средств"
 
-    @classmethod
-    def notify_count(cls):
-        return cls.objects.filter(status=cls.Status.PENDING).count()
-
 
 class OperationSummary(Operation):
     class Meta:
@@ -1,18 +1,24 @@
-from datetime import date
+from collections import defaultdict
+from datetime import datetime, time, timedelta
 from decimal import Decimal
 
-from django.db import models
+from django.db import models, transaction
 from django.db.models.query import QuerySet
-from django.db.models import Sum
+from django.db.models import F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
 from django.utils import timezone
+from psqlextra.expressions import ExcludedCol
+from psqlextra.models import PostgresPartitionedModel
+from psqlextra.query import PostgresQuerySet
+from psqlextra.types import PostgresPartitioningMethod
 from django.utils.translation import gettext_lazy as _
 
-from core.utils import blank_and_null, decimal_usdt
+from core.utils import blank_and_null, decimal_usdt, round_usdt
+from core.utils.template_registry import operation_messages
 
 from core.localized.fields import LocalizedCharField
 
 from .operation_type import OperationType, MessageType
-from .operation_message import OperationMessage
 
 
 class OperationHistoryQuerySet(QuerySet):
@@ -22,8 +28,17 @@ class OperationHistoryQuerySet(QuerySet):
     def total_out(self):
         return self.filter(amount__lt=0).aggregate(total=Sum("amount"))["total"] or 0
 
+    def on_date(self, date):
+        """
+        Записи за день. В отличие от created_at__date условие на сам created_at
+        позволяет читать только секцию нужного месяца
+        """
+        start = timezone.make_aware(datetime.combine(date, time.min))
+        end = timezone.make_aware(datetime.combine(date + timedelta(days=1), time.min))
+        return self.filter(created_at__gte=start, created_at__lt=end)
 
-class OperationHistory(models.Model):
+
+class OperationHistory(PostgresPartitionedModel):
     class Type(models.TextChoices):
         TRANSFER_FREE = "transfer_free", _('Перевод в раздел "Доступно"')
         TRANSFER_FROZEN = "transfer_frozen", _('Перевод в раздел "Заморожено"')
@@ -55,30 +70,132 @@ class OperationHistory(models.Model):
 
     objects = OperationHistoryQuerySet.as_manager()
 
+    class PartitioningMeta:
+        method = PostgresPartitioningMethod.RANGE
+        key = ["created_at"]
+
     class Meta:
         verbose_name = "История операций"
         verbose_name_plural = "Истории операций"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["wallet", "-created_at", "-id"],
+                name="operation_history_keyset_idx",
+            ),
+        ]
 
     def get_description(self, language=None):
         if not self.message_type:
             return OperationType(self.operation_type).label
 
-        insertion_data = self.insertion_data or {}
-
-        template_message = OperationMessage.objects.get(message_type=self.message_type)
-        text = template_message.text.get(language)
+        return operation_messages.render(
+            self.message_type, self.insertion_data, language
+        )
+
+
+class OperationHistoryTotalQuerySet(PostgresQuerySet):
+    def totals(self):
+        return self.aggregate(
+            total_in=Coalesce(Sum("total_in"), Decimal("0.0")),
+            total_out=Coalesce(Sum("total_out"), Decimal("0.0")),
+        )
+
+    def add(self, history: list[OperationHistory]):
+        """Прибавить суммы записей истории к итогам их дней"""
+        totals = defaultdict(lambda: [Decimal("0.0"), Decimal("0.0")])
+        for item in history:
+            if not item.amount:
+                continue
+            key = (
+                item.wallet_id,
+                timezone.localdate(item.created_at),
+                item.operation_type or "",
+            )
+            # как в колонке amount записи истории, иначе итог дня из
+            # нескольких неокруглённых сумм расходится с Sum("amount")
+            totals[key][item.amount < 0] += round_usdt(item.amount)
+        self.add_totals(totals)
+
+    def add_totals(self, totals: dict):
+        if not totals:
+            return
+        self.bulk_upsert(
+            conflict_target=["wallet", "date", "operation_type"],
+            rows=[
+                dict(
+                    wallet_id=wallet_id,
+                    date=date,
+                    operation_type=operation_type,
+                    total_in=total_in,
+                    total_out=total_out,
+                )
+                for (wallet_id, date, operation_type), (
+                    total_in,
+                    total_out,
+                ) in totals.items()
+            ],
+            update_values=dict(
+                total_in=F("total_in") + ExcludedCol("total_in"),
+                total_out=F("total_out") + ExcludedCol("total_out"),
+            ),
+        )
+
+    def rebuild(self, wallets=None, date=None):
+        """Пересчитать итоги по истории операций целиком, по кошелькам или за день"""
+        history = OperationHistory.objects.exclude(amount__isnull=True)
+        stale = self
+        if wallets is not None:
+            history = history.filter(wallet__in=wallets)
+            stale = stale.filter(wallet__in=wallets)
+        if date is not None:
+            history = history.on_date(date)
+            stale = stale.filter(date=date)
+
+        rows = (
+            history.annotate(date=TruncDate("created_at"))
+            .values("wallet_id", "date", "operation_type")
+            .annotate(
+                total_in=Coalesce(
+                    Sum("amount", filter=Q(amount__gt=0)), Decimal("0.0")
+                ),
+                total_out=Coalesce(
+                    Sum("amount", filter=Q(amount__lt=0)), Decimal("0.0")
+                ),
+            )
+            .order_by()
+        )
+        totals = {
+            (row["wallet_id"], row["date"], row["operation_type"] or ""): (
+                row["total_in"],
+                row["total_out"],
+            )
+            for row in rows
+        }
+        with transaction.atomic():
+            stale.delete()
+            self.add_totals(totals)
+
+
+class OperationHistoryTotal(models.Model):
+    """Суммы поступлений и списаний из истории операций по дням"""
 
-        for field in template_message.insertion_iter():
-            try:
-                value = insertion_data[field]
-            except KeyError:
-                raise ValueError(f"insertion data dict must have {field}")
+    wallet = models.ForeignKey(
+        "Wallet",
+        verbose_name="Кошелёк",
+        related_name="operations_history_totals",
+        on_delete=models.CASCADE,
+    )
+    date = models.DateField("Дата")
+    operation_type = models.CharField(
+        choices=OperationType.choices, blank=True, default=""
+    )
+    total_in = models.DecimalField("Поступления", **decimal_usdt, default=0)
+    total_out = models.DecimalField("Списания", **decimal_usdt, default=0)
 
-            if isinstance(value, date):
-                value = value.strftime("%d.%m.%Y")
-            elif isinstance(value, (float, Decimal)):
-                value = round(value, 2)
+    objects = OperationHistoryTotalQuerySet.as_manager()
 
-            text = text.replace(f"{{{field}}}", str(value))
-        return text
+    class Meta:
+        verbose_name = "Итоги истории операций"
+        verbose_name_plural = "Итоги истории операций"
+        unique_together = ("wallet", "date", "operation_type")
@@ -1,12 +1,22 @@
 from dateutil.relativedelta import relativedelta
 from decimal import Decimal
 from django.db import models
+from django.db.models import Case, DateField, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce, Least
 from django.utils import timezone
 from django.utils.timezone import now, timedelta, datetime
 from django.utils.translation import gettext_lazy as _
+from psqlextra.models import PostgresPartitionedModel
+from psqlextra.types import PostgresPartitioningMethod
 
 from core.localized.fields import LocalizedTextField
-from core.utils import blank_and_null, add_business_days, decimal_usdt, decimal_pct
+from core.utils import (
+    blank_and_null,
+    add_business_days,
+    decimal_usdt,
+    decimal_pct,
+    upsert_from_select,
+)
 from .operation_history import OperationHistory
 from .operation_type import MessageType
 
@@ -61,6 +71,45 @@ class ProgramResult(models.Model):
         return datetime.combine(apply_date, self.apply_time).astimezone(now().tzinfo)
 
 
+# итоги начислений UserProgram, меняются только вместе с UserProgramAccrual
+ACCRUAL_TOTALS_FIELDS = [
+    "total_profit",
+    "last_accrual_amount",
+    "last_accrual_percent",
+    "last_accrual_date",
+]
+
+
+def funds_expression(prefix=""):
+    """Выражение для UserProgram.funds, prefix - путь к программе в запросе"""
+    return Case(
+        When(
+            **{f"{prefix}end_date__isnull": False},
+            then=F(f"{prefix}deposit") + F(f"{prefix}total_profit"),
+        ),
+        default=F(f"{prefix}deposit")
+        + Least(F(f"{prefix}total_profit"), Decimal("0.0")),
+    )
+
+
+class UserProgramQuerySet(models.QuerySet):
+    def refresh_accrual_totals(self):
+        """Пересчитать сохранённые итоги начислений по UserProgramAccrual"""
+        accruals = UserProgramAccrual.objects.filter(program=OuterRef("pk"))
+        last_accrual = accruals.order_by("-created_at")
+        total = (
+            accruals.values("program")
+            .annotate(total=models.Sum("amount"))
+            .values("total")
+        )
+        return self.update(
+            total_profit=Coalesce(Subquery(total), Decimal("0.0")),
+            last_accrual_amount=Subquery(last_accrual.values("amount")[:1]),
+            last_accrual_percent=Subquery(last_accrual.values("percent_amount")[:1]),
+            last_accrual_date=Subquery(last_accrual.values("created_at")[:1]),
+        )
+
+
 class UserProgram(models.Model):
     class Status(models.TextChoices):
         INITIAL = "initial", _("Ожидает запуска")
@@ -91,6 +140,25 @@ class UserProgram(models.Model):
     # для уникальности программ во время парсинга из внешней базы
     created_at = models.DateTimeField(default=timezone.now, null=True)
 
+    # итоги начислений, обновляются вместе с UserProgramAccrual
+    total_profit = models.DecimalField(
+        "Суммарный доход", **decimal_usdt, default=Decimal("0.0"), editable=False
+    )
+    last_accrual_amount = models.DecimalField(
+        "Последнее начисление", **decimal_usdt, **blank_and_null, editable=False
+    )
+    last_accrual_percent = models.DecimalField(
+        "Последнее начисление в процентах от депозита",
+        **decimal_pct,
+        **blank_and_null,
+        editable=False,
+    )
+    last_accrual_date = models.DateField(
+        "Дата последнего начисления", **blank_and_null, editable=False
+    )
+
+    objects = UserProgramQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Программа пользователя"
         verbose_name_plural = "Программы пользователей"
@@ -100,7 +168,7 @@ class UserProgram(models.Model):
 
     @property
     def profit(self):
-        return self.accruals.aggregate(total=models.Sum("amount"))["total"] or 0
+        return self.total_profit
 
     @property
     def funds(self):
@@ -114,19 +182,35 @@ class UserProgram(models.Model):
 
     @property
     def yesterday_profit(self):
-        try:
-            accrual: UserProgramAccrual = self.accruals.get(created_at=now().date())
-        except UserProgramAccrual.DoesNotExist:
+        if self.last_accrual_date != now().date():
             return 0
-        return accrual.amount
+        return self.last_accrual_amount
 
     @property
     def yesterday_profit_percent(self):
-        try:
-            accrual: UserProgramAccrual = self.accruals.get(created_at=now().date())
-        except UserProgramAccrual.DoesNotExist:
+        if self.last_accrual_date != now().date():
             return 0
-        return accrual.percent_amount
+        return self.last_accrual_percent
+
+    def save(self, *args, **kwargs):
+        # полное сохранение загруженной программы не перезаписывает итоги
+        # начислений, которые могли измениться после её чтения
+        if (
+            not self._state.adding
+            and not args
+            and kwargs.get("update_fields") is None
+            and not self.get_deferred_fields()
+        ):
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in ACCRUAL_TOTALS_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    def refresh_accrual_totals(self):
+        UserProgram.objects.filter(pk=self.pk).refresh_accrual_totals()
+        self.refresh_from_db(fields=ACCRUAL_TOTALS_FIELDS)
 
     def _set_name(self):
         if not self.name:
@@ -148,16 +232,37 @@ class UserProgram(models.Model):
 
     def start(self):
         self.status = self.Status.RUNNING
-        self.save()
+        # дату начала выставляет сигнал pre_save при смене статуса
+        self.save(update_fields=["status", "start_date", "end_date"])
 
     def close(self):
         self.status = self.Status.FINISHED
         self.close_date = now().date()
-        self.save()
+        self.save(update_fields=["status", "close_date"])
 
     def update_deposit(self, amount):
         self.deposit += amount
-        self.save()
+        self.save(update_fields=["deposit"])
+
+
+class UserProgramHistoryQuerySet(models.QuerySet):
+    def create_snapshots(self, date=None) -> int:
+        """Снимок всех программ пользователей на дату одним запросом,
+        повторный запуск за ту же дату перезаписывает снимок"""
+        date = date or timezone.localdate()
+        return upsert_from_select(
+            UserProgramHistory,
+            UserProgram.objects.all(),
+            {
+                "user_program": F("id"),
+                "funds": funds_expression(),
+                "deposit": F("deposit"),
+                "profit": F("total_profit"),
+                "status": F("status"),
+                "created_at": Value(date, output_field=DateField()),
+            },
+            conflict_target=["user_program", "created_at"],
+        )
 
 
 class UserProgramHistory(models.Model):
@@ -176,6 +281,8 @@ class UserProgramHistory(models.Model):
         "Суммарный доход", **decimal_usdt, default=Decimal("0.0")
     )
 
+    objects = UserProgramHistoryQuerySet.as_manager()
+
     class Meta:
         unique_together = ("user_program", "created_at")
         verbose_name = "История программы пользователя"
@@ -236,7 +343,7 @@ class UserProgramReplenishment(models.Model):
             self.apply_date = add_business_days(3)
 
 
-class UserProgramAccrual(models.Model):
+class UserProgramAccrual(PostgresPartitionedModel):
     program = models.ForeignKey(
         UserProgram,
         verbose_name="Программа",
@@ -257,6 +364,10 @@ class UserProgramAccrual(models.Model):
     def __str__(self):
         return f"Начисление по {self.program.name}"
 
+    class PartitioningMeta:
+        method = PostgresPartitioningMethod.RANGE
+        key = ["created_at"]
+
     class Meta:
         verbose_name = "Начисление"
         verbose_name_plural = "Начисления по программам"
@@ -1,10 +1,38 @@
 from decimal import Decimal
 from django.db import models
-
-from apps.accounts.models import User
-from core.utils import decimal_usdt, blank_and_null, decimal_pct
+from django.db.models import DateField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from apps.accounts.models import ErrorMessageType, User
+from core.utils import (
+    decimal_usdt,
+    blank_and_null,
+    decimal_pct,
+    round_usdt,
+    upsert_from_select,
+)
+from core.utils.error import get_error
 
 from .frozen import FrozenItem
+from .ledger import LedgerCheckpoint, LedgerEntry
+from .program import UserProgram
+
+
+class WalletQuerySet(models.QuerySet):
+    def lock(self, *pks) -> list:
+        """
+        Заблокировать кошельки до конца транзакции. Операции одного кошелька
+        применяются по очереди, разных кошельков - параллельно. Блокировки
+        берутся в порядке id, чтобы встречные переводы не ждали друг друга
+        """
+        return list(
+            self.select_for_update()
+            .filter(pk__in=[pk for pk in pks if pk])
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
 
 
 class Wallet(models.Model):
@@ -18,6 +46,8 @@ class Wallet(models.Model):
     free = models.DecimalField("Доступно", **decimal_usdt, default=Decimal("0.0"))
     frozen = models.DecimalField("Заморожено", **decimal_usdt, default=Decimal("0.0"))
 
+    objects = WalletQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Кошелёк"
         verbose_name_plural = "Кошельки"
@@ -25,6 +55,25 @@ class Wallet(models.Model):
     def __str__(self) -> str:
         return f"Кошелёк пользователя ID{self.user.pk}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        wallet = super().from_db(db, field_names, values)
+        wallet.remember_balance()
+        return wallet
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.remember_balance()
+
+    def remember_balance(self):
+        """
+        Запомнить баланс, совпадающий с базой: сохранение кошелька в обход
+        update_balance записывает в журнал разницу с ним
+        """
+        self._saved_balance = {
+            field: self.__dict__.get(field) for field in ("free", "frozen")
+        }
+
     @property
     def name(self):
         return "Wallet GDW"
@@ -38,12 +87,40 @@ class Wallet(models.Model):
         free: Decimal = Decimal("0.0"),
         frozen: Decimal = Decimal("0.0"),
         item: FrozenItem | None = None,
+        check_funds: bool = False,
     ):
-        self.free += free
-        self.frozen += frozen
-        self.save()
+        """
+        Изменить разделы кошелька. С check_funds списание, которое увело бы
+        раздел в минус, не проводится и возвращает ошибку INSUFFICIENT_FUNDS
+        """
+        # суммы округляются заранее, чтобы журнал сходился с балансом
+        free, frozen = round_usdt(free), round_usdt(frozen)
+        wallets = Wallet.objects.filter(pk=self.pk)
+        if check_funds:
+            # остаток проверяется в том же UPDATE: проверку сериализатора
+            # параллельная операция могла сделать устаревшей
+            if free < 0:
+                wallets = wallets.filter(free__gte=-free)
+            if frozen < 0:
+                wallets = wallets.filter(frozen__gte=-frozen)
+        # изменение считается в базе, параллельные операции не затирают друг друга
+        updated = wallets.update(free=F("free") + free, frozen=F("frozen") + frozen)
+        self.refresh_from_db(fields=["free", "frozen"])
+        if not updated:
+            get_error(
+                error_type=ErrorMessageType.INSUFFICIENT_FUNDS,
+                insertions={
+                    "section": _("available") if self.free < -free else _("frozen")
+                },
+            )
+        if free or frozen:
+            LedgerEntry.objects.create(wallet=self, free=free, frozen=frozen)
         self.update_frozen(frozen, item)
 
+    def balance_at(self, at) -> tuple[Decimal, Decimal] | None:
+        """Доступно и заморожено на момент at по журналу балансов"""
+        return LedgerCheckpoint.objects.balances_at([self.pk], at).get(self.pk)
+
     def update_frozen(self, frozen: Decimal, item: FrozenItem | None = None):
         if item:
             return item.defrost()
@@ -52,12 +129,30 @@ class Wallet(models.Model):
             return self.frozen_items.create(amount=frozen)
 
         if frozen < 0:
-            for item in self.frozen_items.all():
-                value = min(abs(frozen), item.amount)
-                item.defrost(value)
-                frozen += value
-                if frozen == 0:
-                    return
+            return self.frozen_items.consume(abs(frozen))
+
+
+class WalletHistoryQuerySet(models.QuerySet):
+    def create_snapshots(self, date=None) -> int:
+        """Снимок всех кошельков на дату одним запросом, повторный запуск
+        за ту же дату перезаписывает снимок"""
+        date = date or timezone.localdate()
+        deposits = Sum(
+            "programs__deposit",
+            filter=~Q(programs__status=UserProgram.Status.FINISHED),
+        )
+        return upsert_from_select(
+            WalletHistory,
+            Wallet.objects.all(),
+            {
+                "user": F("user_id"),
+                "free": F("free"),
+                "frozen": F("frozen"),
+                "deposits": Coalesce(deposits, Decimal("0.0")),
+                "created_at": Value(date, output_field=DateField()),
+            },
+            conflict_target=["user", "created_at"],
+        )
 
 
 class WalletHistory(models.Model):
@@ -77,6 +172,8 @@ class WalletHistory(models.Model):
     )
     created_at = models.DateField(auto_now_add=True, verbose_name="Дата создания")
 
+    objects = WalletHistoryQuerySet.as_manager()
+
     class Meta:
         unique_together = ("user", "created_at")
         verbose_name = "История кошелька"
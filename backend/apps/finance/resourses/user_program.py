@@ -41,7 +41,7 @@ class UserProgramResource(ModelResource):
 
     @staticmethod
     def dehydrate_total_accruals(obj):
-        return obj.accruals.aggregate(total=Sum("amount"))["total"] or 0
+        return obj.total_profit
 
     @staticmethod
     def dehydrate_total_success_fee(obj):
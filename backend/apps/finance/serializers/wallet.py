@@ -8,6 +8,7 @@ from rest_framework.serializers import (
 )
 
 from apps.finance.models import Wallet, FrozenItem, WalletSettings
+from apps.finance.services.wallet_settings_attr import get_wallet_settings_attr
 from apps.accounts.models import User, ErrorMessageType
 from core.utils.error import get_error
 
@@ -68,8 +69,7 @@ class WalletSettingsSerializer(ModelSerializer):
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
-        default_settings = WalletSettings.objects.get(wallet__isnull=True)
         for key in data:
             if data.get(key) is None:
-                data[key] = getattr(default_settings, key)
+                data[key] = get_wallet_settings_attr(None, key)
         return data
@@ -2,5 +2,5 @@
 
 from .operation_replenishment_confirmation import operation_replenishment_confirmation
 from .send_operation_confirm_email import send_operation_confirm_email
-from .wallet_settings_attr import get_wallet_settings_attr
+from .wallet_settings_attr import get_wallet_settings_attr, resolve_many
 from .withdrawal_request_notify import send_admin_withdrawal_notifications
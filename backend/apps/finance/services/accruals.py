@@ -0,0 +1,186 @@
+from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import translation
+from django.utils.timezone import now
+
+from apps.finance.models import (
+    LedgerEntry,
+    Operation,
+    OperationHistory,
+    OperationHistoryTotal,
+    Program,
+    ProgramResult,
+    UserProgram,
+    UserProgramAccrual,
+    Wallet,
+)
+from apps.finance.models.operation_type import MessageType
+from apps.finance.models.program import ACCRUAL_TOTALS_FIELDS
+from apps.finance.services.wallet_settings_attr import resolve_many
+from apps.finance.utils import calculate_accrual
+from apps.telegram.models import MessageType as TelegramMessageType
+from apps.telegram.tasks import send_template_telegram_messages_task
+from core.utils import bulk_increment
+
+FEE_SETTINGS = ["success_fee", "management_fee"]
+
+
+def round_db(model, field_name, value) -> Decimal:
+    """Округление так же, как это делает numeric-колонка Postgres при записи"""
+    field = model._meta.get_field(field_name)
+    return Decimal(value).quantize(
+        Decimal(1).scaleb(-field.decimal_places), rounding=ROUND_HALF_UP
+    )
+
+
+def get_programs_to_accrue(date):
+    return (
+        UserProgram.objects.filter(
+            program__accrual_type=Program.AccrualType.DAILY,
+            status=UserProgram.Status.RUNNING,
+        )
+        .filter(
+            ~Exists(
+                UserProgramAccrual.objects.filter(
+                    program=OuterRef("pk"), created_at=date
+                )
+            )
+        )
+        .select_related("program", "wallet__user")
+        .order_by("program__name", "pk")
+    )
+
+
+def make_bulk_accruals(result: ProgramResult, batch_size: int = 1000) -> int:
+    """
+    Начисления по всем запущенным программам за день несколькими запросами.
+    Создаёт те же UserProgramAccrual, Operation и OperationHistory, что и
+    create_accrual + Operation.apply, и меняет балансы одним UPDATE с записями
+    в журнал балансов
+    """
+    today = now().date()
+    user_programs = list(get_programs_to_accrue(today))
+    if not user_programs:
+        return 0
+
+    fee_settings = resolve_many({p.wallet_id for p in user_programs}, FEE_SETTINGS)
+    language = translation.get_language()
+
+    accruals, operations, history = [], [], []
+    balance_deltas = defaultdict(Decimal)
+    messages = []
+
+    for user_program in user_programs:
+        wallet = user_program.wallet
+        profit = user_program.total_profit
+        if user_program.end_date:
+            funds = user_program.deposit + profit
+        else:
+            funds = user_program.deposit + min(profit, 0)
+
+        data = calculate_accrual(
+            funds=funds,
+            deposit=user_program.deposit,
+            result=result.result,
+            success_fee_pct=fee_settings[wallet.pk]["success_fee"],
+            management_fee_pct=fee_settings[wallet.pk]["management_fee"],
+        )
+        amount = data["amount"]
+        accrual_amount = round_db(UserProgramAccrual, "amount", amount)
+        accrual_percent = round_db(
+            UserProgramAccrual, "percent_amount", data["percent_amount"]
+        )
+        accruals.append(
+            UserProgramAccrual(program=user_program, created_at=today, **data)
+        )
+        operations.append(
+            Operation(
+                type=Operation.Type.PROGRAM_ACCRUAL,
+                wallet=wallet,
+                user_program=user_program,
+                amount=amount,
+                done=True,
+            )
+        )
+
+        history_data = dict(
+            wallet=wallet,
+            type=OperationHistory.Type.SYSTEM_MESSAGE,
+            operation_type=Operation.Type.PROGRAM_ACCRUAL,
+            amount=round_db(OperationHistory, "amount", amount),
+        )
+        if amount >= 0:
+            telegram_message_type = TelegramMessageType.PROGRAM_PROFIT
+            if user_program.program.withdrawal_type == Program.WithdrawalType.DAILY:
+                balance_deltas[wallet.pk] += round_db(Wallet, "free", amount)
+                history.append(
+                    OperationHistory(
+                        **history_data,
+                        message_type=MessageType.PROGRAM_ACCRUAL_PROFIT,
+                        target_name=wallet.name,
+                        insertion_data={"program_name": user_program.name},
+                    )
+                )
+        else:
+            telegram_message_type = TelegramMessageType.PROGRAM_LOSS
+            history.append(
+                OperationHistory(
+                    **history_data,
+                    message_type=MessageType.PROGRAM_ACCRUAL_LOSS,
+                    target_name=user_program.name,
+                )
+            )
+
+        user_program.total_profit = profit + accrual_amount
+        user_program.last_accrual_amount = accrual_amount
+        user_program.last_accrual_percent = accrual_percent
+        user_program.last_accrual_date = today
+
+        if telegram_id := wallet.user.telegram_id:
+            messages.append(
+                dict(
+                    telegram_id=telegram_id,
+                    message_type=telegram_message_type,
+                    insertion_data={
+                        "program_name": user_program.name,
+                        "yesterday_profit": user_program.yesterday_profit,
+                        "yesterday_profit_percent": (
+                            user_program.yesterday_profit_percent
+                        ),
+                        "all_profit": user_program.profit,
+                        "all_profit_percent": user_program.profit_percent,
+                        "underlying_asset": user_program.deposit,
+                        "email": wallet.user.email,
+                    },
+                    language=language,
+                )
+            )
+
+    with transaction.atomic():
+        UserProgramAccrual.objects.bulk_create(accruals, batch_size=batch_size)
+        Operation.objects.bulk_create(operations, batch_size=batch_size)
+        OperationHistory.objects.bulk_create(history, batch_size=batch_size)
+        OperationHistoryTotal.objects.add(history)
+        UserProgram.objects.bulk_update(
+            user_programs, ACCRUAL_TOTALS_FIELDS, batch_size=batch_size
+        )
+        bulk_increment(Wallet, balance_deltas, ["free"], batch_size=batch_size)
+        LedgerEntry.objects.bulk_create(
+            [
+                LedgerEntry(wallet_id=wallet_id, free=delta)
+                for wallet_id, delta in balance_deltas.items()
+            ],
+            batch_size=batch_size,
+        )
+
+        transaction.on_commit(lambda: send_accrual_messages(messages))
+
+    return len(accruals)
+
+
+def send_accrual_messages(messages: list, batch_size: int = 1000):
+    for start in range(0, len(messages), batch_size):
+        send_template_telegram_messages_task.delay(messages[start : start + batch_size])
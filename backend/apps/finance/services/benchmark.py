@@ -0,0 +1,294 @@
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import time as dt_time
+from decimal import Decimal
+from io import StringIO
+from random import Random
+
+from dateutil.relativedelta import relativedelta
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Max, Sum
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now, timedelta
+
+from apps.accounts.models import Partner, Region, Settings, TempData, User
+from apps.finance.models import (
+    FrozenItem,
+    LedgerCheckpoint,
+    OperationHistory,
+    OperationHistoryTotal,
+    Program,
+    ProgramResult,
+    Stats,
+    UserProgram,
+    UserProgramAccrual,
+    Wallet,
+    WalletSettings,
+)
+from apps.finance.models.operation_type import MessageType, OperationType
+from apps.finance.utils import calculate_accrual
+
+EMAIL_TEMPLATE = "benchmark_{seed}_{i}@benchmark.local"
+
+PROGRAMS = {
+    "ST-1": dict(duration=None, withdrawal_type=Program.WithdrawalType.DAILY),
+    "ST-2": dict(duration=6, withdrawal_type=Program.WithdrawalType.AFTER_FINISH),
+    "ST-3": dict(duration=12, withdrawal_type=Program.WithdrawalType.AFTER_FINISH),
+}
+
+BASE_SETTINGS = dict(
+    defrost_days=14,
+    commission_on_replenish=Decimal("1.5"),
+    commission_on_withdraw=Decimal("2"),
+    commission_on_transfer=Decimal("1"),
+    success_fee=Decimal("33"),
+    management_fee=Decimal("0.0083"),
+    extra_fee=Decimal("5"),
+)
+
+REGIONS = ["Russia", "China", "USA"]
+
+# шаблоны сообщений, без которых история операций и ошибки API не отображаются
+TEMPLATE_COMMANDS = [
+    "create_template_error_messages",
+    "create_template_email_messages",
+    "create_template_operation_messages",
+    "create_template_telegram_messages",
+]
+
+# без кодов подтверждения операции синтетических пользователей
+# применяются сразу и не отправляют писем
+NO_CONFIRMATION_SETTINGS = dict(
+    email_request_code_on_auth=False,
+    email_request_code_on_withdrawal=False,
+    email_request_code_on_transfer=False,
+)
+
+
+def load_message_templates():
+    """Создать недостающие шаблоны сообщений, существующие не меняются"""
+    # команды печатают результат через print, а не в self.stdout
+    with redirect_stdout(StringIO()):
+        for command in TEMPLATE_COMMANDS:
+            call_command(command)
+
+
+def create_base_data(today) -> dict:
+    """
+    Бизнес-аккаунт, базовые настройки, программы, результат и строки
+    статистики, если их нет
+    """
+    if not User.objects.filter(business_account=True).exists():
+        User.objects.create_user(
+            email="benchmark_business@benchmark.local",
+            password=None,
+            business_account=True,
+        )
+    if not WalletSettings.objects.filter(wallet__isnull=True).exists():
+        WalletSettings.objects.create(wallet=None, **BASE_SETTINGS)
+    programs = {}
+    for name, defaults in PROGRAMS.items():
+        programs[name], _ = Program.objects.get_or_create(
+            name=name,
+            defaults=dict(
+                **defaults,
+                exp_profit=1,
+                min_deposit=100,
+                accrual_type=Program.AccrualType.DAILY,
+                max_risk=1,
+            ),
+        )
+    if not ProgramResult.objects.exists():
+        ProgramResult.objects.create(
+            result=Decimal("0.37"),
+            until=today + timedelta(days=30),
+            apply_time=dt_time(0, 1),
+        )
+    for name in Stats.Name.values:
+        Stats.objects.get_or_create(name=name)
+    for name in REGIONS:
+        Region.objects.get_or_create(name=name)
+    return programs
+
+
+def generate_portfolio(
+    users: int = 1000, days: int = 30, seed: int = 0, batch_size: int = 1000
+) -> dict:
+    """
+    Синтетический портфель: пользователи с кошельками, персональными
+    настройками и партнёрами, программы ST-1/2/3 с историей начислений
+    за days дней и замороженные средства. Объекты создаются пачками,
+    в обход сигналов, поэтому зависимые данные заполняются здесь же
+    """
+    random = Random(seed)
+    today = now().date()
+    programs = create_base_data(today)
+    base_settings = WalletSettings.objects.get(wallet__isnull=True)
+    password = make_password(None)
+
+    user_list = User.objects.bulk_create(
+        [
+            User(email=EMAIL_TEMPLATE.format(seed=seed, i=i), password=password)
+            for i in range(users)
+        ],
+        batch_size=batch_size,
+    )
+    Settings.objects.bulk_create(
+        [Settings(user=user, **NO_CONFIRMATION_SETTINGS) for user in user_list],
+        batch_size=batch_size,
+    )
+    TempData.objects.bulk_create(
+        [TempData(user=user) for user in user_list], batch_size=batch_size
+    )
+
+    # каждый пятидесятый пользователь - партнёр, остальные привязаны к партнёрам
+    regions = list(Region.objects.filter(name__in=REGIONS))
+    first_partner_id = (Partner.objects.aggregate(m=Max("partner_id"))["m"] or 0) + 1
+    partners = Partner.objects.bulk_create(
+        [
+            Partner(
+                user=user,
+                partner_id=first_partner_id + i,
+                region=regions[i % len(regions)],
+                partner_fee=Decimal(random.choice(["20", "27", "30"])),
+            )
+            for i, user in enumerate(user_list[::50])
+        ]
+    )
+    for user in user_list:
+        user.partner = random.choice(partners)
+    User.objects.bulk_update(user_list, ["partner"], batch_size=batch_size)
+
+    wallets = Wallet.objects.bulk_create(
+        [
+            Wallet(user=user, free=Decimal(random.randint(0, 10000000)) / 100)
+            for user in user_list
+        ],
+        batch_size=batch_size,
+    )
+    wallet_settings = {}
+    for i, wallet in enumerate(wallets):
+        settings = WalletSettings(wallet=wallet)
+        if i % 3 == 0:
+            settings.success_fee = Decimal(random.choice(["20", "25.5"]))
+            settings.management_fee = Decimal("0.0111") if i % 2 else None
+        wallet_settings[wallet.pk] = settings
+    WalletSettings.objects.bulk_create(wallet_settings.values(), batch_size=batch_size)
+
+    user_programs = []
+    for wallet in wallets:
+        for program in random.sample(list(programs.values()), random.randint(1, 3)):
+            start_date = today - timedelta(days=random.randint(days, 400))
+            user_programs.append(
+                UserProgram(
+                    wallet=wallet,
+                    program=program,
+                    name=program.name,
+                    deposit=Decimal(random.randint(10000, 10000000)) / 100,
+                    start_date=start_date,
+                    end_date=program.duration
+                    and start_date + relativedelta(months=program.duration),
+                    status=UserProgram.Status.RUNNING,
+                )
+            )
+    UserProgram.objects.bulk_create(user_programs, batch_size=batch_size)
+
+    accruals, history = [], []
+    for user_program in user_programs:
+        settings = wallet_settings[user_program.wallet_id]
+        for day in range(days, 0, -1):
+            data = calculate_accrual(
+                funds=user_program.deposit,
+                deposit=user_program.deposit,
+                result=Decimal(random.randint(-100, 150)) / 100,
+                success_fee_pct=settings.success_fee or base_settings.success_fee,
+                management_fee_pct=(
+                    settings.management_fee or base_settings.management_fee
+                ),
+            )
+            accruals.append(
+                UserProgramAccrual(
+                    program=user_program,
+                    created_at=today - timedelta(days=day),
+                    **data,
+                )
+            )
+            if data["amount"] >= 0:
+                message_data = dict(
+                    message_type=MessageType.PROGRAM_ACCRUAL_PROFIT,
+                    target_name=user_program.wallet.name,
+                    insertion_data={"program_name": user_program.name},
+                )
+            else:
+                message_data = dict(
+                    message_type=MessageType.PROGRAM_ACCRUAL_LOSS,
+                    target_name=user_program.name,
+                )
+            history.append(
+                OperationHistory(
+                    wallet_id=user_program.wallet_id,
+                    type=OperationHistory.Type.SYSTEM_MESSAGE,
+                    operation_type=OperationType.PROGRAM_ACCRUAL,
+                    created_at=now() - timedelta(days=day),
+                    amount=data["amount"],
+                    **message_data,
+                )
+            )
+    UserProgramAccrual.objects.bulk_create(accruals, batch_size=batch_size)
+    OperationHistory.objects.bulk_create(history, batch_size=batch_size)
+    UserProgram.objects.filter(
+        pk__in=[p.pk for p in user_programs]
+    ).refresh_accrual_totals()
+    OperationHistoryTotal.objects.rebuild(wallets=wallets)
+
+    # у каждого четвёртого кошелька замороженные средства, часть уже к разморозке
+    frozen_items = [
+        FrozenItem(
+            wallet=wallet,
+            amount=Decimal(random.randint(100, 1000000)) / 100,
+            defrost_date=today + timedelta(days=random.randint(-3, 14)),
+        )
+        for wallet in wallets[::4]
+    ]
+    FrozenItem.objects.bulk_create(frozen_items, batch_size=batch_size)
+    frozen = dict(
+        FrozenItem.objects.filter(wallet__in=wallets[::4])
+        .values("wallet")
+        .annotate(total=Sum("amount"))
+        .values_list("wallet", "total")
+    )
+    for wallet in wallets[::4]:
+        wallet.frozen = frozen[wallet.pk]
+    Wallet.objects.bulk_update(wallets[::4], ["frozen"], batch_size=batch_size)
+    LedgerCheckpoint.objects.open(wallets)
+
+    return {
+        "users": len(user_list),
+        "partners": len(partners),
+        "user_programs": len(user_programs),
+        "accruals": len(accruals),
+        "frozen_items": len(frozen_items),
+    }
+
+
+def measure(name, func, *args, **kwargs) -> dict:
+    """Время выполнения, число запросов к базе и пик памяти Python (tracemalloc)"""
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            elapsed = time.perf_counter() - start
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "name": name,
+        "time": elapsed,
+        "queries": len(context),
+        "memory": peak_memory,
+        "result": result,
+    }
@@ -1,26 +1,169 @@
-from django.utils.timezone import now
+from collections import defaultdict
+from copy import copy
+from decimal import Decimal
+from functools import reduce
+from operator import or_
 
-from apps.finance.models.operation_history import OperationHistory
+from django.db import transaction
+from django.db.models import F, Max, Sum
+from django.db.models.functions import TruncDate
+from django.utils.timezone import localdate
+
+from apps.finance.models.commission import CommissionIncrement
+from apps.finance.models.operation_history import (
+    OperationHistory,
+    OperationHistoryTotal,
+)
 from apps.finance.models.operation_type import OperationType
 from apps.finance.models.wallet import Wallet
 
 
 def add_commission_to_history(commission_type: OperationType, amount):
-    wallet = Wallet.objects.get(user__business_account=True)
-    commission = OperationHistory.objects.filter(
-        wallet=wallet, operation_type=commission_type, created_at__date=now().date()
-    ).first()
-    if commission:
-        commission.amount += amount
-        commission.created_at = now()
-        commission.save()
-    else:
-        commission = OperationHistory.objects.create(
+    """
+    Учесть комиссию. Запись только добавляется, в историю и баланс
+    бизнес-кошелька её переносит compact_commissions
+    """
+    if amount:
+        CommissionIncrement.objects.create(
+            operation_type=commission_type, amount=amount
+        )
+
+
+def compact_commissions() -> int:
+    """
+    Перенести накопленные комиссии в дневные записи истории операций и баланс
+    бизнес-кошелька. Возвращает число перенесённых записей
+    """
+    with transaction.atomic():
+        # блокировка бизнес-кошелька не даёт двум переносам идти одновременно
+        wallet = Wallet.objects.select_for_update().get(user__business_account=True)
+        increments = list(
+            CommissionIncrement.objects.select_for_update().values_list(
+                "pk", "operation_type", "amount", "created_at"
+            )
+        )
+        if not increments:
+            return 0
+
+        # {(день, тип комиссии): [сумма, время последней комиссии]}
+        days = defaultdict(lambda: [Decimal("0.0"), None])
+        for _, operation_type, amount, created_at in increments:
+            day = days[(localdate(created_at), operation_type)]
+            day[0] += amount
+            day[1] = max(day[1] or created_at, created_at)
+
+        history = []
+        for (date, operation_type), (amount, created_at) in days.items():
+            pk = (
+                OperationHistory.objects.on_date(date)
+                .filter(wallet=wallet, operation_type=operation_type)
+                .values_list("pk", flat=True)
+                .first()
+            )
+            if pk:
+                OperationHistory.objects.on_date(date).filter(pk=pk).update(
+                    amount=F("amount") + amount, created_at=created_at
+                )
+            else:
+                OperationHistory.objects.create(
+                    wallet=wallet,
+                    type=OperationHistory.Type.SYSTEM_MESSAGE,
+                    operation_type=operation_type,
+                    created_at=created_at,
+                    amount=amount,
+                    is_commission=True,
+                )
+            history.append(
+                OperationHistory(
+                    wallet=wallet,
+                    operation_type=operation_type,
+                    created_at=created_at,
+                    amount=amount,
+                )
+            )
+        OperationHistoryTotal.objects.add(history)
+        wallet.update_balance(free=sum(amount for amount, _ in days.values()))
+        CommissionIncrement.objects.filter(
+            pk__in=[pk for pk, *_ in increments]
+        ).delete()
+    return len(increments)
+
+
+def get_pending_commissions() -> Decimal:
+    """Комиссии, ещё не перенесённые в баланс бизнес-кошелька"""
+    return CommissionIncrement.objects.total()
+
+
+def get_pending_commission_days(increments=None) -> dict:
+    """
+    Ещё не перенесённые комиссии по дням, как их перенесёт compact_commissions:
+    {(день, тип комиссии): (сумма, время последней комиссии)}
+    """
+    if increments is None:
+        increments = CommissionIncrement.objects.all()
+    days = (
+        increments.annotate(day=TruncDate("created_at"))
+        .values("day", "operation_type")
+        .annotate(amount=Sum("amount"), last=Max("created_at"))
+        .order_by()
+    )
+    return {
+        (day["day"], day["operation_type"]): (day["amount"], day["last"])
+        for day in days
+    }
+
+
+def merge_pending_commissions(
+    history: list, wallet, pending: dict, add_missing: bool = True
+) -> list:
+    """
+    Записи истории бизнес-кошелька в том виде, в каком их оставит
+    compact_commissions, без записи в базу: комиссии дня прибавляются к его
+    записи, а дни без записи в истории добавляются к списку (add_missing)
+    """
+    pending = dict(pending)
+    history = list(history)
+    for i, item in enumerate(history):
+        key = (localdate(item.created_at), item.operation_type)
+        if key in pending:
+            amount, created_at = pending.pop(key)
+            # копия: по исходным записям пагинация считает курсор
+            history[i] = item = copy(item)
+            item.amount += amount
+            item.created_at = max(item.created_at, created_at)
+    if add_missing and pending:
+        history += _missing_commission_days(wallet, pending)
+    # история выдаётся от новых записей к старым
+    return sorted(history, key=lambda item: item.created_at, reverse=True)
+
+
+def _missing_commission_days(wallet, pending: dict) -> list:
+    """Новые записи для дней, у которых в истории ещё нет записи комиссии"""
+    # запись дня может быть в истории, но не среди показанных
+    days = reduce(
+        or_,
+        (
+            OperationHistory.objects.on_date(date).filter(
+                wallet=wallet, operation_type=operation_type
+            )
+            for date, operation_type in pending
+        ),
+    )
+    recorded = {
+        (localdate(created_at), operation_type)
+        for created_at, operation_type in days.values_list(
+            "created_at", "operation_type"
+        )
+    }
+    return [
+        OperationHistory(
             wallet=wallet,
             type=OperationHistory.Type.SYSTEM_MESSAGE,
-            operation_type=commission_type,
-            created_at=now(),
+            operation_type=operation_type,
+            created_at=created_at,
             amount=amount,
             is_commission=True,
         )
-    wallet.update_balance(free=amount)
+        for (date, operation_type), (amount, created_at) in pending.items()
+        if (date, operation_type) not in recorded
+    ]
@@ -0,0 +1,26 @@
+from django.conf import settings
+from psqlextra.partitioning import (
+    PostgresPartitioningManager,
+    partition_by_current_time,
+)
+
+from apps.finance.models import OperationHistory, UserProgramAccrual
+
+# секции по календарным месяцам начиная с текущего, старые не удаляются:
+# строки до секционирования лежат в секции legacy, архивные месяцы
+# отсоединяются вручную через DETACH PARTITION
+manager = PostgresPartitioningManager(
+    [
+        partition_by_current_time(
+            model, months=1, count=settings.PARTITION_MONTHS_AHEAD
+        )
+        for model in (OperationHistory, UserProgramAccrual)
+    ]
+)
+
+
+def create_partitions() -> int:
+    """Создать недостающие секции на PARTITION_MONTHS_AHEAD месяцев вперёд"""
+    plan = manager.plan(skip_delete=True)
+    plan.apply()
+    return len(plan.creations)
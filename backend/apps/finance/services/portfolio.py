@@ -0,0 +1,120 @@
+from decimal import Decimal
+
+from asgiref.local import Local
+from django.db.models import Count, DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from apps.accounts.models import Region
+from apps.finance.models import UserProgram, UserProgramAccrual
+
+# итоги, посчитанные за время текущего запроса или задачи
+_local = Local()
+
+PROGRAM_STATUSES = {
+    "running": UserProgram.Status.RUNNING,
+    "finished": UserProgram.Status.FINISHED,
+}
+
+ACCRUAL_FIELDS = {
+    "accruals": "amount",
+    "success_fee": "success_fee",
+    "management_fee": "management_fee",
+}
+
+
+def clear_portfolio_cache(*args, **kwargs):
+    _local.totals = {}
+
+
+def _memoize(key, func):
+    if not hasattr(_local, "totals"):
+        _local.totals = {}
+    if key not in _local.totals:
+        _local.totals[key] = func()
+    return _local.totals[key]
+
+
+def _sum(field, **filters):
+    return Coalesce(
+        Sum(field, filter=Q(**filters)),
+        Value(Decimal("0")),
+        output_field=DecimalField(),
+    )
+
+
+def get_program_totals() -> dict:
+    """
+    Итоги по программам для запущенных и закрытых программ пользователей:
+    {program_id: {"running": {...}, "finished": {...}}}, где в каждом
+    статусе count, deposit, accruals, success_fee и management_fee
+    """
+    return _memoize("programs", _get_program_totals)
+
+
+def _get_program_totals():
+    totals = {}
+
+    annotations = {}
+    for key, status in PROGRAM_STATUSES.items():
+        annotations[(key, "count")] = Count("id", filter=Q(status=status))
+        annotations[(key, "deposit")] = _sum("deposit", status=status)
+    rows = UserProgram.objects.values("program")
+    _collect(totals, rows, "program", annotations)
+
+    annotations = {}
+    for key, status in PROGRAM_STATUSES.items():
+        for name, field in ACCRUAL_FIELDS.items():
+            annotations[(key, name)] = _sum(field, program__status=status)
+    rows = UserProgramAccrual.objects.values("program__program")
+    _collect(totals, rows, "program__program", annotations)
+    return totals
+
+
+def _collect(totals, rows, group_by, annotations):
+    """Сгруппированный запрос, annotations - {(статус, поле): выражение}"""
+    aliases = {f"{key}_{field}": (key, field) for key, field in annotations}
+    rows = rows.annotate(
+        **{alias: annotations[name] for alias, name in aliases.items()}
+    ).order_by()
+    for row in rows:
+        program_totals = totals.setdefault(row[group_by], _empty_program_totals())
+        for alias, (key, field) in aliases.items():
+            program_totals[key][field] = row[alias]
+
+
+def _empty_program_totals():
+    fields = ["deposit", *ACCRUAL_FIELDS]
+    return {
+        key: {"count": 0, **{field: Decimal("0") for field in fields}}
+        for key in PROGRAM_STATUSES
+    }
+
+
+def get_program_total(program_id) -> dict:
+    return get_program_totals().get(program_id) or _empty_program_totals()
+
+
+def get_region_totals() -> dict:
+    """
+    Итоги по филиалам одним запросом: {region_id: {"investors",
+    "total_assets", "average_bill"}}, инвесторы - пользователи,
+    привязанные к партнёрам филиала
+    """
+    return _memoize("regions", _get_region_totals)
+
+
+def _get_region_totals():
+    rows = Region.objects.values("id").annotate(
+        investors=Count("partners__users", distinct=True),
+        total_assets=_sum("partners__users__wallet__programs__deposit"),
+    )
+    return {
+        row["id"]: {
+            "investors": row["investors"],
+            "total_assets": row["total_assets"],
+            "average_bill": round(
+                row["total_assets"] / row["investors"] if row["investors"] else 0, 2
+            ),
+        }
+        for row in rows.order_by()
+    }
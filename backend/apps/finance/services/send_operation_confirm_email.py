@@ -2,6 +2,7 @@ from apps.accounts.tasks import send_email_msg
 from apps.accounts.models import EmailMessageType
 from apps.accounts.services.email import get_template_message
 from apps.finance.models.operation_confirmation import OperationConfirmation
+from core.models import OutboxMessage
 
 
 def send_operation_confirm_email(confirmation: OperationConfirmation):
@@ -9,7 +10,8 @@ def send_operation_confirm_email(confirmation: OperationConfirmation):
         message_type=EmailMessageType.OPERATION_CONFIRM,
         insertion_data={"code": confirmation.code},
     )
-    send_email_msg.delay(
+    OutboxMessage.objects.add(
+        send_email_msg,
         confirmation.operation.wallet.user.email,
         title,
         text,
@@ -0,0 +1,279 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils.timezone import now, timedelta
+
+from apps.accounts.models import UserCountHistory
+from apps.finance.models import (
+    Operation,
+    UserProgram,
+    UserProgramAccrual,
+    UserProgramHistory,
+    UserProgramReplenishment,
+    WalletHistory,
+    WithdrawalRequest,
+)
+from apps.finance.models.stats import Stats, StatsSnapshot
+
+Name = Stats.Name
+
+# показатели за период: сумма значений за каждый день периода
+RANGE_STATS = [
+    Name.BRANCH_RU,
+    Name.BRANCH_CN,
+    Name.BRANCH_US,
+    Name.NET_PROFIT,
+    Name.GROSS_PROFIT,
+    Name.SUCCESS_FEE,
+    Name.SUCCESS_FEE_NET,
+    Name.EXTRA_FEE,
+    Name.MANAGEMENT_FEE,
+]
+
+# показатели на дату: значение на последний день периода
+POINT_STATS = [
+    Name.WALLET,
+    Name.ST_1,
+    Name.ST_2,
+    Name.ST_3,
+    Name.TO_WITHDRAW,
+    Name.TO_START,
+    Name.TO_REPLENISH,
+    Name.USERS_TOTAL,
+    Name.USERS_ACTIVE,
+]
+
+FUND_BALANCE_STATS = [
+    Name.WALLET,
+    Name.ST_1,
+    Name.ST_2,
+    Name.ST_3,
+    Name.TO_START,
+    Name.TO_REPLENISH,
+    Name.TO_WITHDRAW,
+]
+
+BRANCH_REGIONS = {
+    Name.BRANCH_RU: "Russia",
+    Name.BRANCH_CN: "China",
+    Name.BRANCH_US: "USA",
+}
+
+PROGRAMS = {
+    Name.ST_1: "ST-1",
+    Name.ST_2: "ST-2",
+    Name.ST_3: "ST-3",
+}
+
+
+def get_periods(today) -> dict:
+    end_of_last_month = today.replace(day=1) - timedelta(days=1)
+    end_two_months_ago = end_of_last_month.replace(day=1) - timedelta(days=1)
+    return {
+        "today": (today, today),
+        "this_month": (today.replace(day=1), today),
+        "last_month": (end_of_last_month.replace(day=1), end_of_last_month),
+        "two_months_ago": (end_two_months_ago.replace(day=1), end_two_months_ago),
+    }
+
+
+def get_dates_range(start_date, end_date) -> list:
+    return [
+        start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)
+    ]
+
+
+def compute_range_stats(dates) -> dict:
+    """Показатели за период по дням: {date: {name: value}}"""
+    result = defaultdict(lambda: dict.fromkeys(RANGE_STATS, Decimal("0.0")))
+    if not dates:
+        return result
+
+    partner_fee = Coalesce(
+        F("program__wallet__user__partner__partner_fee"),
+        F("program__wallet__user__partner_profile__partner_fee"),
+        Decimal("27"),
+    )
+    aggregates = {
+        name: Sum(
+            F("success_fee") * partner_fee / Decimal("100"),
+            filter=Q(program__wallet__user__partner__region__name=region)
+            | Q(program__wallet__user__partner_profile__region__name=region),
+        )
+        for name, region in BRANCH_REGIONS.items()
+    }
+    aggregates.update(
+        {
+            Name.NET_PROFIT: Sum("amount"),
+            Name.GROSS_PROFIT: Sum(
+                F("amount") + F("success_fee") + F("management_fee")
+            ),
+            Name.SUCCESS_FEE: Sum("success_fee"),
+            Name.SUCCESS_FEE_NET: Sum(
+                F("success_fee") * (1 - partner_fee / Decimal("100"))
+            ),
+            Name.MANAGEMENT_FEE: Sum("management_fee"),
+        }
+    )
+    # имена аннотаций не должны совпадать с полями модели
+    accruals = (
+        UserProgramAccrual.objects.filter(created_at__in=dates)
+        .values("created_at")
+        .annotate(**{f"total_{name}": value for name, value in aggregates.items()})
+        .order_by()
+    )
+    for row in accruals:
+        result[row["created_at"]].update(
+            {name: row[f"total_{name}"] or 0 for name in aggregates}
+        )
+
+    extra_fees = (
+        Operation.objects.filter(
+            type=Operation.Type.EXTRA_FEE_WRITEOFF, created_at__date__in=dates
+        )
+        .annotate(date=TruncDate("created_at"))
+        .values("date")
+        .annotate(total=Sum("amount"))
+        .order_by()
+    )
+    for row in extra_fees:
+        result[row["date"]][Name.EXTRA_FEE] = row["total"] or 0
+
+    return result
+
+
+def compute_point_stats(dates) -> dict:
+    """Показатели на каждую из дат: {date: {name: value}}"""
+    result = defaultdict(lambda: dict.fromkeys(POINT_STATS, 0))
+    if not dates:
+        return result
+
+    wallets = (
+        WalletHistory.objects.filter(created_at__in=dates)
+        .values("created_at")
+        .annotate(total=Sum(F("free") + F("frozen")))
+        .order_by()
+    )
+    for row in wallets:
+        result[row["created_at"]][Name.WALLET] = row["total"] or 0
+
+    program_names = {program: name for name, program in PROGRAMS.items()}
+    programs = (
+        UserProgramHistory.objects.filter(
+            created_at__in=dates,
+            status=UserProgram.Status.RUNNING,
+            user_program__program__name__in=program_names,
+        )
+        .values("created_at", "user_program__program__name")
+        .annotate(total=Sum("deposit"))
+        .order_by()
+    )
+    for row in programs:
+        name = program_names[row["user_program__program__name"]]
+        result[row["created_at"]][name] = row["total"] or 0
+
+    pending = [
+        (
+            Name.TO_WITHDRAW,
+            WithdrawalRequest.objects.filter(status=WithdrawalRequest.Status.PENDING),
+            "created_at",
+            "original_amount",
+        ),
+        (
+            Name.TO_START,
+            UserProgram.objects.filter(status=UserProgram.Status.INITIAL),
+            "created_at__date",
+            "deposit",
+        ),
+        (
+            Name.TO_REPLENISH,
+            UserProgramReplenishment.objects.filter(
+                status=UserProgramReplenishment.Status.INITIAL
+            ),
+            "created_at",
+            "amount",
+        ),
+    ]
+    for name, queryset, date_lookup, field in pending:
+        totals = queryset.aggregate(
+            **{
+                str(i): Sum(field, filter=Q(**{f"{date_lookup}__lte": date}))
+                for i, date in enumerate(dates)
+            }
+        )
+        for i, date in enumerate(dates):
+            result[date][name] = totals[str(i)] or 0
+
+    for history in UserCountHistory.objects.filter(created_at__in=dates):
+        result[history.created_at][Name.USERS_TOTAL] = history.total
+        result[history.created_at][Name.USERS_ACTIVE] = history.active
+
+    return result
+
+
+def compute_daily_stats(dates) -> dict:
+    point_stats = compute_point_stats(dates)
+    range_stats = compute_range_stats(dates)
+    return {date: {**range_stats[date], **point_stats[date]} for date in dates}
+
+
+def create_stats_snapshots(dates):
+    """Сохранить показатели за прошедшие дни"""
+    daily_stats = compute_daily_stats(list(dates))
+    StatsSnapshot.objects.filter(date__in=daily_stats).delete()
+    StatsSnapshot.objects.bulk_create(
+        [
+            StatsSnapshot(date=date, name=name, value=value)
+            for date, stats in daily_stats.items()
+            for name, value in stats.items()
+        ]
+    )
+
+
+def get_daily_stats(dates, point_dates, today) -> dict:
+    """
+    Показатели по дням: прошедшие дни берутся из снимков, сегодняшний день
+    и дни без снимков считаются по исходным таблицам
+    """
+    daily_stats = {}
+    for snapshot in StatsSnapshot.objects.filter(date__in=dates, date__lt=today):
+        daily_stats.setdefault(snapshot.date, {})[snapshot.name] = snapshot.value
+
+    missing_dates = [date for date in dates if date not in daily_stats]
+    missing_point_dates = [date for date in point_dates if date not in daily_stats]
+    range_stats = compute_range_stats(missing_dates)
+    point_stats = compute_point_stats(missing_point_dates)
+    for date in missing_dates:
+        daily_stats.setdefault(date, {}).update(range_stats[date])
+    for date in missing_point_dates:
+        daily_stats.setdefault(date, {}).update(point_stats[date])
+    return daily_stats
+
+
+def get_fund_stats(today=None) -> dict:
+    """Все показатели фонда за все периоды: {name: {period: value}}"""
+    today = today or now().date()
+    periods = get_periods(today)
+    dates = get_dates_range(periods["two_months_ago"][0], today)
+    point_dates = {end_date for _, end_date in periods.values()}
+    daily_stats = get_daily_stats(dates, point_dates, today)
+
+    result = {name: {} for name in Name.values}
+    for period, (start_date, end_date) in periods.items():
+        end_stats = daily_stats[end_date]
+        for name in POINT_STATS:
+            result[name][period] = end_stats[name]
+        for name in RANGE_STATS:
+            total = sum(
+                daily_stats[date][name]
+                for date in get_dates_range(start_date, end_date)
+            )
+            result[name][period] = round(total, 2)
+        result[Name.TOTAL_FUND_BALANCE][period] = sum(
+            end_stats[name] for name in FUND_BALANCE_STATS
+        )
+    for name in [Name.USERS_TOTAL, Name.USERS_ACTIVE]:
+        result[name] = {period: int(value) for period, value in result[name].items()}
+    return result
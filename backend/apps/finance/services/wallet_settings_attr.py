@@ -1,13 +1,60 @@
+from asgiref.local import Local
 from django.apps import apps
 
+# настройки кошельков, загруженные за время текущего запроса или задачи:
+# {wallet_id: WalletSettings}, базовые настройки хранятся под ключом None
+_local = Local()
 
-def get_wallet_settings_attr(wallet, attr):
+
+def _get_cache() -> dict:
+    if not hasattr(_local, "settings"):
+        _local.settings = {}
+    return _local.settings
+
+
+def clear_wallet_settings_cache(*args, **kwargs):
+    _local.settings = {}
+
+
+def _load_settings(wallet_ids) -> dict:
     WalletSettings = apps.get_model(app_label="finance", model_name="WalletSettings")
-    if wallet is not None:
-        personal_settings = WalletSettings.objects.get(wallet=wallet)
-        personal_value = getattr(personal_settings, attr)
-        if personal_value is not None:
-            return personal_value
-    base_settings = WalletSettings.objects.get(wallet__isnull=True)
-    base_value = getattr(base_settings, attr)
-    return base_value
+    cache = _get_cache()
+    missing = {wallet_id for wallet_id in wallet_ids if wallet_id not in cache}
+    if missing:
+        wallet_ids_filter = missing - {None}
+        queryset = WalletSettings.objects.filter(wallet_id__in=wallet_ids_filter)
+        if None in missing:
+            queryset |= WalletSettings.objects.filter(wallet__isnull=True)
+        for settings in queryset:
+            cache[settings.wallet_id] = settings
+        for wallet_id in missing - cache.keys():
+            if wallet_id is None:
+                raise WalletSettings.DoesNotExist("Base wallet settings not found")
+            cache[wallet_id] = None
+    return cache
+
+
+def resolve_many(wallets, attrs) -> dict:
+    """
+    Действующие значения настроек для нескольких кошельков за один запрос:
+    {wallet_id: {attr: value}}. Пустое персональное значение заменяется
+    базовым
+    """
+    wallet_ids = {getattr(wallet, "pk", wallet) for wallet in wallets}
+    cache = _load_settings(wallet_ids | {None})
+    base_settings = cache[None]
+
+    result = {}
+    for wallet_id in wallet_ids:
+        personal_settings = cache[wallet_id]
+        result[wallet_id] = {}
+        for attr in attrs:
+            value = getattr(personal_settings, attr, None)
+            if value is None:
+                value = getattr(base_settings, attr)
+            result[wallet_id][attr] = value
+    return result
+
+
+def get_wallet_settings_attr(wallet, attr):
+    return resolve_many([wallet], [attr])[getattr(wallet, "pk", wallet)][attr]
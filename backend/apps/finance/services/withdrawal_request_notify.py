@@ -1,8 +1,9 @@
 from django.urls import reverse
 
-from apps.telegram.utils import send_telegram_message
+from apps.telegram.tasks import send_telegram_message_task
 from apps.telegram.models import AdminTelegramAccount
 from config.settings import MAIN_URL
+from core.models import OutboxMessage
 
 
 def send_admin_withdrawal_notifications(withdrawal_request):
@@ -16,4 +17,4 @@ def send_admin_withdrawal_notifications(withdrawal_request):
 
     text = "Новая заявка на вывод средств: {}".format(full_url)
     for account in accounts:
-        send_telegram_message(account.telegram_id, text)
+        OutboxMessage.objects.add(send_telegram_message_task, account.telegram_id, text)
@@ -1,5 +1,7 @@
+from celery.signals import task_prerun
+from django.core.signals import request_started
 from django.dispatch import receiver
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_save, pre_save, post_delete
 from django.utils.timezone import now, timedelta
 from django.utils import translation
 from rest_framework.exceptions import ValidationError
@@ -15,15 +17,23 @@ from apps.finance.models import (
     OperationConfirmation,
     DestinationType,
     ProgramResult,
+    UserProgramAccrual,
+    WalletSettings,
+    Wallet,
+    LedgerCheckpoint,
+    LedgerEntry,
 )
 from apps.finance.models.operation_type import MessageType, OperationType
 from apps.finance.services.send_operation_confirm_email import (
     send_operation_confirm_email,
 )
 from apps.finance.services.commissions import add_commission_to_history
+from apps.finance.services.portfolio import clear_portfolio_cache
+from apps.finance.services.wallet_settings_attr import clear_wallet_settings_cache
 from apps.finance.tasks import make_daily_programs_accruals
 from apps.telegram.tasks import send_template_telegram_message_task
 from apps.telegram.models import MessageType as TelegramMessageType
+from core.models import OutboxMessage
 
 
 @receiver(post_save, sender=Operation)
@@ -60,7 +70,8 @@ def handle_operation(sender, instance: Operation, created, **kwargs):
                 if confirmation.destination == DestinationType.EMAIL:
                     send_operation_confirm_email(confirmation)
                 elif confirmation.destination == DestinationType.TELEGRAM:
-                    send_template_telegram_message_task.delay(
+                    OutboxMessage.objects.add(
+                        send_template_telegram_message_task,
                         telegram_id=confirmation.operation.wallet.user.telegram_id,
                         message_type=TelegramMessageType.OPERATION_CONFIRM,
                         insertion_data={"code": confirmation.code},
@@ -68,6 +79,55 @@ def handle_operation(sender, instance: Operation, created, **kwargs):
                     )
 
 
+@receiver(post_save, sender=UserProgramAccrual)
+@receiver(post_delete, sender=UserProgramAccrual)
+def update_user_program_accrual_totals(sender, instance: UserProgramAccrual, **kwargs):
+    UserProgram.objects.filter(pk=instance.program_id).refresh_accrual_totals()
+
+
+# настройки кошельков и итоги портфеля кэшируются на время запроса или задачи
+request_started.connect(clear_wallet_settings_cache)
+task_prerun.connect(clear_wallet_settings_cache)
+request_started.connect(clear_portfolio_cache)
+task_prerun.connect(clear_portfolio_cache)
+
+
+@receiver(post_save, sender=Wallet)
+def open_wallet_ledger(sender, instance: Wallet, created, **kwargs):
+    if created:
+        LedgerCheckpoint.objects.open([instance])
+
+
+@receiver(pre_save, sender=Wallet)
+def record_wallet_balance_change(
+    sender, instance: Wallet, update_fields=None, **kwargs
+):
+    """Изменение баланса в обход update_balance, например из админки"""
+    saved = getattr(instance, "_saved_balance", None)
+    if instance._state.adding or saved is None:
+        # новый кошелёк открывает журнал отметкой со своим балансом,
+        # у кошелька, созданного не из базы, баланса для сравнения нет
+        instance.remember_balance()
+        return
+    changes = {}
+    for field in ("free", "frozen"):
+        value = instance.__dict__.get(field)
+        if update_fields is not None and field not in update_fields:
+            continue
+        if value is None or saved[field] is None:
+            continue
+        changes[field] = value - saved[field]
+        saved[field] = value
+    if any(changes.values()):
+        LedgerEntry.objects.create(wallet=instance, **changes)
+
+
+@receiver(post_save, sender=WalletSettings)
+@receiver(post_delete, sender=WalletSettings)
+def invalidate_wallet_settings_cache(sender, instance: WalletSettings, **kwargs):
+    clear_wallet_settings_cache()
+
+
 @receiver(pre_save, sender=UserProgram)
 def save_user_program(sender, instance: UserProgram, **kwargs):
     instance._set_name()
@@ -79,7 +139,8 @@ def save_user_program(sender, instance: UserProgram, **kwargs):
         if previous.status != instance.status == running:
             instance.start_date = now().date()
             if telegram_id := instance.wallet.user.telegram_id:
-                send_template_telegram_message_task.delay(
+                OutboxMessage.objects.add(
+                    send_template_telegram_message_task,
                     telegram_id,
                     message_type=TelegramMessageType.PROGRAM_STARTED,
                     insertion_data={
@@ -103,7 +164,8 @@ def save_user_program_replenishment(
     elif not instance.done and instance.status == UserProgramReplenishment.Status.DONE:
         instance.apply()
         if telegram_id := instance.program.wallet.user.telegram_id:
-            send_template_telegram_message_task.delay(
+            OutboxMessage.objects.add(
+                send_template_telegram_message_task,
                 telegram_id,
                 message_type=TelegramMessageType.START_WITH_REPLENISHMENT,
                 insertion_data={
@@ -165,7 +227,8 @@ def handle_withdrawal_request(sender, instance: WithdrawalRequest, **kwargs):
             telegram_message_type = TelegramMessageType.TRANSFER_REJECTED
 
         if telegram_id := instance.wallet.user.telegram_id:
-            send_template_telegram_message_task.delay(
+            OutboxMessage.objects.add(
+                send_template_telegram_message_task,
                 telegram_id,
                 message_type=telegram_message_type,
                 insertion_data={
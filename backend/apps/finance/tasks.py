@@ -1,25 +1,25 @@
 from celery import shared_task
 from django.db import transaction
 from django.db.models import Sum
-from django.utils.timezone import now, timedelta
+from django.utils.timezone import localdate, now, timedelta
 
-from apps.accounts.models import User
 from apps.finance.models import (
     FrozenItem,
-    Program,
     Operation,
     UserProgram,
     UserProgramReplenishment,
     ProgramResult,
     WalletHistory,
-    Wallet,
-    Holidays,
+    LedgerCheckpoint,
     UserProgramAccrual,
 )
 from apps.finance.models.program import UserProgramHistory
-from apps.finance.utils import create_accrual
+from apps.finance.services.accruals import make_bulk_accruals
+from apps.finance.services import commissions, partitioning
 from apps.finance.services.commissions import add_commission_to_history
+from apps.finance.services.stats import create_stats_snapshots
 from apps.gdw_site.models import FundDailyStats
+from core.utils.trading_calendar import trading_calendar
 
 
 @shared_task
@@ -77,20 +77,16 @@ def apply_program_finish():
 @shared_task
 def make_daily_programs_accruals():
     with transaction.atomic():
-        yesterday = now() - timedelta(days=1)
+        yesterday = localdate() - timedelta(days=1)
         result = ProgramResult.objects.first()
-        is_holiday = Holidays.objects.filter(
-            start_date__lte=yesterday, end_date__gte=yesterday
-        ).exists()
+        is_holiday = trading_calendar.is_holiday(yesterday)
         if is_holiday or not result:
             FundDailyStats.objects.update_or_create(date=yesterday)
             return "No accruals because of holiday or missing result"
         FundDailyStats.objects.update_or_create(
             date=yesterday, defaults={"percent": result.result}
         )
-        programs = Program.objects.filter(accrual_type=Program.AccrualType.DAILY)
-        for program in programs:
-            make_program_accruals(program, result)
+        make_bulk_accruals(result)
         result.save()
 
         total_success_fee, total_management_fee = (
@@ -109,51 +105,31 @@ def make_daily_programs_accruals():
         )
 
 
-def make_program_accruals(program: Program, result: ProgramResult):
-    user_programs = UserProgram.objects.filter(
-        program=program, status=UserProgram.Status.RUNNING
-    )
-    for user_program in user_programs:
-        if not user_program.accruals.filter(created_at=now().date()).exists():
-            accrual = create_accrual(user_program, result)
-            Operation.objects.create(
-                type=Operation.Type.PROGRAM_ACCRUAL,
-                wallet=user_program.wallet,
-                user_program=user_program,
-                amount=accrual.amount,
-            )
+@shared_task
+def compact_commissions():
+    return commissions.compact_commissions()
 
 
 @shared_task
-def create_wallet_history():
-    users = User.objects.all()
+def create_ledger_checkpoints():
+    return LedgerCheckpoint.objects.create_checkpoints()
 
-    for user in users:
-        wallet: Wallet = user.wallet
-        total_deposits = (
-            UserProgram.objects.filter(
-                wallet=wallet,
-            )
-            .exclude(status=UserProgram.Status.FINISHED)
-            .aggregate(total_deposits=Sum("deposit"))["total_deposits"]
-            or 0
-        )
 
-        WalletHistory.objects.create(
-            user=user, free=wallet.free, frozen=wallet.frozen, deposits=total_deposits
-        )
+@shared_task
+def create_partitions():
+    return partitioning.create_partitions()
+
+
+@shared_task
+def create_wallet_history():
+    WalletHistory.objects.create_snapshots()
 
 
 @shared_task
 def create_user_program_history():
-    users = User.objects.all()
-    for user in users:
-        wallet: Wallet = user.wallet
-        for program in wallet.programs.all():
-            UserProgramHistory.objects.create(
-                user_program=program,
-                funds=program.funds,
-                deposit=program.deposit,
-                profit=program.profit,
-                status=program.status,
-            )
+    UserProgramHistory.objects.create_snapshots()
+
+
+@shared_task
+def create_stats_snapshot():
+    create_stats_snapshots([now().date() - timedelta(days=1)])
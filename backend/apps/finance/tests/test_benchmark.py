@@ -0,0 +1,101 @@
+import json
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+from django.db.models.signals import pre_save
+from django.test import TestCase
+from django.urls import reverse
+from freezegun import freeze_time
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.finance.management.commands.benchmark_finance import ENDPOINTS, TASKS
+from apps.finance.models import ProgramResult
+from apps.finance.services.benchmark import (
+    generate_portfolio,
+    load_message_templates,
+    measure,
+)
+from apps.finance.signals import update_program_result_settings
+from core.utils import DisconnectSignal
+
+# замеры сравниваются с сохранёнными в BASELINE, после намеренного изменения
+# базовая линия перезаписывается запуском тестов с BENCHMARK_UPDATE_BASELINE=1
+BASELINE = Path(__file__).with_name("benchmark_baseline.json")
+UPDATE_BASELINE = os.environ.get("BENCHMARK_UPDATE_BASELINE") == "1"
+
+USERS = 50
+DAYS = 10
+SEED = 0
+# число завершённых программ и выходной вчера зависят от даты, поэтому замеры
+# идут в фиксированный рабочий день, часы при этом идут для замера времени
+TODAY = "2026-06-10 12:00"
+
+# число запросов не должно расти, время может отличаться между машинами,
+# поэтому допускается запас в TIME_FACTOR раз, но не меньше TIME_SLACK секунд
+TIME_FACTOR = 3
+TIME_SLACK = 0.2
+
+
+def offline(user_ids):
+    return {user_id: False for user_id in user_ids}
+
+
+@freeze_time(TODAY, tick=True)
+@patch("apps.accounts.services.presence.online_status", offline)
+class FinanceBenchmarkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        load_message_templates()
+        # иначе сохранение ProgramResult поставит в очередь настоящие начисления
+        with DisconnectSignal(pre_save, update_program_result_settings, ProgramResult):
+            generate_portfolio(USERS, DAYS, SEED)
+        cls.user = User.objects.filter(wallet__programs__isnull=False).latest("pk")
+        cls.admin = User.objects.create_superuser(
+            email="benchmark_admin@test.com", password=None
+        )
+
+    def setUp(self):
+        self.clients = {
+            "api": APIClient(SERVER_NAME="localhost"),
+            "admin": APIClient(SERVER_NAME="localhost"),
+        }
+        self.clients["api"].force_authenticate(self.user)
+        self.clients["admin"].force_login(self.admin)
+
+    def assert_within_baseline(self, results):
+        baseline = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+        if UPDATE_BASELINE:
+            for result in results:
+                baseline[result["name"]] = {
+                    "queries": result["queries"],
+                    "time": round(result["time"], 3),
+                }
+            BASELINE.write_text(json.dumps(baseline, indent=4, sort_keys=True) + "\n")
+            return
+
+        for result in results:
+            with self.subTest(result["name"]):
+                self.assertIn(result["name"], baseline, "нет базовой линии")
+                expected = baseline[result["name"]]
+                self.assertLessEqual(result["queries"], expected["queries"])
+                self.assertLessEqual(
+                    result["time"],
+                    max(expected["time"] * TIME_FACTOR, expected["time"] + TIME_SLACK),
+                )
+
+    def test_endpoints(self):
+        results = []
+        for client_name, url_name, params in ENDPOINTS:
+            url = reverse(url_name)
+            result = measure(url, self.clients[client_name].get, url, params)
+            self.assertEqual(result["result"].status_code, 200, url)
+            result["name"] = f"GET {url} {params or ''}".strip()
+            results.append(result)
+        self.assert_within_baseline(results)
+
+    def test_tasks(self):
+        with DisconnectSignal(pre_save, update_program_result_settings, ProgramResult):
+            results = [measure(task.name, task) for task in TASKS]
+        self.assert_within_baseline(results)
@@ -8,23 +8,37 @@ from apps.finance.services.wallet_settings_attr import get_wallet_settings_attr
 from core.utils import safe_zero_div
 
 
-def create_accrual(
-    user_program: UserProgram, result: ProgramResult
-) -> UserProgramAccrual:
-    success_fee_pct = get_wallet_settings_attr(user_program.wallet, "success_fee")
-    management_fee_pct = get_wallet_settings_attr(user_program.wallet, "management_fee")
-
-    amount = user_program.funds * result.result / 100
-    management_fee = user_program.deposit * management_fee_pct / 100
+def calculate_accrual(
+    funds, deposit, result, success_fee_pct, management_fee_pct
+) -> dict:
+    amount = funds * result / 100
+    management_fee = deposit * management_fee_pct / 100
     success_fee = max(0, amount * success_fee_pct / 100)
 
     amount -= success_fee + management_fee
-    percent_amount = safe_zero_div(amount * 100, user_program.funds)
+    percent_amount = safe_zero_div(amount * 100, funds)
 
-    return user_program.accruals.create(
+    return dict(
         amount=amount,
         percent_amount=percent_amount,
         success_fee=success_fee,
         management_fee=management_fee,
-        percent_total=result.result,
+        percent_total=result,
+    )
+
+
+def create_accrual(
+    user_program: UserProgram, result: ProgramResult
+) -> UserProgramAccrual:
+    success_fee_pct = get_wallet_settings_attr(user_program.wallet, "success_fee")
+    management_fee_pct = get_wallet_settings_attr(user_program.wallet, "management_fee")
+
+    return user_program.accruals.create(
+        **calculate_accrual(
+            funds=user_program.funds,
+            deposit=user_program.deposit,
+            result=result.result,
+            success_fee_pct=success_fee_pct,
+            management_fee_pct=management_fee_pct,
+        )
     )
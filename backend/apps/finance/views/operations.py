@@ -28,8 +28,10 @@ from apps.accounts.permissions import IsLocal, IsAuthenticatedAndVerified
 
 from apps.accounts.serializers import UserEmailConfirmSerializer
 from apps.finance.models import (
+    CommissionIncrement,
     Operation,
     OperationHistory,
+    OperationHistoryTotal,
     OperationConfirmation,
     DestinationType,
 )
@@ -38,12 +40,16 @@ from apps.finance.serializers import OperationHistorySerializer
 from apps.finance.serializers.operations import (
     OperationReplenishmentConfirmSerializer,
 )
+from apps.finance.services.commissions import (
+    get_pending_commission_days,
+    merge_pending_commissions,
+)
 from apps.finance.services.operation_replenishment_confirmation import (
     operation_replenishment_confirmation,
 )
 from config import settings
 from core.exceptions import ServiceUnavailable
-from core.pagination import PageNumberSetPagination
+from core.pagination import PageNumberSetPagination, KeysetPagination
 
 
 class OperationHistoryFilterSet(FilterSet):
@@ -59,28 +65,74 @@ class OperationHistoryFilterSet(FilterSet):
         return queryset.annotate(abs_amount=Abs("amount")).filter(abs_amount__lte=value)
 
 
+class OperationHistoryTotalFilterSet(FilterSet):
+    operation_type = CharFilter(field_name="operation_type")
+    date = DateFromToRangeFilter(field_name="date")
+
+
 class OperationHistoryAPIView(ListAPIView):
     serializer_class = OperationHistorySerializer
     permission_classes = [IsAuthenticated]
     pagination_class = PageNumberSetPagination
+    cursor_pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend]
     filterset_class = OperationHistoryFilterSet
 
     def get_queryset(self):
         return OperationHistory.objects.filter(wallet=self.request.user.wallet)
 
+    def get_pending_commissions(self) -> dict:
+        """
+        Комиссии бизнес-кошелька, которые ещё не перенёс compact_commissions.
+        Они добавляются к ответу при чтении, без записи в базу
+        """
+        if not self.request.user.business_account:
+            return {}
+        increments = self.filterset_class(
+            self.request.query_params, queryset=CommissionIncrement.objects.all()
+        ).qs
+        return get_pending_commission_days(increments)
+
+    def get_total_data(self, queryset, pending):
+        params = self.request.query_params
+        if params.get("amount_min") or params.get("amount_max"):
+            return {
+                "total_in": queryset.total_in(),
+                "total_out": queryset.total_out(),
+            }
+        totals = OperationHistoryTotal.objects.filter(wallet=self.request.user.wallet)
+        totals = OperationHistoryTotalFilterSet(params, queryset=totals).qs.totals()
+        for amount, created_at in pending.values():
+            totals["total_in" if amount > 0 else "total_out"] += amount
+        return totals
+
+    def merge_pending(self, history, pending, first_page=True):
+        if not pending:
+            return history
+        return merge_pending_commissions(
+            history, self.request.user.wallet, pending, add_missing=first_page
+        )
+
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
-        total_data = {
-            "total_in": queryset.total_in(),
-            "total_out": queryset.total_out(),
-        }
-        page = self.paginate_queryset(queryset)
-        if request.query_params.get("page") and page is not None:
+        pending = self.get_pending_commissions()
+        total_data = self.get_total_data(queryset, pending)
+        paginator = self.cursor_pagination_class()
+        cursor = request.query_params.get(paginator.cursor_query_param)
+        if request.query_params.get("page"):
+            page = self.paginate_queryset(queryset)
+            page = self.merge_pending(page, pending, self.paginator.page.number == 1)
             serializer = self.get_serializer(page, many=True)
             serializer_data = self.get_paginated_response(serializer.data).data
+        elif cursor is not None:
+            # страницы по ключу по запросу клиента, первая - с пустым cursor
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            page = self.merge_pending(page, pending, not cursor)
+            serializer = self.get_serializer(page, many=True)
+            serializer_data = paginator.get_paginated_response(serializer.data).data
         else:
-            serializer = self.get_serializer(queryset, many=True)
+            history = self.merge_pending(queryset, pending)
+            serializer = self.get_serializer(history, many=True)
             serializer_data = {"results": serializer.data}
         return Response({**total_data, **serializer_data})
 
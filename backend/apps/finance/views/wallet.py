@@ -15,6 +15,7 @@ from apps.finance.serializers import (
 )
 from apps.finance.models import Wallet, FrozenItem, WalletSettings
 from apps.finance.serializers import WalletSettingsSerializer
+from apps.finance.services.commissions import get_pending_commissions
 from core.views import OperationViewMixin
 
 
@@ -23,7 +24,10 @@ class WalletAPIView(RetrieveAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
-        return get_object_or_404(Wallet, user=self.request.user)
+        wallet = get_object_or_404(Wallet, user=self.request.user)
+        if self.request.user.business_account:
+            wallet.free += get_pending_commissions()
+        return wallet
 
 
 class WalletViewSet(OperationViewMixin, ModelViewSet):
@@ -52,9 +56,7 @@ class FrozenItemViewSet(OperationViewMixin, ModelViewSet):
     permission_classes = [IsAuthenticatedAndVerified]
 
     def get_queryset(self):
-        return FrozenItem.objects.filter(
-            wallet=self.request.user.wallet, status=FrozenItem.Status.INITIAL
-        )
+        return FrozenItem.objects.filter(wallet=self.request.user.wallet).pending()
 
     def get_serializer_class(self):
         if self.request.method == "GET":
@@ -64,6 +66,10 @@ class FrozenItemViewSet(OperationViewMixin, ModelViewSet):
     def get(self, request, *args, **kwargs):
         return self.list(request, *args, **kwargs)
 
+    @action(methods=["get"], detail=False)
+    def summary(self, request, *args, **kwargs):
+        return Response(self.get_queryset().summary())
+
     @action(methods=["post"], detail=False)
     def defrost(self, request, *args, **kwargs):
         return self.create(request, *args, **kwargs)
@@ -2,8 +2,8 @@ import csv
 import os
 from decimal import Decimal
 from django.core.management.base import BaseCommand
+from django.db.models.signals import post_delete
 from django.utils.timezone import datetime
-from django.db.models import Sum
 
 from config.settings import BASE_DIR
 
@@ -14,6 +14,8 @@ from apps.gdw_site.models import (
     SiteAnswer,
     SiteContact,
 )
+from apps.gdw_site.signals import update_fund_totals
+from core.utils import DisconnectSignal
 
 
 class Command(BaseCommand):
@@ -29,12 +31,14 @@ class Command(BaseCommand):
             program.description = descriptions[i]
             program.save()
 
-        FundDailyStats.objects.all().delete()
+        with DisconnectSignal(post_delete, update_fund_totals, FundDailyStats):
+            FundDailyStats.objects.all().delete()
         FundMonthlyStats.objects.all().delete()
 
         fieldnames = ("weekday", "date", "percent")
         filepath = os.path.join(BASE_DIR, "apps/gdw_site/src/profits.csv")
 
+        daily_stats = []
         with open(filepath, "r") as f:
             reader = csv.DictReader(f, fieldnames=fieldnames)
             for row in reader:
@@ -43,22 +47,11 @@ class Command(BaseCommand):
                     percent = Decimal(row["percent"].replace(",", ".").strip("%"))
                 else:
                     percent = Decimal("0.00")
-                FundDailyStats.objects.create(date=date, percent=percent)
+                daily_stats.append(FundDailyStats(date=date, percent=percent))
 
-        dates = FundDailyStats.objects.values_list("date", flat=True)
-        start_year, end_year = [dates[i].year for i in [0, len(dates)-1]]
-
-        for year in range(start_year, end_year + 1):
-            start_month = 1 if year != start_year else dates[0].month
-            end_month = 12 if year != end_year else dates[len(dates)-1].month
-
-            for month in range(start_month, end_month + 1):
-                next_month = month + 1 if month != 12 else 1
-                next_month_first_day = datetime(year + (month == 12), next_month, 1)
-                total = FundDailyStats.objects.filter(
-                    date__lt=next_month_first_day
-                ).aggregate(total=Sum("percent"))["total"] or Decimal("0.0")
-                FundMonthlyStats.objects.create(year=year, month=month, total=total)
+        FundDailyStats.objects.bulk_create(daily_stats)
+        FundDailyStats.objects.refresh_totals()
+        FundMonthlyStats.objects.refresh_totals()
 
         SiteAnswer.objects.all().delete()
         for i in range(1, 6):
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:45
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+def forwards(apps, schema_editor):
+    FundDailyStats = apps.get_model("gdw_site", "FundDailyStats")
+    table = schema_editor.quote_name(FundDailyStats._meta.db_table)
+    schema_editor.execute(
+        f"UPDATE {table} AS t SET total = s.total "
+        f"FROM (SELECT id, SUM(percent) OVER (ORDER BY date) AS total "
+        f"FROM {table}) AS s WHERE t.id = s.id"
+    )
+
+
+def backwards(apps, _):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("gdw_site", "0034_alter_redirectlinks_url"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="funddailystats",
+            name="total",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=Decimal("0.0"),
+                editable=False,
+                max_digits=10,
+                verbose_name="Накопленная прибыль (%)",
+            ),
+        ),
+        migrations.RunPython(forwards, backwards),
+    ]
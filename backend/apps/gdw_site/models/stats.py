@@ -1,11 +1,12 @@
 from decimal import Decimal
+from django.db import connection
 from django.db.models import (
     Model,
     DateField,
     DecimalField,
     IntegerChoices,
     IntegerField,
-    Sum,
+    QuerySet,
 )
 from django.utils.timezone import datetime
 from django.core.validators import MinValueValidator
@@ -13,15 +14,43 @@ from django.core.validators import MinValueValidator
 from core.utils import decimal_pct
 
 
+class FundDailyStatsQuerySet(QuerySet):
+    def refresh_totals(self, from_date=None):
+        """
+        Пересчитать накопленную доходность начиная с from_date одним запросом:
+        к итогу предыдущего дня прибавляется нарастающая сумма за период
+        """
+        base = Decimal("0.0")
+        if from_date is None:
+            from_date = datetime.min.date()
+        else:
+            previous = self.model.objects.filter(date__lt=from_date).order_by("-date")
+            base = previous.values_list("total", flat=True).first() or base
+
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} AS t SET total = s.total "
+                f"FROM (SELECT id, %s + SUM(percent) OVER (ORDER BY date) AS total "
+                f"FROM {table} WHERE date >= %s) AS s "
+                f"WHERE t.id = s.id AND t.total IS DISTINCT FROM s.total",
+                [base, from_date],
+            )
+            return cursor.rowcount
+
+
 class FundDailyStats(Model):
     date = DateField("Дата", unique=True)
     percent = DecimalField("Прибыль (%)", **decimal_pct, default=Decimal("0.0"))
+    total = DecimalField(
+        "Накопленная прибыль (%)",
+        max_digits=10,
+        decimal_places=2,
+        default=Decimal("0.0"),
+        editable=False,
+    )
 
-    @property
-    def total(self):
-        return FundDailyStats.objects.filter(date__lte=self.date).aggregate(
-            total=Sum("percent")
-        )["total"]
+    objects = FundDailyStatsQuerySet.as_manager()
 
     class Meta:
         verbose_name = "значение"
@@ -29,6 +58,26 @@ class FundDailyStats(Model):
         ordering = ["date"]
 
 
+class FundMonthlyStatsQuerySet(QuerySet):
+    def refresh_totals(self, from_date=None):
+        """Итоги месяцев по накопленной доходности на последний день месяца"""
+        daily_stats = FundDailyStats.objects.order_by("date")
+        if from_date is not None:
+            daily_stats = daily_stats.filter(date__gte=from_date.replace(day=1))
+        totals = {}
+        for date, total in daily_stats.values_list("date", "total"):
+            totals[date.year, date.month] = total
+        self.bulk_create(
+            [
+                FundMonthlyStats(year=year, month=month, total=total)
+                for (year, month), total in totals.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["year", "month"],
+            update_fields=["total"],
+        )
+
+
 class FundMonthlyStats(Model):
     class Month(IntegerChoices):
         JAN = 1, "Январь"
@@ -48,6 +97,8 @@ class FundMonthlyStats(Model):
     month = IntegerField("Месяц", choices=Month.choices)
     total = DecimalField("Суммарный доход (%)", **decimal_pct)
 
+    objects = FundMonthlyStatsQuerySet.as_manager()
+
     @property
     def date(self):
         return datetime(self.year, self.month, 1).strftime("%m.%y")
@@ -7,11 +7,11 @@ from rest_framework.serializers import (
 )
 from rest_framework.exceptions import ValidationError
 from django.db.models import TextChoices
-from django.utils.timezone import timedelta
 from django.utils.translation import gettext_lazy as _
 from dateutil.relativedelta import relativedelta
 
-from apps.gdw_site.models import SiteProgram, FundDailyStats
+from apps.gdw_site.models import SiteProgram
+from apps.gdw_site.services.calculator import calculate_result, daily_returns
 from apps.finance.services.wallet_settings_attr import get_wallet_settings_attr
 from core.utils import decimal_usdt
 from core.utils.error import get_error, ErrorMessageType
@@ -43,14 +43,14 @@ class CalculatorSerializer(Serializer):
     topup_period = CharField(required=False)
 
     def validate_start_date(self, value):
-        min_date = FundDailyStats.objects.first().date
-        if value < min_date:
+        daily_returns.load()
+        if not daily_returns.first_date or value < daily_returns.first_date:
             raise ValidationError("Недостаточно данных за указанный период")
         return value
 
     def validate_end_date(self, value):
-        max_date = FundDailyStats.objects.last().date
-        if value > max_date:
+        daily_returns.load()
+        if not daily_returns.last_date or value > daily_returns.last_date:
             raise ValidationError("Недостаточно данных за указанный период")
         return value
 
@@ -90,33 +90,17 @@ class CalculatorSerializer(Serializer):
 
 
 def calculate_program_result(attrs, program: SiteProgram):
-    current_date = attrs["start_date"]
-    end_date = attrs["end_date"]
-    deposit = attrs["deposit"]
-    topup = attrs.get("topup", 0)
-    if topup:
-        topup_period = TOPUP_PERIOD_MONTHS[attrs["topup_period"]]
-        topup_interval = relativedelta(months=topup_period) if topup_period else None
-        next_topup_date = current_date + topup_interval
-
-    success_fee_pct = get_wallet_settings_attr(None, "success_fee")
-    management_fee_pct = get_wallet_settings_attr(None, "management_fee")
-
-    result = 0
-    topups = 0
-
-    while current_date <= end_date:
-        daily_profit_pct = FundDailyStats.objects.get(date=current_date).percent
-        today_profit = deposit * daily_profit_pct / 100
-        management_fee = deposit * management_fee_pct / 100
-        success_fee = max(0, today_profit * success_fee_pct / 100)
-        today_profit -= success_fee + management_fee
-        result += today_profit
-        if program.duration is not None:
-            deposit += today_profit
-        if topup and current_date == next_topup_date:
-            topups += topup
-            deposit += topup
-            next_topup_date += topup_interval
-        current_date += timedelta(days=1)
-    return round(result, 2), round(topups, 2)
+    topup = attrs.get("topup")
+    result = calculate_result(
+        start_date=attrs["start_date"],
+        end_date=attrs["end_date"],
+        deposit=attrs["deposit"],
+        compound=program.duration is not None,
+        success_fee_pct=get_wallet_settings_attr(None, "success_fee"),
+        management_fee_pct=get_wallet_settings_attr(None, "management_fee"),
+        topup=topup,
+        topup_months=topup and TOPUP_PERIOD_MONTHS[attrs["topup_period"]],
+    )
+    if result is None:
+        raise ValidationError("Недостаточно данных за указанный период")
+    return result
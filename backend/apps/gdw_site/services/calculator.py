@@ -0,0 +1,154 @@
+import time
+from datetime import date
+from decimal import Decimal
+from functools import lru_cache
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+
+class DailyReturns:
+    """
+    Ежедневная доходность фонда из FundDailyStats массивом в памяти процесса:
+    элемент i - доходность (%) за день first_date + i, пропущенные дни - nan.
+    Кэш сбрасывается при сохранении и удалении значения, а в остальных
+    процессах устаревает через timeout секунд
+    """
+
+    def __init__(self, model_label="gdw_site.FundDailyStats", timeout=300):
+        self.model_label = model_label
+        self.timeout = timeout
+        self.version = 0
+        self.first_date = None
+        self.last_date = None
+        self._percents = np.empty(0)
+        self._loaded_at = None
+        post_save.connect(self.clear, sender=model_label, weak=False)
+        post_delete.connect(self.clear, sender=model_label, weak=False)
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def clear(self, *args, **kwargs):
+        self._loaded_at = None
+
+    def load(self):
+        if (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < self.timeout
+        ):
+            return
+        rows = list(self.model.objects.order_by("date").values_list("date", "percent"))
+        self.first_date = rows[0][0] if rows else None
+        self.last_date = rows[-1][0] if rows else None
+        percents = np.full(
+            (self.last_date - self.first_date).days + 1 if rows else 0, np.nan
+        )
+        for day, percent in rows:
+            percents[(day - self.first_date).days] = percent
+        self._percents = percents
+        self.version += 1
+        self._loaded_at = time.monotonic()
+
+    def get(self, start_date: date, end_date: date):
+        """Доходность за дни с start_date по end_date, None если данных нет"""
+        self.load()
+        if not self.first_date or not (
+            self.first_date <= start_date <= end_date <= self.last_date
+        ):
+            return None
+        start = (start_date - self.first_date).days
+        percents = self._percents[start : start + (end_date - start_date).days + 1]
+        if np.isnan(percents).any():
+            return None
+        return percents
+
+
+daily_returns = DailyReturns()
+
+
+def get_topup_days(start_date: date, end_date: date, months: int) -> list[int]:
+    """Номера дней от start_date, в которые вносится пополнение"""
+    interval = relativedelta(months=months)
+    days = []
+    topup_date = start_date + interval
+    while topup_date <= end_date:
+        days.append((topup_date - start_date).days)
+        topup_date += interval
+    return days
+
+
+def calculate_result(
+    start_date: date,
+    end_date: date,
+    deposit: Decimal,
+    compound: bool,
+    success_fee_pct: Decimal,
+    management_fee_pct: Decimal,
+    topup: Decimal | None = None,
+    topup_months: int | None = None,
+):
+    """
+    Доход программы за период и сумма пополнений. Доход за день линеен
+    по депозиту: deposit * g, где g - доходность за вычетом комиссий,
+    поэтому весь период считается через накопленный индекс доходности.
+    Пополнение вносится в конце дня и приносит доход со следующего дня.
+    Если за период нет данных, возвращает None
+    """
+    daily_returns.load()
+    return _calculate_result(
+        daily_returns.version,
+        start_date,
+        end_date,
+        deposit,
+        compound,
+        success_fee_pct,
+        management_fee_pct,
+        topup or None,
+        topup_months if topup else None,
+    )
+
+
+@lru_cache(maxsize=1024)
+def _calculate_result(
+    version,
+    start_date,
+    end_date,
+    deposit,
+    compound,
+    success_fee_pct,
+    management_fee_pct,
+    topup,
+    topup_months,
+):
+    # version - версия массива доходности, после обновления данных
+    # прежние результаты больше не совпадают по ключу
+    percents = daily_returns.get(start_date, end_date)
+    if percents is None:
+        return None
+
+    returns = percents / 100
+    growth = (
+        returns
+        - np.maximum(returns, 0) * float(success_fee_pct) / 100
+        - float(management_fee_pct) / 100
+    )
+    topup_days = get_topup_days(start_date, end_date, topup_months) if topup else []
+
+    if compound:
+        # index[i] - во сколько раз вырос депозит к концу дня i
+        index = np.cumprod(1 + growth)
+        result = float(deposit) * (index[-1] - 1)
+        for day in topup_days:
+            result += float(topup) * (index[-1] / index[day] - 1)
+    else:
+        index = np.cumsum(growth)
+        result = float(deposit) * index[-1]
+        for day in topup_days:
+            result += float(topup) * (index[-1] - index[day])
+
+    topups = (topup or 0) * len(topup_days)
+    return round(Decimal(result), 2), round(Decimal(topups), 2)
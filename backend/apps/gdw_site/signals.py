@@ -1,7 +1,12 @@
 from django.dispatch import receiver
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 
-from apps.gdw_site.models import SiteNewsRus, SiteNewsEng
+from apps.gdw_site.models import (
+    FundDailyStats,
+    FundMonthlyStats,
+    SiteNewsRus,
+    SiteNewsEng,
+)
 from apps.gdw_site.tasks import find_and_sync_message
 
 
@@ -17,3 +22,11 @@ def sync_site_news_eng(sender, instance: SiteNewsEng, created: bool, **kwargs):
     if instance.edited_by_admin and instance.sync_with_tg:
         if not instance.same("sync_with_tg"):
             find_and_sync_message.delay(instance.message_id, lang="en")
+
+
+@receiver(post_save, sender=FundDailyStats)
+@receiver(post_delete, sender=FundDailyStats)
+def update_fund_totals(sender, instance: FundDailyStats, **kwargs):
+    date = FundDailyStats._meta.get_field("date").to_python(instance.date)
+    FundDailyStats.objects.refresh_totals(from_date=date)
+    FundMonthlyStats.objects.refresh_totals(from_date=date)
@@ -13,16 +13,18 @@ class FundStatsAPIView(ListAPIView):
     def get_queryset(self):
         queryset = FundDailyStats.objects.all()
         query_params = self.request.query_params
-        start_date = query_params.get("start_date", queryset.earliest("date").date)
-        end_date = query_params.get("end_date", queryset.latest("date").date)
-        return queryset.filter(date__gte=start_date, date__lte=end_date)
+        if start_date := query_params.get("start_date"):
+            queryset = queryset.filter(date__gte=start_date)
+        if end_date := query_params.get("end_date"):
+            queryset = queryset.filter(date__lte=end_date)
+        return queryset
 
     def list(self, request, *args, **kwargs):
-        response = super().list(request, *args, **kwargs)
-        queryset = self.get_queryset()
-        total_for_period = (
-            queryset.latest("date").total - queryset.earliest("date").total
-        )
+        stats = list(self.filter_queryset(self.get_queryset()))
+        total_for_period = stats[-1].total - stats[0].total if stats else 0
         return Response(
-            data={"total_for_period": total_for_period, "results": response.data}
+            data={
+                "total_for_period": total_for_period,
+                "results": self.get_serializer(stats, many=True).data,
+            }
         )
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+
+from aiogram.exceptions import AiogramError, TelegramRetryAfter
+from channels.layers import get_channel_layer
+
+from config.settings import MAIN_BOT
+
+# лимиты Bot API: около 30 сообщений в секунду на бота и 1 в секунду в один чат
+GLOBAL_RATE = 30
+CHAT_INTERVAL = 1.0
+# повторов одного сообщения после TelegramRetryAfter
+MAX_RETRIES = 3
+
+# лимиты общие для всех воркеров celery: время следующей отправки бота и чата
+# хранится в redis и резервируется атомарно скриптом
+GLOBAL_KEY = "telegram:next_send_at"
+CHAT_KEY_TEMPLATE = "telegram:next_send_at:{}"
+# KEYS: ключ бота, ключ чата; ARGV: интервалы бота и чата в мс.
+# Возвращает, сколько мс ждать до зарезервированного слота
+RESERVE_SLOT_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local send_at = math.max(
+    now,
+    tonumber(redis.call('GET', KEYS[1]) or 0),
+    tonumber(redis.call('GET', KEYS[2]) or 0)
+)
+local global_next = send_at + tonumber(ARGV[1])
+local chat_next = send_at + tonumber(ARGV[2])
+redis.call('SET', KEYS[1], global_next, 'PX', global_next - now + 1000)
+redis.call('SET', KEYS[2], chat_next, 'PX', chat_next - now + 1000)
+return send_at - now
+"""
+
+logger = logging.getLogger(__name__)
+
+
+class TelegramDispatcher:
+    """
+    Отправка очереди сообщений через одну сессию MAIN_BOT
+    с ограниченным числом одновременных запросов и соблюдением лимитов телеграма,
+    слоты отправки резервируются в redis, поэтому лимиты общие для всех процессов
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 10,
+        global_rate: int = GLOBAL_RATE,
+        chat_interval: float = CHAT_INTERVAL,
+        max_retries: int = MAX_RETRIES,
+    ):
+        self.queue = asyncio.Queue()
+        self.concurrency = concurrency
+        self.global_interval = 1 / global_rate
+        self.chat_interval = chat_interval
+        self.max_retries = max_retries
+
+    def put(self, telegram_id, text):
+        self.queue.put_nowait((telegram_id, text))
+
+    async def run(self):
+        if not MAIN_BOT:
+            return
+
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        await self.queue.join()
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _worker(self):
+        while True:
+            telegram_id, text = await self.queue.get()
+            try:
+                await self._send(telegram_id, text)
+            except Exception:
+                # ошибка одного сообщения не должна останавливать воркер
+                logger.exception("Не удалось отправить сообщение в чат %s", telegram_id)
+            finally:
+                self.queue.task_done()
+
+    async def _send(self, telegram_id, text):
+        for attempt in range(self.max_retries + 1):
+            await self._wait_for_slot(telegram_id)
+            try:
+                await MAIN_BOT.send_message(telegram_id, text)
+                return
+            except TelegramRetryAfter as e:
+                if attempt == self.max_retries:
+                    logger.warning(
+                        "Сообщение в чат %s не отправлено после %s повторов",
+                        telegram_id,
+                        self.max_retries,
+                    )
+                    return
+                await asyncio.sleep(e.retry_after)
+            except AiogramError as e:
+                logger.warning("Сообщение в чат %s не отправлено: %s", telegram_id, e)
+                return
+
+    async def _wait_for_slot(self, telegram_id):
+        wait_ms = (
+            await get_channel_layer()
+            .connection(0)
+            .eval(
+                RESERVE_SLOT_SCRIPT,
+                2,
+                GLOBAL_KEY,
+                CHAT_KEY_TEMPLATE.format(telegram_id),
+                round(self.global_interval * 1000),
+                round(self.chat_interval * 1000),
+            )
+        )
+        await asyncio.sleep(int(wait_ms) / 1000)
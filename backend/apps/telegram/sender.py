@@ -1,10 +1,13 @@
-from datetime import date
-from decimal import Decimal
+import logging
 
 from django.utils import translation
 
-from apps.telegram.models import MessageType, TemplateTelegramMessage
+from apps.telegram.dispatcher import TelegramDispatcher
+from apps.telegram.models import MessageType
 from apps.telegram.utils import asend_telegram_message, aiogram_async_to_sync
+from core.utils.template_registry import telegram_messages
+
+logger = logging.getLogger(__name__)
 
 
 @aiogram_async_to_sync
@@ -22,34 +25,40 @@ async def asend_template_telegram_message(
     if telegram_id is None:
         return
 
-    if insertion_data is None:
-        insertion_data = {}
-
     assert message_type in MessageType.values
 
-    template_message = await TemplateTelegramMessage.objects.aget(
-        message_type=message_type
-    )
     language = language or translation.get_language()
-    text = template_message.text.get(language)
-
-    for field in template_message.insertion_iter():
-        try:
-            value = insertion_data[field]
-        except KeyError:
-            raise ValueError(f"insertion data dict must have {field}")
-
-        if isinstance(value, date):
-            value = value.strftime("%d.%m.%Y")
-        elif isinstance(value, (float, Decimal)):
-            value = round(value, 2)
-
-        text = text.replace(f"{{{field}}}", str(value))
+    text = await telegram_messages.arender(message_type, insertion_data, language)
 
     await asend_telegram_message(telegram_id, text)
 
 
 @aiogram_async_to_sync
 async def send_template_telegram_message_for_many(messages_data: list):
+    """
+    Отправка пачки шаблонных сообщений через одну сессию бота
+    """
+    messages_data = [m for m in messages_data if m.get("telegram_id") is not None]
+    message_types = {m["message_type"] for m in messages_data}
+    assert message_types <= set(MessageType.values)
+
+    await telegram_messages.aload()
+    dispatcher = TelegramDispatcher()
     for message_data in messages_data:
-        await asend_template_telegram_message(**message_data)
+        try:
+            text = telegram_messages.render_loaded(
+                message_data["message_type"],
+                message_data.get("insertion_data"),
+                message_data.get("language") or translation.get_language(),
+            )
+        except Exception:
+            # сообщение с ошибкой в шаблоне или данных пропускается, остальные уходят
+            logger.exception(
+                "Не удалось подготовить сообщение %s для чата %s",
+                message_data["message_type"],
+                message_data["telegram_id"],
+            )
+            continue
+        dispatcher.put(message_data["telegram_id"], text)
+
+    await dispatcher.run()
@@ -1,5 +1,8 @@
 from apps.telegram.utils import send_telegram_message
-from apps.telegram.sender import send_template_telegram_message
+from apps.telegram.sender import (
+    send_template_telegram_message,
+    send_template_telegram_message_for_many,
+)
 from config.celery import celery_app
 
 
@@ -13,3 +16,8 @@ def send_template_telegram_message_task(
     telegram_id, message_type, insertion_data: dict | None = None, language=None
 ):
     send_template_telegram_message(telegram_id, message_type, insertion_data, language)
+
+
+@celery_app.task
+def send_template_telegram_messages_task(messages_data: list):
+    send_template_telegram_message_for_many(messages_data)
@@ -7,7 +7,9 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 django_asgi_app = get_asgi_application()
 
 
+from channels.auth import AuthMiddlewareStack
 from channels.routing import ProtocolTypeRouter, URLRouter
+from channels.security.websocket import AllowedHostsOriginValidator
 
 from .middlewares import JWTAuthMiddlewareStack
 from .routing import websocket_urlpatterns
@@ -16,6 +18,13 @@ from .routing import websocket_urlpatterns
 application = ProtocolTypeRouter(
     {
         "http": django_asgi_app,
-        "websocket": JWTAuthMiddlewareStack(URLRouter(websocket_urlpatterns)),
+        # сессия нужна для сокетов страниц админки, токен - для клиентов API;
+        # подключения со сторонних сайтов отклоняются, иначе чужая страница
+        # откроет сокет с сессионной cookie пользователя
+        "websocket": AllowedHostsOriginValidator(
+            AuthMiddlewareStack(
+                JWTAuthMiddlewareStack(URLRouter(websocket_urlpatterns))
+            )
+        ),
     }
 )
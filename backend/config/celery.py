@@ -13,6 +13,14 @@ celery_app.conf.beat_schedule = {
         "task": "apps.finance.tasks.create_wallet_history",
         "schedule": crontab(hour="0", minute="20"),
     },
+    "create_ledger_checkpoints_hourly": {
+        "task": "apps.finance.tasks.create_ledger_checkpoints",
+        "schedule": crontab(minute="15"),
+    },
+    "create_partitions_daily": {
+        "task": "apps.finance.tasks.create_partitions",
+        "schedule": crontab(hour="0", minute="5"),
+    },
     "create_user_program_history_daily": {
         "task": "apps.finance.tasks.create_user_program_history",
         "schedule": crontab(hour="0", minute="30"),
@@ -21,10 +29,27 @@ celery_app.conf.beat_schedule = {
         "task": "apps.accounts.tasks.create_user_count_history",
         "schedule": crontab(hour="0", minute="40"),
     },
+    "create_stats_snapshot_daily": {
+        "task": "apps.finance.tasks.create_stats_snapshot",
+        "schedule": crontab(hour="0", minute="50"),
+    },
+    "compact_commissions_every_minute": {
+        "task": "apps.finance.tasks.compact_commissions",
+        "schedule": crontab(),
+    },
+    # сообщения, пересылка которых после коммита не удалась
+    "relay_outbox_every_minute": {
+        "task": "core.tasks.relay_outbox",
+        "schedule": crontab(),
+    },
     "delete_confirm_codes_daily": {
         "task": "apps.accounts.tasks.delete_confirm_codes",
         "schedule": crontab(hour="0", minute="10"),
     },
+    "delete_expired_export_files_daily": {
+        "task": "core.tasks.delete_expired_export_files",
+        "schedule": crontab(hour="1", minute="0"),
+    },
     "delete_settings_auth_codes_daily": {
         "task": "apps.accounts.tasks.delete_settings_auth_codes",
         "schedule": crontab(hour="0", minute="0"),
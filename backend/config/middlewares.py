@@ -26,7 +26,7 @@ class JWTAuthMiddlewareStack(BaseMiddleware):
         if token:
             # Get the user by token
             scope["user"] = await self.get_user(token)
-        else:
+        elif "user" not in scope:
             scope["user"] = AnonymousUser()
 
     @staticmethod
@@ -75,6 +75,7 @@ INSTALLED_APPS = (
 )
 
 MIDDLEWARE = [
+    "core.middleware.QueryMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -134,6 +135,9 @@ CHANNEL_LAYERS = {
         },
     },
 }
+# присутствие пользователей онлайн, секунды
+PRESENCE_TTL = 60
+PRESENCE_HEARTBEAT = 20
 
 
 # Password validation
@@ -263,6 +267,43 @@ LOGIN_AS_USER_TOKEN = os.environ.get("LOGIN_AS_USER_TOKEN")
 # import, export
 IMPORT_EXPORT_FORMATS = [XLSX]
 registry.register("xlsx", DimensionXLSXFormat)
+# экспорт больше EXPORT_SYNC_LIMIT строк формируется в фоне,
+# готовый файл отдаётся повторно в течение EXPORT_CACHE_EXPIRES
+EXPORT_SYNC_LIMIT = 2000
+EXPORT_CACHE_EXPIRES = timedelta(minutes=10)
+EXPORT_FILES_EXPIRES = timedelta(days=1)
+
+# отметка журнала балансов ждёт завершения пишущих журнал транзакций не дольше
+# LEDGER_CHECKPOINT_LOCK_TIMEOUT, всё это время новые записи тоже ждут
+LEDGER_CHECKPOINT_LOCK_TIMEOUT = "500ms"
+
+# задачи, которые пересылка исходящих сообщений отправляет одной пачкой:
+# {задача: {"task": пакетная задача, принимающая список аргументов вызовов,
+#           "recipient": аргумент с получателем, по нему группируются вызовы}}
+OUTBOX_BATCH_SIZE = 500
+OUTBOX_BATCH_TASKS = {
+    "apps.telegram.tasks.send_template_telegram_message_task": {
+        "task": "apps.telegram.tasks.send_template_telegram_messages_task",
+        "recipient": "telegram_id",
+    },
+}
+
+# история операций и начисления секционированы по месяцам created_at, задача
+# create_partitions заранее создаёт секции на PARTITION_MONTHS_AHEAD месяцев
+PSQLEXTRA_PARTITIONING_MANAGER = "apps.finance.services.partitioning.manager"
+PARTITION_MONTHS_AHEAD = 3
+
+# бюджеты запросов к базе по имени url: превышение пишется в лог,
+# в тестах проверяется через core.testing.assert_query_budget
+QUERY_BUDGET_DEFAULT = 50
+QUERY_BUDGETS = {
+    "operation-list": 10,
+    "statistics/table/-detail": 10,
+    "investors": 10,
+}
+
+# рассылка счётчиков меню админки открытым страницам через channels
+ADMIN_BADGES_PUSH = os.environ.get("ADMIN_BADGES_PUSH", "false").lower() == "true"
 
 # telegram api settings
 TELEGRAM_API_ID = os.environ.get("TELEGRAM_API_ID")
@@ -4,9 +4,11 @@ from django.contrib.staticfiles.urls import staticfiles_urlpatterns
 from django.urls import path, include
 
 from config import settings
+from core.views import MetricsView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
     path(
         "api/v1/",
         include(
@@ -1,13 +1,13 @@
 import uuid
 
-from openpyxl import Workbook
 from openpyxl.styles import Alignment
 from openpyxl.styles.borders import Side, Border
-from openpyxl.utils import get_column_letter
 
 from django.conf import settings
 from pathlib import Path
 
+from core.utils.xlsx import XLSXWriter
+
 
 class ExcelFileCreator:
     fields = []
@@ -15,20 +15,25 @@ class ExcelFileCreator:
     save_path = ""
 
     def __init__(self):
-        self._wb = Workbook()
-        self._sheet = self._wb.active
+        self._writer = XLSXWriter()
 
     def get_fields(self):
         return self.fields
 
     def to_excel(self, data):
-        self._create_title()
-        self._write_data(data)
-        self._set_dimension()
+        bs = Side("thin")
+        self._writer.write(
+            self._get_titles(),
+            ([row[field] for field in self.fields] for row in data),
+            header_style={
+                "alignment": Alignment(horizontal="center"),
+                "border": Border(left=bs, right=bs, top=bs, bottom=bs),
+            },
+        )
 
     def save(self, *args, **kwargs):
         path = self._get_save_path(*args, **kwargs)
-        self._wb.save(path)
+        self._writer.save(path)
         return Path(*path.parts[:1], *path.parts[2:])
 
     def get_save_path(self, *args, **kwargs):
@@ -40,27 +45,5 @@ class ExcelFileCreator:
         file_name = f"{uuid.uuid4().hex}.xlsx"
         return directory / file_name
 
-    def _create_title(self):
-        bs = Side("thin")
-        border = Border(left=bs, right=bs, top=bs, bottom=bs)
-        center_alignment = Alignment(horizontal="center")
-
-        for i in range(len(self.fields)):
-            self._sheet.cell(row=1, column=i + 1).value = self.titles.get(
-                self.fields[i], self.fields[i].capitalize()
-            )
-            self._sheet.cell(row=1, column=i + 1).alignment = center_alignment
-            self._sheet.cell(row=1, column=i + 1).border = border
-
-    def _write_data(self, data):
-        for row in data:
-            self._sheet.append([row[field] for field in self.fields])
-
-    def _set_dimension(self):
-        for column_cells in self._sheet.columns:
-            length = max(
-                len(str(cell.value)) for cell in column_cells if cell.value is not None
-            )
-            self._sheet.column_dimensions[
-                get_column_letter(column_cells[0].column)
-            ].width = (length + 4)
+    def _get_titles(self):
+        return [self.titles.get(field, field.capitalize()) for field in self.fields]
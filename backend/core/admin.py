@@ -0,0 +1,85 @@
+from django.contrib import admin
+from django.http import FileResponse, Http404, HttpRequest, JsonResponse
+from django.urls import path, reverse
+from django.utils.html import format_html
+
+from core.models import ExportFile
+
+
+@admin.register(ExportFile)
+class ExportFileAdmin(admin.ModelAdmin):
+    list_display = ["file_name", "status", "get_progress", "user", "created_at"]
+    list_filter = ["status"]
+    fields = [
+        "file_name",
+        "status",
+        "get_progress",
+        "get_download",
+        "user",
+        "created_at",
+        "finished_at",
+    ]
+    readonly_fields = fields
+    change_form_template = "admin/core/exportfile/change_form.html"
+
+    def has_add_permission(self, request: HttpRequest) -> bool:
+        return False
+
+    def has_change_permission(self, request: HttpRequest, obj=None) -> bool:
+        return False
+
+    def get_urls(self):
+        return [
+            path(
+                "<int:pk>/status/",
+                self.admin_site.admin_view(self.status_view),
+                name="core_exportfile_status",
+            ),
+            path(
+                "<int:pk>/download/",
+                self.admin_site.admin_view(self.download_view),
+                name="core_exportfile_download",
+            ),
+        ] + super().get_urls()
+
+    def status_view(self, request, pk):
+        """Состояние файла для опроса со страницы файла"""
+        export_file = self._get_export_file(request, pk)
+        return JsonResponse(
+            {
+                "status": export_file.status,
+                "progress": export_file.progress,
+                "total": export_file.total,
+                "url": export_file.status == ExportFile.Status.DONE
+                and reverse("admin:core_exportfile_download", args=[pk]),
+            }
+        )
+
+    def download_view(self, request, pk):
+        export_file = self._get_export_file(request, pk)
+        if export_file.status != ExportFile.Status.DONE:
+            raise Http404
+        return FileResponse(
+            export_file.file.open("rb"),
+            as_attachment=True,
+            filename=export_file.file_name,
+        )
+
+    def _get_export_file(self, request, pk):
+        export_file = self.get_object(request, pk)
+        if export_file is None or not self.has_view_permission(request, export_file):
+            raise Http404
+        return export_file
+
+    @admin.display(description="Прогресс")
+    def get_progress(self, obj: ExportFile):
+        return f"{obj.progress} / {obj.total}"
+
+    @admin.display(description="Файл")
+    def get_download(self, obj: ExportFile):
+        if obj.status != ExportFile.Status.DONE:
+            return "-"
+        return format_html(
+            '<a href="{}">Скачать</a>',
+            reverse("admin:core_exportfile_download", args=[obj.pk]),
+        )
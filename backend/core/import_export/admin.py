@@ -1,21 +1,52 @@
-from django.http import HttpResponse
+from django.conf import settings
+from django.contrib import messages
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.http import FileResponse, HttpResponseRedirect
+from django.urls import reverse
 from import_export.admin import ExportMixin
 
+from core.models import ExportFile
+from core.tasks import run_export_file
+
 
 class NoConfirmMixin(ExportMixin):
     def export_no_confirm(self, request, queryset):
-        formats = self.get_export_formats()
-        file_format = formats[0]()
+        """
+        Небольшой экспорт формируется сразу, большой - в фоне, с переходом
+        к списку файлов экспорта. Свежий файл того же запроса отдаётся с диска
+        """
+        if not self.has_export_permission(request):
+            raise PermissionDenied
 
-        export_data = self.get_export_data(
-            file_format, request, queryset, encoding=self.to_encoding
-        )
-        content_type = file_format.get_content_type()
-        response = HttpResponse(export_data, content_type=content_type)
-        response["Content-Disposition"] = 'attachment; filename="%s"' % (
+        file_format = self.get_export_formats()[0]()
+        export_file, created = ExportFile.objects.get_or_create_for(
+            self.get_export_resource_classes(request)[0],
+            queryset,
             self.get_export_filename(request, queryset, file_format),
+            user=request.user,
+        )
+        if created and export_file.total <= settings.EXPORT_SYNC_LIMIT:
+            export_file.run()
+
+        if export_file.status == ExportFile.Status.DONE:
+            return FileResponse(
+                export_file.file.open("rb"),
+                as_attachment=True,
+                filename=export_file.file_name,
+                content_type=file_format.get_content_type(),
+            )
+
+        if created:
+            transaction.on_commit(lambda: run_export_file.delay(export_file.pk))
+        messages.info(
+            request,
+            f"Файл {export_file.file_name} формируется, "
+            f"он появится в списке файлов экспорта",
+        )
+        return HttpResponseRedirect(
+            reverse("admin:core_exportfile_change", args=[export_file.pk])
         )
-        return response
 
 
 class NoConfirmExportMixin(NoConfirmMixin):
@@ -0,0 +1,58 @@
+import tablib
+from django.db.models import QuerySet
+from tablib.formats._xlsx import safe_xlsx_sheet_title
+
+from core.utils.xlsx import XLSXWriter
+
+# сколько объектов читается из базы за раз
+EXPORT_CHUNK_SIZE = 2000
+
+
+def export_to_xlsx(resource, queryset, file, on_progress=None) -> int:
+    """
+    Экспорт queryset ресурсом import-export в xlsx без сборки Dataset:
+    строки читаются пачками и сразу пишутся в файл. after_export ресурса
+    получает пустой Dataset, из него берутся только title и bottoms.
+    Возвращает число выгруженных строк
+    """
+    resource.before_export(queryset)
+    queryset = resource.filter_export(queryset)
+    headers = resource.get_export_headers()
+
+    writer = XLSXWriter()
+    count = writer.write(
+        headers,
+        (
+            resource.export_resource(obj)
+            for obj in iter_chunks(queryset, on_progress=on_progress)
+        ),
+        freeze_header=True,
+    )
+
+    dataset = tablib.Dataset(headers=headers)
+    resource.after_export(queryset, dataset)
+    writer.title = (
+        safe_xlsx_sheet_title(dataset.title, "-") if dataset.title else "Tablib Dataset"
+    )
+    if hasattr(dataset, "bottoms"):
+        writer.append_bold(dataset.bottoms)
+
+    writer.save(file)
+    return count
+
+
+def iter_chunks(queryset, chunk_size=EXPORT_CHUNK_SIZE, on_progress=None):
+    """Объекты queryset пачками, on_progress вызывается после каждой пачки"""
+    objects = (
+        queryset.iterator(chunk_size=chunk_size)
+        if isinstance(queryset, QuerySet)
+        else queryset
+    )
+    count = 0
+    for obj in objects:
+        yield obj
+        count += 1
+        if on_progress and count % chunk_size == 0:
+            on_progress(count)
+    if on_progress:
+        on_progress(count)
@@ -1,49 +1,28 @@
 from io import BytesIO
 
-from import_export.formats.base_formats import XLSX
-from openpyxl.styles import Font
-from openpyxl.utils import get_column_letter
-from openpyxl.workbook import Workbook
 from tablib.formats._xlsx import XLSXFormat, safe_xlsx_sheet_title
 
+from core.utils.xlsx import XLSXWriter
+
 
 class DimensionXLSXFormat(XLSXFormat):
     @classmethod
     def export_set(
         cls, dataset, freeze_panes=True, invalid_char_subst="-", escape=False
     ):
-        wb = Workbook()
-        ws = wb.worksheets[0]
-
-        ws.title = (
+        writer = XLSXWriter(
             safe_xlsx_sheet_title(dataset.title, invalid_char_subst)
             if dataset.title
             else "Tablib Dataset"
         )
-
-        cls.dset_sheet(dataset, ws, freeze_panes=freeze_panes, escape=escape)
-        cls.set_bottoms(dataset, ws)
-        cls.set_dimension(ws)
+        writer.write(dataset.headers or [], dataset, freeze_header=freeze_panes)
+        cls.set_bottoms(dataset, writer)
 
         stream = BytesIO()
-        wb.save(stream)
+        writer.save(stream)
         return stream.getvalue()
 
     @staticmethod
-    def set_dimension(ws):
-        for column_cells in ws.columns:
-            length = max(
-                len(str(cell.value)) for cell in column_cells if cell.value is not None
-            )
-            ws.column_dimensions[get_column_letter(column_cells[0].column)].width = (
-                length + 4
-            )
-
-    @staticmethod
-    def set_bottoms(dataset, ws):
+    def set_bottoms(dataset, writer):
         if hasattr(dataset, "bottoms"):
-            ws.append(dataset.bottoms)
-
-            bold = Font(bold=True)
-            for cell in ws[len(ws["A"])]:
-                cell.font = bold
+            writer.append_bold(dataset.bottoms)
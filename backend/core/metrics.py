@@ -0,0 +1,91 @@
+import threading
+from bisect import bisect_left
+
+from django.conf import settings
+
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# {метрика: (описание, границы корзин)}
+METRICS = {
+    "http_request_queries": ("Число запросов к базе", QUERY_BUCKETS),
+    "http_request_db_seconds": ("Время запросов к базе", SECONDS_BUCKETS),
+    "http_request_serialization_seconds": (
+        "Время отрисовки ответа",
+        SECONDS_BUCKETS,
+    ),
+    "http_request_duration_seconds": ("Полное время запроса", SECONDS_BUCKETS),
+}
+
+
+def get_query_budget(view_name):
+    """Допустимое число запросов к базе для url с именем view_name или None"""
+    return settings.QUERY_BUDGETS.get(view_name, settings.QUERY_BUDGET_DEFAULT)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # последняя корзина - значения больше всех границ
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Registry:
+    """
+    Гистограммы метрик по имени url в памяти процесса. У каждого воркера
+    свои значения, prometheus различает их по адресу воркера
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # {(метрика, имя url): Histogram}
+        self._histograms = {}
+
+    def observe(self, view_name, **values):
+        with self._lock:
+            for metric, value in values.items():
+                key = (metric, view_name)
+                if key not in self._histograms:
+                    self._histograms[key] = Histogram(METRICS[metric][1])
+                self._histograms[key].observe(value)
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def render(self) -> str:
+        """Метрики в текстовом формате prometheus"""
+        lines = []
+        with self._lock:
+            for metric, (description, buckets) in METRICS.items():
+                lines += [
+                    f"# HELP {metric} {description}",
+                    f"# TYPE {metric} histogram",
+                ]
+                for (name, view_name), histogram in sorted(self._histograms.items()):
+                    if name != metric:
+                        continue
+                    view = _escape(view_name)
+                    total = 0
+                    for bound, count in zip(buckets + ("+Inf",), histogram.counts):
+                        total += count
+                        lines.append(
+                            f'{metric}_bucket{{view="{view}",le="{bound}"}} {total}'
+                        )
+                    lines += [
+                        f'{metric}_sum{{view="{view}"}} {histogram.sum}',
+                        f'{metric}_count{{view="{view}"}} {total}',
+                    ]
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = Registry()
@@ -0,0 +1,89 @@
+import logging
+import time
+
+from django.db import connection
+
+from core.metrics import get_query_budget, registry
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """Обёртка выполнения запросов: считает запросы к базе и их время"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.duration = 0
+        self.serialization = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+class QueryMetricsMiddleware:
+    """
+    Число запросов к базе, их время, время отрисовки ответа и полное время
+    запроса по имени url в гистограммы core.metrics.registry. Превышение
+    бюджета запросов из QUERY_BUDGETS пишется в лог
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = QueryStats()
+        request._query_stats = stats
+        with connection.execute_wrapper(stats):
+            response = self.get_response(request)
+
+        if response.streaming:
+            # запросы потокового ответа выполняются при его чтении
+            response.streaming_content = self.stream(
+                response.streaming_content, request, stats
+            )
+        else:
+            self.record(request, stats)
+        return response
+
+    def process_template_response(self, request, response):
+        # ответы DRF отрисовываются после представления
+        started = time.perf_counter()
+
+        def rendered(response):
+            request._query_stats.serialization += time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def stream(self, content, request, stats):
+        with connection.execute_wrapper(stats):
+            yield from content
+        self.record(request, stats)
+
+    @staticmethod
+    def record(request, stats):
+        if request.resolver_match is None:
+            return
+        view_name = request.resolver_match.view_name
+        registry.observe(
+            view_name,
+            http_request_queries=stats.count,
+            http_request_db_seconds=stats.duration,
+            http_request_serialization_seconds=stats.serialization,
+            http_request_duration_seconds=time.perf_counter() - stats.started,
+        )
+        budget = get_query_budget(view_name)
+        if budget is not None and stats.count > budget:
+            logger.warning(
+                "%s %s: %s запросов к базе при бюджете %s",
+                request.method,
+                view_name,
+                stats.count,
+                budget,
+            )
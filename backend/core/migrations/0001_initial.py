@@ -0,0 +1,98 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:50
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExportFile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "query_hash",
+                    models.CharField(
+                        db_index=True, max_length=64, verbose_name="Хэш запроса"
+                    ),
+                ),
+                ("resource", models.CharField(max_length=255, verbose_name="Ресурс")),
+                ("query", models.BinaryField(verbose_name="Запрос")),
+                (
+                    "file_name",
+                    models.CharField(max_length=255, verbose_name="Имя файла"),
+                ),
+                (
+                    "file",
+                    models.FileField(
+                        blank=True, upload_to="excel/export", verbose_name="Файл"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "В очереди"),
+                            ("running", "Формируется"),
+                            ("done", "Готов"),
+                            ("failed", "Ошибка"),
+                        ],
+                        default="pending",
+                        max_length=16,
+                        verbose_name="Статус",
+                    ),
+                ),
+                (
+                    "progress",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Выгружено строк"
+                    ),
+                ),
+                (
+                    "total",
+                    models.PositiveIntegerField(default=0, verbose_name="Всего строк"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Создан"),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Завершён"
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Пользователь",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Файл экспорта",
+                "verbose_name_plural": "Файлы экспорта",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:03
+
+import core.models
+from django.db import migrations, models
+import kombu.utils.json
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_outboxmessage"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="outboxmessage",
+            name="args",
+            field=models.JSONField(
+                decoder=core.models.OutboxJSONDecoder,
+                default=list,
+                encoder=kombu.utils.json.JSONEncoder,
+                verbose_name="Аргументы",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="outboxmessage",
+            name="kwargs",
+            field=models.JSONField(
+                decoder=core.models.OutboxJSONDecoder,
+                default=dict,
+                encoder=kombu.utils.json.JSONEncoder,
+                verbose_name="Именованные аргументы",
+            ),
+        ),
+    ]
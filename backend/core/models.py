@@ -0,0 +1,241 @@
+import hashlib
+import inspect
+import json
+import pickle
+import weakref
+
+from celery import current_app
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import QuerySet
+from django.utils.module_loading import import_string
+from django.utils.timezone import now
+from kombu.utils.json import JSONEncoder, object_hook
+
+from core.utils import blank_and_null
+
+
+class ExportFileQuerySet(models.QuerySet):
+    def fresh(self):
+        """Готовые и формирующиеся файлы, которые можно отдать повторно"""
+        return self.filter(
+            status__in=[
+                ExportFile.Status.PENDING,
+                ExportFile.Status.RUNNING,
+                ExportFile.Status.DONE,
+            ],
+            created_at__gte=now() - settings.EXPORT_CACHE_EXPIRES,
+        )
+
+    def expired(self):
+        return self.filter(created_at__lt=now() - settings.EXPORT_FILES_EXPIRES)
+
+    def get_or_create_for(self, resource_class, queryset, file_name, user=None):
+        """
+        Файл экспорта queryset ресурсом resource_class: свежий файл с тем же
+        хэшем запроса или новая запись в статусе ожидания
+        """
+        resource = f"{resource_class.__module__}.{resource_class.__qualname__}"
+        query_hash = get_query_hash(resource, queryset)
+        export_file = self.fresh().filter(query_hash=query_hash).first()
+        if export_file:
+            return export_file, False
+        return (
+            self.create(
+                query_hash=query_hash,
+                resource=resource,
+                query=pickle.dumps(queryset.query),
+                file_name=file_name,
+                total=queryset.count(),
+                user=user,
+            ),
+            True,
+        )
+
+
+def get_query_hash(resource: str, queryset) -> str:
+    sql, params = queryset.query.sql_with_params()
+    return hashlib.sha256(f"{resource}:{sql}:{params!r}".encode()).hexdigest()
+
+
+class ExportFile(models.Model):
+    class Status(models.TextChoices):
+        PENDING = "pending", "В очереди"
+        RUNNING = "running", "Формируется"
+        DONE = "done", "Готов"
+        FAILED = "failed", "Ошибка"
+
+    query_hash = models.CharField("Хэш запроса", max_length=64, db_index=True)
+    resource = models.CharField("Ресурс", max_length=255)
+    query = models.BinaryField("Запрос")
+    file_name = models.CharField("Имя файла", max_length=255)
+    file = models.FileField("Файл", upload_to="excel/export", blank=True)
+    status = models.CharField(
+        "Статус", max_length=16, choices=Status.choices, default=Status.PENDING
+    )
+    progress = models.PositiveIntegerField("Выгружено строк", default=0)
+    total = models.PositiveIntegerField("Всего строк", default=0)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        verbose_name="Пользователь",
+        on_delete=models.SET_NULL,
+        **blank_and_null,
+    )
+    created_at = models.DateTimeField("Создан", auto_now_add=True)
+    finished_at = models.DateTimeField("Завершён", **blank_and_null)
+
+    objects = ExportFileQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Файл экспорта"
+        verbose_name_plural = "Файлы экспорта"
+
+    def __str__(self):
+        return self.file_name
+
+    def get_queryset(self):
+        query = pickle.loads(self.query)
+        return QuerySet(model=query.model, query=query)
+
+    def run(self):
+        """Сформировать файл, прогресс сохраняется после каждой пачки строк"""
+        from core.import_export.export import export_to_xlsx
+
+        ExportFile.objects.filter(pk=self.pk).update(status=self.Status.RUNNING)
+        path = settings.MEDIA_ROOT / self.file.field.upload_to
+        path.mkdir(parents=True, exist_ok=True)
+        file_name = f"{self.query_hash[:16]}-{self.pk}.xlsx"
+
+        def on_progress(count):
+            ExportFile.objects.filter(pk=self.pk).update(progress=count)
+
+        try:
+            with open(path / file_name, "wb") as file:
+                self.progress = export_to_xlsx(
+                    import_string(self.resource)(),
+                    self.get_queryset(),
+                    file,
+                    on_progress=on_progress,
+                )
+        except Exception:
+            ExportFile.objects.filter(pk=self.pk).update(status=self.Status.FAILED)
+            raise
+
+        self.file.name = f"{self.file.field.upload_to}/{file_name}"
+        self.status = self.Status.DONE
+        self.finished_at = now()
+        self.save(update_fields=["file", "status", "progress", "finished_at"])
+
+    def delete(self, *args, **kwargs):
+        self.file.delete(save=False)
+        return super().delete(*args, **kwargs)
+
+
+class OutboxMessageQuerySet(models.QuerySet):
+    def add(self, task, *args, **kwargs):
+        """
+        Поставить задачу celery в очередь после коммита текущей транзакции.
+        Сообщение сохраняется в той же транзакции и при откате пропадает
+        """
+        message = self.create(task=task.name, args=args, kwargs=kwargs)
+        connection = transaction.get_connection()
+        # одна пересылка на транзакцию, сколько бы сообщений в ней ни было.
+        # Соединение хранит слабую ссылку на функцию пересылки: при откате
+        # django забывает функцию, и следующая транзакция регистрирует свою
+        hook = getattr(connection, "outbox_relay_hook", None)
+        if hook is None or hook() is None:
+            relay = _relay_outbox_hook()
+            connection.outbox_relay_hook = weakref.ref(relay)
+            transaction.on_commit(relay, robust=True)
+        return message
+
+    def relay(self, batch_size=None) -> int:
+        """
+        Отправить накопленные сообщения в celery пачками. Сообщения задач из
+        OUTBOX_BATCH_TASKS отправляются одной пакетной задачей на пачку,
+        сгруппированными по получателю. Возвращает число отправленных сообщений
+        """
+        batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        relayed = 0
+        while True:
+            with transaction.atomic():
+                messages = list(
+                    self.select_for_update(skip_locked=True).order_by("pk")[:batch_size]
+                )
+                if not messages:
+                    return relayed
+                batches = {}
+                for message in messages:
+                    task = current_app.tasks[message.task]
+                    if message.task in settings.OUTBOX_BATCH_TASKS:
+                        batches.setdefault(message.task, []).append(
+                            message.get_arguments(task)
+                        )
+                    else:
+                        task.delay(*message.args, **message.kwargs)
+                for name, calls in batches.items():
+                    batch = settings.OUTBOX_BATCH_TASKS[name]
+                    current_app.tasks[batch["task"]].delay(
+                        _group_by_recipient(calls, batch["recipient"])
+                    )
+                self.filter(pk__in=[message.pk for message in messages]).delete()
+            relayed += len(messages)
+
+
+def _relay_outbox_hook():
+    def relay_outbox_on_commit():
+        from core.tasks import relay_outbox
+
+        relay_outbox.delay()
+
+    return relay_outbox_on_commit
+
+
+def _group_by_recipient(calls: list[dict], recipient: str) -> list[dict]:
+    """
+    Вызовы по порядку получателей (аргумента задачи recipient), сообщения
+    одного получателя идут подряд в исходном порядке
+    """
+    return sorted(
+        calls, key=lambda call: (call[recipient] is None, call[recipient] or 0)
+    )
+
+
+class OutboxJSONDecoder(json.JSONDecoder):
+    """Decimal, даты и время восстанавливаются как в json-сериализаторе celery"""
+
+    def __init__(self, *args, **kwargs):
+        kwargs["object_hook"] = object_hook
+        super().__init__(*args, **kwargs)
+
+
+class OutboxMessage(models.Model):
+    """Задача celery, отправляемая после коммита транзакции, в которой создана"""
+
+    task = models.CharField("Задача", max_length=255)
+    # аргументы хранятся в формате json-сериализатора celery, чтобы задача
+    # получила те же типы, что и при прямом вызове delay
+    args = models.JSONField(
+        "Аргументы", default=list, encoder=JSONEncoder, decoder=OutboxJSONDecoder
+    )
+    kwargs = models.JSONField(
+        "Именованные аргументы",
+        default=dict,
+        encoder=JSONEncoder,
+        decoder=OutboxJSONDecoder,
+    )
+    created_at = models.DateTimeField("Создано", auto_now_add=True)
+
+    objects = OutboxMessageQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Исходящее сообщение"
+        verbose_name_plural = "Исходящие сообщения"
+
+    def __str__(self):
+        return self.task
+
+    def get_arguments(self, task) -> dict:
+        """Аргументы вызова по именам параметров задачи"""
+        return inspect.signature(task.run).bind(*self.args, **self.kwargs).arguments
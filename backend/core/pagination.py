@@ -1,8 +1,12 @@
-from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
-
+from base64 import b64decode, b64encode
 from collections import OrderedDict
 
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
 
 class PageNumberSetPagination(PageNumberPagination):
     """
@@ -26,12 +30,99 @@ class PageNumberSetPagination(PageNumberPagination):
                     ),
                     (
                         "previous_page",
-                        self.page.previous_page_number()
-                        if self.page.has_previous()
-                        else None,
+                        (
+                            self.page.previous_page_number()
+                            if self.page.has_previous()
+                            else None
+                        ),
                     ),
                     ("num_pages", self.page.paginator.num_pages),
                     ("results", data),
                 ]
             )
         )
+
+
+class KeysetPagination(BasePagination):
+    """
+    Постраничная выдача по ключу (created_at, id) в порядке убывания,
+    первая страница запрашивается с пустым cursor.
+    Следующая страница начинается после последней записи предыдущей,
+    поэтому нет ни COUNT(*), ни OFFSET и глубокие страницы не дороже первых
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    cursor_query_param = "cursor"
+    date_field = "created_at"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(f"-{self.date_field}", "-pk")
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            date, pk = cursor
+            queryset = queryset.filter(**{f"{self.date_field}__lte": date}).exclude(
+                **{self.date_field: date, "pk__gte": pk}
+            )
+
+        page = list(queryset[: self.page_size + 1])
+        self.has_next = len(page) > self.page_size
+        self.page = page[: self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            date, pk = b64decode(encoded.encode()).decode().rsplit("|", 1)
+            date = parse_datetime(date)
+            pk = int(pk)
+        except (TypeError, ValueError):
+            raise NotFound("Invalid cursor")
+        if date is None:
+            raise NotFound("Invalid cursor")
+        return date, pk
+
+    def encode_cursor(self, obj):
+        value = f"{getattr(obj, self.date_field).isoformat()}|{obj.pk}"
+        return b64encode(value.encode()).decode()
+
+    def get_next_cursor(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_next_link(self):
+        cursor = self.get_next_cursor()
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_first_link(self):
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, "")
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("next_cursor", self.get_next_cursor()),
+                    ("first", self.get_first_link()),
+                    ("results", data),
+                ]
+            )
+        )
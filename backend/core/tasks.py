@@ -0,0 +1,23 @@
+from celery import shared_task
+
+from core.models import ExportFile, OutboxMessage
+
+
+@shared_task
+def run_export_file(export_file_id):
+    export_file = ExportFile.objects.filter(
+        pk=export_file_id, status=ExportFile.Status.PENDING
+    ).first()
+    if export_file:
+        export_file.run()
+
+
+@shared_task
+def delete_expired_export_files():
+    for export_file in ExportFile.objects.expired():
+        export_file.delete()
+
+
+@shared_task
+def relay_outbox():
+    return OutboxMessage.objects.relay()
@@ -0,0 +1,26 @@
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.metrics import get_query_budget
+
+
+@contextmanager
+def assert_query_budget(view_name, budget=None):
+    """
+    Проверка в тестах, что код внутри блока укладывается в бюджет запросов
+    url с именем view_name из QUERY_BUDGETS или в явно заданный budget:
+
+        with assert_query_budget("operation-list"):
+            client.get(reverse("operation-list"))
+    """
+    if budget is None:
+        budget = get_query_budget(view_name)
+    with CaptureQueriesContext(connection) as queries:
+        yield queries
+    if budget is not None and len(queries) > budget:
+        sql = "\n".join(query["sql"] for query in queries.captured_queries)
+        raise AssertionError(
+            f"{view_name}: {len(queries)} запросов к базе при бюджете {budget}\n{sql}"
+        )
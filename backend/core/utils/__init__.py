@@ -5,6 +5,9 @@ from .validate_file_size import validate_file_size
 from .f_string import f
 from .business_days import add_business_days
 from .get_sync_attr import get_sync_attr
-from .decimal import decimal_usdt, decimal_pct
+from .decimal import decimal_usdt, decimal_pct, round_usdt
 from .safe_zero_div import safe_zero_div
+from .bulk_increment import bulk_increment
+from .upsert_from_select import upsert_from_select
 from .disconect_signal import DisconnectSignal
+from .count_querysets import count_querysets
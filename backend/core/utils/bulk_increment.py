@@ -0,0 +1,38 @@
+from django.db import connection
+
+
+def bulk_increment(model, deltas: dict, fields: list[str], batch_size=1000):
+    """Прибавить к полям модели значения из словаря {pk: (delta, ...)} одним
+    запросом UPDATE ... FROM (VALUES ...) на каждую пачку"""
+    if not deltas:
+        return 0
+
+    opts = model._meta
+    table = connection.ops.quote_name(opts.db_table)
+    pk_column = connection.ops.quote_name(opts.pk.column)
+    columns = [connection.ops.quote_name(opts.get_field(f).column) for f in fields]
+
+    set_sql = ", ".join(
+        f"{column} = t.{column} + v.d{i}" for i, column in enumerate(columns)
+    )
+    value_sql = "(%s" + ", %s::numeric" * len(columns) + ")"
+    alias_sql = ", ".join(f"d{i}" for i in range(len(columns)))
+
+    items = list(deltas.items())
+    updated = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(items), batch_size):
+            batch = items[start : start + batch_size]
+            params = []
+            for pk, values in batch:
+                if not isinstance(values, (list, tuple)):
+                    values = (values,)
+                params.extend([pk, *values])
+            cursor.execute(
+                f"UPDATE {table} AS t SET {set_sql} "
+                f"FROM (VALUES {', '.join([value_sql] * len(batch))}) "
+                f"AS v(pk, {alias_sql}) WHERE t.{pk_column} = v.pk",
+                params,
+            )
+            updated += cursor.rowcount
+    return updated
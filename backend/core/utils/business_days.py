@@ -1,10 +1,7 @@
-from django.utils.timezone import now, timedelta
+from django.utils.timezone import now
 
+from .trading_calendar import trading_calendar
 
-def add_business_days(days, start=now().date()):
-    result = start
-    while days > 0:
-        result += timedelta(days=1)
-        if result.weekday() < 5:
-            days -= 1
-    return result
+
+def add_business_days(days, start=None):
+    return trading_calendar.add_trading_days(days, start or now().date())
@@ -0,0 +1,16 @@
+from django.db import connection
+
+
+def count_querysets(querysets: dict) -> dict:
+    """Число строк нескольких выборок одним запросом
+    SELECT (SELECT COUNT(*) ...), ..., querysets - словарь {ключ: queryset}"""
+    if not querysets:
+        return {}
+    selects, params = [], []
+    for queryset in querysets.values():
+        sql, query_params = queryset.values("pk").order_by().query.sql_with_params()
+        selects.append(f"(SELECT COUNT(*) FROM ({sql}) AS subquery)")
+        params.extend(query_params)
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {', '.join(selects)}", params)
+        return dict(zip(querysets, cursor.fetchone()))
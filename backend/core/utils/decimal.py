@@ -1,2 +1,9 @@
+from decimal import ROUND_HALF_UP, Decimal
+
 decimal_usdt = {"max_digits": 10, "decimal_places": 2}
 decimal_pct = {"max_digits": 6, "decimal_places": 2}
+
+
+def round_usdt(value) -> Decimal:
+    """Округление суммы до центов половиной от нуля, как в postgres"""
+    return Decimal(value).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
@@ -1,8 +1,8 @@
 from django.utils import translation
 from rest_framework.exceptions import ValidationError
 
-from apps.accounts.models import ErrorMessageType, ErrorMessage
-from .get_inserted_text import get_inserted_text
+from apps.accounts.models import ErrorMessageType
+from .template_registry import error_messages
 
 
 def get_error(
@@ -10,8 +10,7 @@ def get_error(
 ):
     insertion_data = insertions or {}
 
-    template_message = ErrorMessage.objects.get(error_type=error_type)
     language = language or translation.get_language()
-    text = get_inserted_text(template_message, insertion_data, language)
+    text = error_messages.render(error_type, insertion_data, language)
 
     raise ValidationError(detail=text)
@@ -0,0 +1,128 @@
+import re
+import time
+from datetime import date
+from decimal import Decimal
+
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+
+def format_insertion(value) -> str:
+    if isinstance(value, date):
+        value = value.strftime("%d.%m.%Y")
+    elif isinstance(value, (float, Decimal)):
+        value = round(value, 2)
+    return str(value)
+
+
+def compile_text(text, fields: list) -> list:
+    """
+    Разбить текст шаблона на куски: на чётных местах обычный текст,
+    на нечётных - названия вставок
+    """
+    if not text or not fields:
+        return [text]
+    pattern = re.compile("|".join(r"\{(%s)\}" % re.escape(field) for field in fields))
+    parts = []
+    position = 0
+    for match in pattern.finditer(text):
+        parts.append(text[position : match.start()])
+        parts.append(match.group(match.lastindex))
+        position = match.end()
+    parts.append(text[position:])
+    return parts
+
+
+class TemplateRegistry:
+    """
+    Шаблоны сообщений одной модели в памяти процесса. Все шаблоны загружаются
+    одним запросом, текст на каждом языке разбирается один раз. Кэш
+    сбрасывается при сохранении и удалении шаблона, а в остальных процессах
+    устаревает через timeout секунд
+    """
+
+    def __init__(self, model_label, key_field="message_type", timeout=300):
+        self.model_label = model_label
+        self.key_field = key_field
+        self.timeout = timeout
+        self._messages = {}
+        self._compiled = {}
+        self._loaded_at = None
+        post_save.connect(self.clear, sender=model_label, weak=False)
+        post_delete.connect(self.clear, sender=model_label, weak=False)
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def clear(self, *args, **kwargs):
+        self._loaded_at = None
+
+    def _is_loaded(self):
+        return (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < self.timeout
+        )
+
+    def _set_messages(self, messages):
+        self._compiled = {}
+        self._messages = {getattr(m, self.key_field): m for m in messages}
+        self._loaded_at = time.monotonic()
+
+    def load(self):
+        if not self._is_loaded():
+            self._set_messages(self.model.objects.all())
+
+    async def aload(self):
+        if not self._is_loaded():
+            self._set_messages([m async for m in self.model.objects.all()])
+
+    def get(self, key):
+        self.load()
+        return self._get_loaded(key)
+
+    def _get_loaded(self, key):
+        try:
+            return self._messages[key]
+        except KeyError:
+            raise self.model.DoesNotExist(f"{self.model_label} {key} not found")
+
+    def render(self, key, insertion_data: dict | None, language, field="text"):
+        self.load()
+        return self.render_loaded(key, insertion_data, language, field)
+
+    async def arender(self, key, insertion_data: dict | None, language, field="text"):
+        await self.aload()
+        return self.render_loaded(key, insertion_data, language, field)
+
+    def render_loaded(self, key, insertion_data: dict | None, language, field="text"):
+        """Подстановка без обращений к базе, шаблоны должны быть загружены"""
+        message = self._get_loaded(key)
+        compiled_key = (key, field, language)
+        compiled = self._compiled.get(compiled_key)
+        if compiled is None:
+            fields = list(message.insertion_iter())
+            text = getattr(message, field).get(language)
+            compiled = self._compiled[compiled_key] = (
+                fields,
+                compile_text(text, fields),
+            )
+        fields, parts = compiled
+
+        insertion_data = insertion_data or {}
+        for insertion in fields:
+            if insertion not in insertion_data:
+                raise ValueError(f"insertion data dict must have {insertion}")
+
+        if len(parts) == 1:
+            return parts[0]
+        return "".join(
+            format_insertion(insertion_data[part]) if i % 2 else part
+            for i, part in enumerate(parts)
+        )
+
+
+operation_messages = TemplateRegistry("finance.OperationMessage")
+telegram_messages = TemplateRegistry("telegram.TemplateTelegramMessage")
+email_messages = TemplateRegistry("accounts.EmailMessage")
+error_messages = TemplateRegistry("accounts.ErrorMessage", key_field="error_type")
@@ -0,0 +1,112 @@
+import time
+from bisect import bisect_left
+from datetime import date, timedelta
+
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+# запас лет вокруг текущей даты и праздников, на который строится календарь
+YEARS_MARGIN = 5
+
+
+class TradingCalendar:
+    """
+    Торговые дни (будни без праздников из Holidays) в памяти процесса.
+    Календарь хранится плотным массивом накопленного числа торговых дней
+    по каждой дате, поэтому все проверки и подсчёты выполняются за O(1).
+    Кэш сбрасывается при сохранении и удалении праздника, а в остальных
+    процессах устаревает через timeout секунд
+    """
+
+    def __init__(self, model_label="finance.Holidays", timeout=300):
+        self.model_label = model_label
+        self.timeout = timeout
+        self._loaded_at = None
+        self._holidays = set()
+        self._start = 0
+        self._counts = []
+        post_save.connect(self.clear, sender=model_label, weak=False)
+        post_delete.connect(self.clear, sender=model_label, weak=False)
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def clear(self, *args, **kwargs):
+        self._loaded_at = None
+
+    def _is_loaded(self):
+        return (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < self.timeout
+        )
+
+    def load(self, *dates):
+        """Загрузить праздники и построить календарь, покрывающий даты"""
+        if not self._is_loaded():
+            self._holidays = set()
+            for start_date, end_date in self.model.objects.values_list(
+                "start_date", "end_date"
+            ):
+                for day in range(((end_date or start_date) - start_date).days + 1):
+                    self._holidays.add(start_date + timedelta(days=day))
+            self._counts = []
+            self._loaded_at = time.monotonic()
+
+        if not self._counts or any(not self._covers(d) for d in dates):
+            self._build(*dates)
+
+    def _covers(self, day: date):
+        return 0 < day.toordinal() - self._start < len(self._counts)
+
+    def _build(self, *dates):
+        years = [date.today().year, *(d.year for d in self._holidays)]
+        years += [d.year for d in dates]
+        start = date(min(years) - YEARS_MARGIN, 1, 1).toordinal()
+        end = date(max(years) + YEARS_MARGIN, 12, 31).toordinal()
+
+        # counts[i] - число торговых дней с начала календаря по дату start + i
+        counts = [0]
+        for ordinal in range(start + 1, end + 1):
+            day = date.fromordinal(ordinal)
+            counts.append(counts[-1] + self._is_trading(day))
+        self._start = start
+        self._counts = counts
+
+    def _is_trading(self, day: date):
+        return day.weekday() < 5 and day not in self._holidays
+
+    def _count(self, day: date):
+        return self._counts[day.toordinal() - self._start]
+
+    def is_holiday(self, day: date) -> bool:
+        self.load()
+        return day in self._holidays
+
+    def is_trading_day(self, day: date) -> bool:
+        self.load(day)
+        return self._count(day) > self._count(day - timedelta(days=1))
+
+    def trading_days_between(self, start_date: date, end_date: date) -> int:
+        """Число торговых дней с start_date по end_date включительно"""
+        if end_date < start_date:
+            return 0
+        self.load(start_date, end_date)
+        return self._count(end_date) - self._count(start_date - timedelta(days=1))
+
+    def trading_day_of_month(self, day: date) -> int | None:
+        """Номер торгового дня в месяце, для неторгового дня None"""
+        if not self.is_trading_day(day):
+            return None
+        return self.trading_days_between(day.replace(day=1), day)
+
+    def add_trading_days(self, days: int, start: date) -> date:
+        """Дата, до которой после start пройдёт days торговых дней"""
+        if days <= 0:
+            return start
+        self.load(start, start + timedelta(days=days * 2 + 14))
+        target = self._count(start) + days
+        return date.fromordinal(self._start + bisect_left(self._counts, target))
+
+
+trading_calendar = TradingCalendar()
@@ -0,0 +1,31 @@
+from django.db import connection
+
+
+def upsert_from_select(model, queryset, columns: dict, conflict_target: list[str]):
+    """Записать в таблицу модели строки выборки одним запросом
+    INSERT ... SELECT ... ON CONFLICT DO UPDATE. columns - словарь
+    {поле модели: выражение над queryset}, при конфликте по conflict_target
+    строка перезаписывается"""
+    opts = model._meta
+    table = connection.ops.quote_name(opts.db_table)
+    names = [connection.ops.quote_name(opts.get_field(f).column) for f in columns]
+    conflict = [
+        connection.ops.quote_name(opts.get_field(f).column) for f in conflict_target
+    ]
+
+    # все столбцы выборки - аннотации, чтобы их порядок совпадал с columns
+    aliases = {f"upsert_{i}": value for i, value in enumerate(columns.values())}
+    select_sql, params = (
+        queryset.annotate(**aliases).values_list(*aliases).order_by().query
+    ).sql_with_params()
+
+    update_sql = ", ".join(
+        f"{name} = EXCLUDED.{name}" for name in names if name not in conflict
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(names)}) {select_sql} "
+            f"ON CONFLICT ({', '.join(conflict)}) DO UPDATE SET {update_sql}",
+            params,
+        )
+        return cursor.rowcount
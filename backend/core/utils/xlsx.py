@@ -0,0 +1,72 @@
+from itertools import chain, islice
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+
+# сколько первых строк просматривается для ширины колонок
+SAMPLE_SIZE = 200
+
+
+class XLSXWriter:
+    """
+    Запись xlsx в режиме write-only: строки не хранятся в памяти, а сразу
+    пишутся в файл. Ширина колонок оценивается по заголовкам и первым
+    SAMPLE_SIZE строкам, поэтому данные можно передавать итератором
+    """
+
+    def __init__(self, title=None):
+        self._wb = Workbook(write_only=True)
+        self._sheet = self._wb.create_sheet(title)
+
+    @property
+    def title(self):
+        return self._sheet.title
+
+    @title.setter
+    def title(self, value):
+        self._sheet.title = value
+
+    def write(self, headers, rows, header_style=None, freeze_header=False) -> int:
+        """Записать заголовки и строки, возвращает число строк данных"""
+        rows = iter(rows)
+        sample = list(islice(rows, SAMPLE_SIZE))
+        self._set_widths([headers, *sample])
+
+        if freeze_header:
+            self._sheet.freeze_panes = "A2"
+        header_style = header_style or {"font": Font(bold=True)}
+        self._sheet.append([self._cell(value, **header_style) for value in headers])
+
+        count = 0
+        for row in chain(sample, rows):
+            self._sheet.append([self._cell(value) for value in row])
+            count += 1
+        return count
+
+    def append_bold(self, row):
+        bold = Font(bold=True)
+        self._sheet.append([self._cell(value, font=bold) for value in row])
+
+    def save(self, file):
+        self._wb.save(file)
+
+    def _set_widths(self, rows):
+        widths = {}
+        for row in rows:
+            for i, value in enumerate(row, start=1):
+                if value is not None:
+                    widths[i] = max(widths.get(i, 0), len(str(value)))
+        for i, width in widths.items():
+            self._sheet.column_dimensions[get_column_letter(i)].width = width + 4
+
+    def _cell(self, value, **style):
+        cell = WriteOnlyCell(self._sheet)
+        try:
+            cell.value = value
+        except ValueError:
+            cell.value = str(value)
+        for name, value in style.items():
+            setattr(cell, name, value)
+        return cell
@@ -1,3 +1,4 @@
 # flake8: noqa: F401
 
+from .metrics import MetricsView
 from .operation import OperationViewMixin
@@ -0,0 +1,16 @@
+from django.http import HttpResponse
+from rest_framework.views import APIView
+
+from apps.accounts.permissions import IsLocal
+from core.metrics import registry
+
+
+class MetricsView(APIView):
+    """Метрики запросов процесса в формате prometheus"""
+
+    permission_classes = [IsLocal]
+
+    def get(self, request):
+        return HttpResponse(
+            registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+        )
@@ -2,6 +2,7 @@ from rest_framework.response import Response
 from rest_framework.status import HTTP_201_CREATED
 
 from apps.finance.models import Program, UserProgram, UserProgramReplenishment
+from apps.finance.services.commissions import compact_commissions
 
 
 class OperationViewMixin:
@@ -30,6 +31,10 @@ class OperationViewMixin:
         return data
 
     def create(self, request, *args, **kwargs):
+        if request.user.business_account:
+            # баланс бизнес-кошелька показывается вместе с ещё не перенесёнными
+            # комиссиями, проверка и списание операции идут по той же сумме
+            compact_commissions()
         serializer = self.get_serializer(data=self.get_extended_data())
         serializer.is_valid(raise_exception=True)
         self.perform_create(serializer)